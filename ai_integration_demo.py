@@ -4,7 +4,7 @@ Demo: AI Model Integration with MCP Audio Server
 This demonstrates how an AI model would interact with the audio server
 """
 
-import json
+import asyncio
 import sys
 import os
 import time
@@ -15,29 +15,29 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from audio_server import MCPAudioServer
+from audio_client import AudioClient
 
 class AIModelSimulator:
     """Simulates an AI model using the MCP Audio Server"""
     
     def __init__(self):
-        self.audio_server = MCPAudioServer()
+        self.audio = AudioClient()
         self.conversation_history = []
+
+    async def _speak(self, text, **kwargs):
+        return await self.audio.speak(text, **kwargs)
     
     def speak(self, text, **kwargs):
         """Make the AI speak text"""
         print(f"🤖 AI: {text}")
         
-        # Use the audio server to speak
-        result = self.audio_server.call_tool("speak_text", {
-            "text": text,
-            **kwargs
-        })
+        # Use the audio client to speak
+        result = asyncio.run(self._speak(text, **kwargs))
         
-        if result.get("success"):
-            print("   🔊 Audio played successfully")
+        if result.success:
+            print(f"   🔊 Audio played successfully in {result.run_seconds:.1f}s")
         else:
-            print(f"   ❌ Audio failed: {result.get('error')}")
+            print(f"   ❌ Audio failed: {result.error}")
         
         return result
     
@@ -67,16 +67,15 @@ class AIModelSimulator:
             self.speak(response, volume=1.0, rate=150)
             
         elif "status" in user_input.lower():
-            status = self.audio_server.call_tool("get_audio_status", {})
-            if status.get("success"):
-                audio_status = status["status"]
-                response = f"Audio system status: TTS is {'available' if audio_status['tts_available'] else 'unavailable'}, Audio system is {'ready' if audio_status['pygame_available'] else 'not ready'}."
-            else:
+            try:
+                audio_status = asyncio.run(self.audio.status())
+                response = f"Audio system status: TTS is {'available' if audio_status.tts_available else 'unavailable'}, Audio system is {'ready' if audio_status.pygame_available else 'not ready'}."
+            except Exception:
                 response = "I couldn't check the audio system status."
             self.speak(response)
             
         elif "stop" in user_input.lower():
-            self.audio_server.call_tool("stop_audio", {})
+            asyncio.run(self.audio.stop())
             response = "I've stopped any current audio playback."
             print(f"🤖 AI: {response}")
             
@@ -103,8 +102,8 @@ def demo_ai_integration():
     ai = AIModelSimulator()
     
     # Check if audio system is ready
-    status = ai.audio_server.call_tool("get_audio_status", {})
-    if not status.get("success") or not status["status"]["tts_available"]:
+    status = asyncio.run(ai.audio.status())
+    if not status.tts_available:
         print("❌ Audio system not available. Demo cannot continue.")
         return
     
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+In-process async API for applications that embed the MCP Audio Server.
+
+AudioClient drives AudioPlayer directly: no JSON-RPC, no JSON encoding and no
+MCP text blobs to parse. Calls return typed dataclasses with timing data, and
+speech and playback return an AudioJob that can be awaited, cancelled or
+watched for progress.
+
+Example:
+    async with AudioClient() as audio:
+        job = audio.speak("Hello there", rate=160)
+        result = await job
+        print(result.success, result.queued_seconds, result.run_seconds)
+"""
+
+import asyncio
+import functools
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import audio_server
+from audio_server import AudioPlayer, RequestContext, cancelled_result
+
+# progress, total, message
+ProgressCallback = Callable[[float, Optional[float], Optional[str]], None]
+
+@dataclass
+class AudioResult:
+    """Outcome of a speech, playback or stop call"""
+    success: bool
+    message: str = ""
+    error: Optional[str] = None
+    cancelled: bool = False
+    timed_out: bool = False
+    # Time spent waiting for the audio worker, and running on it
+    queued_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.queued_seconds + self.run_seconds
+
+@dataclass
+class AudioStatus:
+    """Audio system status"""
+    tts_available: bool
+    pygame_available: bool
+    music_playing: bool
+
+@dataclass
+class Voice:
+    """A text-to-speech voice"""
+    id: str
+    name: str
+    lang: List[str] = field(default_factory=list)
+    gender: Optional[str] = None
+
+class AudioClientError(Exception):
+    """Raised when a query (status, voices) fails"""
+
+class AudioJob:
+    """A queued or running speech/playback call; ``await job`` returns its AudioResult"""
+
+    def __init__(self, job_id: int, task: "asyncio.Task[AudioResult]", context: RequestContext):
+        self.id = job_id
+        self.context = context
+        self._task = task
+
+    def __await__(self):
+        return self._task.__await__()
+
+    def cancel(self):
+        """Stop the job; it resolves to a result with ``cancelled=True``"""
+        self.context.cancel()
+
+    def done(self) -> bool:
+        return self._task.done()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.context.cancelled and not self.context.timed_out
+
+class AudioClient:
+    """Async facade over AudioPlayer.
+
+    Speech and playback run one at a time on the client's own audio worker
+    thread, in the order they were requested; ``stop`` and ``status`` do not
+    wait behind them. By default the client drives the
+    AudioPlayer of the module-level MCP server, so an embedded server and the
+    client share one engine and mixer; the player's device lock makes their
+    calls take turns instead of overlapping.
+    """
+
+    def __init__(self, player: Optional[AudioPlayer] = None):
+        self.player = player or audio_server.server.audio_player
+        self._audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="client-audio")
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, AudioJob] = {}
+
+    async def __aenter__(self) -> "AudioClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def speak(self, text: str, rate: Optional[int] = None, volume: Optional[float] = None,
+              voice_id: Optional[str] = None, timeout: Optional[float] = None,
+              on_progress: Optional[ProgressCallback] = None) -> AudioJob:
+        """Queue text to be spoken; must be called from a running event loop"""
+        return self._submit(
+            lambda context: self.player.speak_text(text, rate, volume, voice_id, context), timeout, on_progress
+        )
+
+    def play_file(self, file_path: str, volume: Optional[float] = None, timeout: Optional[float] = None,
+                  on_progress: Optional[ProgressCallback] = None) -> AudioJob:
+        """Queue an audio file to be played; must be called from a running event loop"""
+        return self._submit(
+            lambda context: self.player.play_audio_file(file_path, volume, context), timeout, on_progress
+        )
+
+    async def stop(self) -> AudioResult:
+        """Cancel every pending job and stop whatever is playing"""
+        for job in list(self._jobs.values()):
+            job.cancel()
+        start = time.monotonic()
+        raw = await asyncio.get_running_loop().run_in_executor(None, self.player.stop_audio)
+        return AudioResult(
+            success=bool(raw.get("success")), message=raw.get("message", ""), error=raw.get("error"),
+            run_seconds=time.monotonic() - start
+        )
+
+    async def status(self) -> AudioStatus:
+        """Current audio system status"""
+        raw = await asyncio.get_running_loop().run_in_executor(None, self.player.get_audio_status)
+        if not raw.get("success"):
+            raise AudioClientError(raw.get("error", "Unknown error"))
+        status = raw.get("status", {})
+        return AudioStatus(
+            tts_available=bool(status.get("tts_available")),
+            pygame_available=bool(status.get("pygame_available")),
+            music_playing=bool(status.get("music_playing"))
+        )
+
+    async def voices(self, language: Optional[str] = None, gender: Optional[str] = None,
+                     name: Optional[str] = None) -> List[Voice]:
+        """Available pyttsx3 voices, optionally filtered as in the list_voices tool"""
+        raw = await asyncio.get_running_loop().run_in_executor(
+            self._audio_executor, functools.partial(self.player.list_voices, language=language, gender=gender, name=name)
+        )
+        if not raw.get("success"):
+            raise AudioClientError(raw.get("error", "Unknown error"))
+        return [
+            Voice(id=v.get("id"), name=v.get("name"), lang=list(v.get("lang") or []), gender=v.get("gender"))
+            for v in raw.get("voices", [])
+        ]
+
+    def close(self):
+        """Cancel pending jobs and release the audio worker"""
+        for job in list(self._jobs.values()):
+            job.cancel()
+        self._audio_executor.shutdown(wait=False)
+
+    def _submit(self, call: Callable[[RequestContext], Dict[str, Any]], timeout: Optional[float],
+                on_progress: Optional[ProgressCallback]) -> AudioJob:
+        loop = asyncio.get_running_loop()
+        job_id = next(self._ids)
+        notify = None
+        if on_progress is not None:
+            def notify(message: Dict[str, Any]):
+                # Called from the audio worker; deliver on the loop thread
+                params = message["params"]
+                loop.call_soon_threadsafe(on_progress, params["progress"], params.get("total"), params.get("message"))
+        context = RequestContext(job_id, job_id if on_progress else None, notify)
+        submitted = time.monotonic()
+        task = loop.create_task(self._run(call, context, timeout, submitted))
+        job = AudioJob(job_id, task, context)
+        self._jobs[job_id] = job
+        task.add_done_callback(lambda _: self._jobs.pop(job_id, None))
+        return job
+
+    async def _run(self, call: Callable[[RequestContext], Dict[str, Any]], context: RequestContext,
+                   timeout: Optional[float], submitted: float) -> AudioResult:
+        timings: Dict[str, float] = {}
+
+        def work() -> Dict[str, Any]:
+            timings["started"] = time.monotonic()
+            if context.cancelled:
+                return cancelled_result()
+            watchdog = None
+            if timeout:
+                context.timeout = timeout
+                context.deadline = time.monotonic() + timeout
+                watchdog = audio_server.deadline_watchdog.schedule(timeout, context.expire)
+            try:
+                return call(context)
+            finally:
+                if watchdog is not None:
+                    watchdog.cancel()
+                timings["finished"] = time.monotonic()
+
+        raw = await asyncio.get_running_loop().run_in_executor(self._audio_executor, work)
+        started = timings.get("started", submitted)
+        error = raw.get("error")
+        if context.timed_out:
+            error = f"Timed out after {timeout * 1000:.0f} ms"
+        return AudioResult(
+            success=bool(raw.get("success")) and not context.cancelled,
+            message=raw.get("message", ""),
+            error=error,
+            cancelled=context.cancelled and not context.timed_out,
+            timed_out=context.timed_out,
+            queued_seconds=started - submitted,
+            run_seconds=timings.get("finished", started) - started
+        )
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Thin stdio proxy for a resident MCP Audio Server daemon.
+
+MCP clients launch this instead of audio_server.py. It imports nothing but
+the standard library, connects to the daemon's Unix socket (starting the
+daemon if none is running) and copies bytes between stdio and the socket, so
+a new session is ready in milliseconds while the daemon keeps the TTS engine,
+mixer and caches warm for everyone.
+
+Usage:
+    python audio_proxy.py [--socket PATH] [--no-spawn]
+"""
+
+import argparse
+import fcntl
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# How long to wait for a freshly spawned daemon to start listening
+SPAWN_TIMEOUT = 30.0
+
+def default_socket_path() -> str:
+    """Per-user socket path shared by the daemon and the proxy"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "mcp-audio-server.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"mcp-audio-server-{uid}.sock")
+
+@contextmanager
+def socket_lock(path: str) -> Iterator[None]:
+    """Hold the exclusive lock on ``<socket path>.lock``.
+
+    The proxy holds it while it checks for a daemon and spawns one, the
+    daemon while it replaces a stale socket file and binds, so no one
+    unlinks or replaces a socket that another process has just bound.
+    """
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+def connect(path: str) -> socket.socket:
+    """Connect to the daemon socket"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def spawn_daemon(path: str):
+    """Start audio_server.py --daemon in the background, detached from this process.
+
+    The daemon's log goes to ``<socket path>.log``.
+    """
+    server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audio_server.py")
+    with open(path + ".log", "ab") as log:
+        subprocess.Popen(
+            [sys.executable, server_script, "--daemon", "--socket", path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+            start_new_session=True,
+        )
+
+def connect_or_spawn(path: str, spawn: bool = True) -> socket.socket:
+    """Connect to the daemon, starting it first if nothing is listening"""
+    try:
+        return connect(path)
+    except OSError:
+        if not spawn:
+            raise
+
+    with socket_lock(path):
+        # Another proxy may have started the daemon while we waited for the lock
+        try:
+            return connect(path)
+        except OSError:
+            spawn_daemon(path)
+    deadline = time.monotonic() + SPAWN_TIMEOUT
+    while True:
+        try:
+            return connect(path)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def pump_socket_to_stdout(sock: socket.socket, done: threading.Event):
+    """Copy daemon output to stdout until the daemon closes the connection"""
+    out = sys.stdout.buffer
+    try:
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            out.write(data)
+            out.flush()
+    except OSError:
+        pass
+    finally:
+        done.set()
+
+def main():
+    """Proxy stdio to the daemon"""
+    parser = argparse.ArgumentParser(description="Stdio proxy for the MCP Audio Server daemon")
+    parser.add_argument("--socket", default=default_socket_path(), help="Daemon socket path")
+    parser.add_argument("--no-spawn", action="store_true", help="Fail instead of starting a daemon")
+    args = parser.parse_args()
+
+    try:
+        sock = connect_or_spawn(args.socket, spawn=not args.no_spawn)
+    except OSError as e:
+        print(f"Cannot reach audio server daemon at {args.socket}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    done = threading.Event()
+    threading.Thread(target=pump_socket_to_stdout, args=(sock, done), daemon=True).start()
+
+    stdin_fd = sys.stdin.fileno()
+    try:
+        while not done.is_set():
+            data = os.read(stdin_fd, 65536)
+            if not data:
+                break
+            sock.sendall(data)
+        # Stdin closed: let the daemon finish in-flight requests, then exit
+        sock.shutdown(socket.SHUT_WR)
+        done.wait()
+    except (OSError, KeyboardInterrupt):
+        pass
+    finally:
+        sock.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,46 +3,426 @@
 MCP Audio Server - Provides audio playback capabilities for AI models
 """
 
+import time
+
+# Reference point for --profile-startup
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import asyncio
+import heapq
+import itertools
 import json
 import logging
 import os
+import sqlite3
 import sys
-from typing import Any, Dict, Optional
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
 import re
 from io import BytesIO
 
-# Suppress pygame welcome message to avoid interfering with MCP JSON communication
-os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-
-import pyttsx3
-import pygame
-from gtts import gTTS
+from scheduler import FairScheduler
+from speech_codec import STORAGE_CODECS, StorageCodec, get_storage_codec
+from speech_cache import (ClipReader, SingleFlight, SoundCache, SpeechCache, export_bundle, import_bundle,
+                          load_phrase_file, parse_phrase, speech_key)
+from transport import CoalescingWriter, JSONCodec, get_codec, start_line_reader
+from voice_catalog import VoiceCatalog, driver_name
 
-# Configure logging to stderr to avoid interfering with MCP JSON communication on stdout
-logging.basicConfig(
-    level=logging.INFO,
-    stream=sys.stderr,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-class AudioPlayer:
-    """Handles audio playback operations"""
+# The audio libraries are imported on first use (see AudioPlayer), so importing
+# this module loads no audio stack and has no side effects
+pyttsx3 = None
+pygame = None
+gTTS = None
+
+def _load_pyttsx3():
+    global pyttsx3
+    if pyttsx3 is None:
+        import pyttsx3 as module
+        pyttsx3 = module
+    return pyttsx3
+
+def _load_pygame():
+    global pygame
+    if pygame is None:
+        # Suppress pygame welcome message to avoid interfering with MCP JSON communication
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+        import pygame as module
+        pygame = module
+    return pygame
+
+def _load_gtts():
+    global gTTS
+    if gTTS is None:
+        from gtts import gTTS as gtts_class
+        gTTS = gtts_class
+    return gTTS
+
+def default_cache_dir() -> Optional[str]:
+    """Directory for persistent caches.
+
+    AUDIO_SERVER_CACHE_DIR overrides it (an empty value disables persistent
+    caching); otherwise $XDG_CACHE_HOME/mcp-audio-server or
+    ~/.cache/mcp-audio-server.
+    """
+    override = os.environ.get("AUDIO_SERVER_CACHE_DIR")
+    if override is not None:
+        return override or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mcp-audio-server")
+
+def configure_logging():
+    """Log to stderr to avoid interfering with MCP JSON communication on stdout"""
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stderr,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+class RequestContext:
+    """Per-request cancellation, deadline and progress reporting, shared by the dispatcher and the audio worker"""
+
+    # Minimum spacing between throttled (position) progress notifications
+    PROGRESS_INTERVAL = 0.25
+
+    def __init__(self, request_id: Any = None, progress_token: Any = None,
+                 notify: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.request_id = request_id
+        self.progress_token = progress_token
+        self._notify = notify
+        self._cancelled = threading.Event()
+        self._abort_callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._last_progress = -1.0
+        self._last_progress_time = 0.0
+        # Set by call_tool when the tool has a deadline
+        self.timeout: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self.timed_out = False
+        # Called (from the watchdog thread) if the tool ignores its deadline
+        self.on_hung: Optional[Callable[[], None]] = None
+
+    def report_progress(self, progress: float, total: Optional[float] = None, message: Optional[str] = None,
+                        throttle: bool = False):
+        """Send a progress notification if the client asked for them.
+
+        Progress only ever increases; throttled reports (playback position,
+        word boundaries) are dropped if they arrive too close together.
+        """
+        if self.progress_token is None or self._notify is None or self.cancelled:
+            return
+        progress = round(progress, 1)
+        now = time.monotonic()
+        with self._lock:
+            if progress <= self._last_progress:
+                return
+            if throttle and now - self._last_progress_time < self.PROGRESS_INTERVAL:
+                return
+            self._last_progress = progress
+            self._last_progress_time = now
+
+        params: Dict[str, Any] = {"progressToken": self.progress_token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        try:
+            self._notify({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+        except Exception as e:
+            logger.error(f"Failed to send progress for request {self.request_id}: {e}")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Mark the request cancelled and run its abort callbacks"""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks = list(self._abort_callbacks)
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Abort callback failed for request {self.request_id}: {e}")
+
+    def expire(self):
+        """Cancel the request because it ran past its deadline"""
+        self.timed_out = True
+        self.cancel()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if there is none"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @contextmanager
+    def abort_with(self, callback: Callable[[], None]) -> Iterator[None]:
+        """Run ``callback`` if the request is cancelled while the block executes"""
+        with self._lock:
+            already_cancelled = self._cancelled.is_set()
+            if not already_cancelled:
+                self._abort_callbacks.append(callback)
+        if already_cancelled:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._abort_callbacks:
+                    self._abort_callbacks.remove(callback)
+
+class WatchdogHandle:
+    """A callback scheduled on a Watchdog; ``cancel`` stops it from running"""
+
+    def __init__(self, callback: Callable[..., None], args: Tuple[Any, ...]):
+        self._callback = callback
+        self._args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _run(self):
+        if self.cancelled:
+            return
+        try:
+            self._callback(*self._args)
+        except Exception as e:
+            logger.error(f"Watchdog callback failed: {e}")
+
+class Watchdog:
+    """Runs callbacks at their deadlines on one shared daemon thread.
+
+    Calls with a deadline schedule their expiry here instead of starting a
+    timer thread each. Callbacks run on the watchdog thread, so they must
+    return quickly; the thread starts on first use.
+    """
 
     def __init__(self):
-        self.tts_engine = None
-        self.pygame_initialized = False
+        self._heap: List[Tuple[float, int, WatchdogHandle]] = []
+        self._ids = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay: float, callback: Callable[..., None], *args: Any) -> WatchdogHandle:
+        """Run ``callback(*args)`` after ``delay`` seconds unless the handle is cancelled first"""
+        handle = WatchdogHandle(callback, args)
+        with self._condition:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._ids), handle))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="deadline-watchdog", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return handle
+
+    def pending(self) -> int:
+        """Scheduled callbacks not yet run or cancelled"""
+        with self._condition:
+            return sum(not handle.cancelled for _, _, handle in self._heap)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                _, _, handle = heapq.heappop(self._heap)
+            handle._run()
+
+# Shared by every call with a deadline (tools and AudioClient jobs)
+deadline_watchdog = Watchdog()
+
+# MPEG audio bitrates (kbps) by [version is MPEG-1][bitrate index], Layer III only
+_MP3_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# How far into an MP3 to look for the first frame header
+_MP3_SCAN_BYTES = 64 * 1024
+
+def estimate_mp3_duration(data: Any) -> Optional[float]:
+    """Estimate the length in seconds of a constant-bitrate MP3 (such as gTTS output).
+
+    ``data`` may be any bytes-like object; only the start of it is copied.
+    """
+    length = len(data)
+    offset = 0
+    tag = bytes(data[:10])
+    if tag[:3] == b"ID3" and len(tag) >= 10:
+        # Skip the ID3v2 tag; its size is a 28-bit syncsafe integer
+        offset = 10 + ((tag[6] & 0x7f) << 21 | (tag[7] & 0x7f) << 14 | (tag[8] & 0x7f) << 7 | (tag[9] & 0x7f))
+
+    # The first frame header is near the start of the audio
+    head = bytes(data[offset:offset + _MP3_SCAN_BYTES])
+    sync = head.find(b"\xff")
+    while 0 <= sync < len(head) - 3:
+        header = head[sync + 1]
+        if header & 0xe0 == 0xe0 and (header >> 1) & 0x03 == 0x01:  # frame sync + Layer III
+            mpeg1 = (header >> 3) & 0x03 == 0x03
+            bitrate_index = head[sync + 2] >> 4
+            if 0 < bitrate_index < 15:
+                bitrate = _MP3_BITRATES[mpeg1][bitrate_index] * 1000
+                return (length - offset - sync) * 8 / bitrate
+        sync = head.find(b"\xff", sync + 1)
+    return None
+
+def estimate_wav_duration(data: Any) -> Optional[float]:
+    """Length in seconds of a WAV file, if its header can be read"""
+    try:
+        with wave.open(ClipReader(data)) as audio:
+            return audio.getnframes() / float(audio.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+
+def uses_gtts(text: str) -> bool:
+    """Chinese text is spoken with gTTS, everything else with pyttsx3"""
+    return re.search(r'[一-鿿]', text) is not None
+
+def decoded_size(sound) -> int:
+    """Bytes of PCM held by a pygame Sound, from its length and the mixer format"""
+    frequency, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency * channels * (abs(size) // 8))
+
+def cancelled_tool_result() -> Dict[str, Any]:
+    """MCP result for a call cancelled before it produced one"""
+    return {"content": [{"type": "text", "text": "Error: Request cancelled"}], "isError": True}
+
+def cancelled_result() -> Dict[str, Any]:
+    """AudioPlayer result for work abandoned because its request was cancelled"""
+    return {"success": False, "cancelled": True, "error": "Request cancelled"}
+
+# Speech cache limits unless configured otherwise
+DEFAULT_SPEECH_CACHE_MB = 256
+DEFAULT_SPEECH_CACHE_DAYS = 30
+DEFAULT_SOUND_CACHE_MB = 64
+# Seconds a background render (pre-warm, render-ahead) may take
+PRERENDER_TIMEOUT = 60.0
+
+class AudioPlayer:
+    """Handles audio playback operations; the TTS engine and mixer are initialized on first use"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._tts_engine = None
+        self._pygame_initialized = False
+        self._tts_loaded = False
+        self._pygame_loaded = False
+        self._tts_lock = threading.Lock()
+        self._pygame_lock = threading.Lock()
         self.current_sound = None
-        self._init_tts()
-        self._init_pygame()
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.voice_catalog = VoiceCatalog(self.cache_dir)
+        self.speech_cache: Optional[SpeechCache] = None
+        self.storage_codec = StorageCodec()
+        self.configure_speech_cache()
+        self.sound_cache: Optional[SoundCache] = None
+        self.configure_sound_cache()
+        # Concurrent requests for the same speech share one synthesis
+        self.synthesis = SingleFlight()
+        # Held while the engine or mixer is in use, so callers on different threads
+        # (the dispatcher's audio worker, an AudioClient) take turns on the device
+        self._device_lock = threading.RLock()
+
+    @contextmanager
+    def device(self, should_stop: Callable[[], bool] = lambda: False) -> Iterator[bool]:
+        """Hold the TTS engine and mixer for the block.
+
+        Yields False without the device if ``should_stop`` returns True while
+        waiting for another caller to finish.
+        """
+        # abandon_device may swap the lock while we hold it
+        lock = self._device_lock
+        while not lock.acquire(timeout=0.05):
+            if should_stop():
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            lock.release()
+
+    def abandon_device(self):
+        """Give the device to new callers; a caller stuck holding it keeps the old lock"""
+        self._device_lock = threading.RLock()
+
+    def configure_sound_cache(self, max_mb: Optional[float] = None):
+        """Set up the in-memory cache of decoded speech.
+
+        The budget defaults to AUDIO_SERVER_SOUND_CACHE_MB (64); 0 disables it.
+        """
+        if max_mb is None:
+            max_mb = float(os.environ.get("AUDIO_SERVER_SOUND_CACHE_MB", DEFAULT_SOUND_CACHE_MB))
+        self.sound_cache = SoundCache(int(max_mb * 1024 * 1024)) if max_mb > 0 else None
+
+    def configure_speech_cache(self, max_mb: Optional[float] = None, max_days: Optional[float] = None,
+                               codec: Optional[str] = None):
+        """Set up the cache of synthesized speech under ``cache_dir`` (size 0 disables it)"""
+        self.storage_codec = get_storage_codec(codec, self.decode_pcm)
+        if max_mb is None:
+            max_mb = float(os.environ.get("AUDIO_SERVER_SPEECH_CACHE_MB", DEFAULT_SPEECH_CACHE_MB))
+        if max_days is None:
+            max_days = float(os.environ.get("AUDIO_SERVER_SPEECH_CACHE_DAYS", DEFAULT_SPEECH_CACHE_DAYS))
+        if not self.cache_dir or max_mb <= 0:
+            self.speech_cache = None
+            return
+        self.speech_cache = SpeechCache(os.path.join(self.cache_dir, "speech"),
+                                        int(max_mb * 1024 * 1024), max_days * 24 * 3600)
+
+    def decode_pcm(self, data: bytes, fmt: str) -> Tuple[bytes, int, int]:
+        """Decode audio with the mixer: interleaved 16-bit samples, sample rate, channels"""
+        if not self.pygame_initialized:
+            raise RuntimeError("pygame mixer not available")
+        rate, size, channels = pygame.mixer.get_init()
+        if size != -16:
+            raise RuntimeError(f"Mixer sample format is {size}, not signed 16-bit")
+        return pygame.mixer.Sound(file=ClipReader(data)).get_raw(), rate, channels
+
+    @property
+    def tts_engine(self):
+        """The pyttsx3 engine, initialized on first access (None if unavailable)"""
+        if not self._tts_loaded:
+            with self._tts_lock:
+                if not self._tts_loaded:
+                    self._init_tts()
+                    self._tts_loaded = True
+        return self._tts_engine
+
+    @property
+    def pygame_initialized(self) -> bool:
+        """Whether the pygame mixer is ready, initializing it on first access"""
+        if not self._pygame_loaded:
+            with self._pygame_lock:
+                if not self._pygame_loaded:
+                    self._init_pygame()
+                    self._pygame_loaded = True
+        return self._pygame_initialized
 
     def _init_tts(self):
         """Initialize text-to-speech engine"""
         try:
-            self.tts_engine = pyttsx3.init()
+            engine = _load_pyttsx3().init()
             # Set default properties
-            self.tts_engine.setProperty('rate', 150)  # Speed of speech
-            self.tts_engine.setProperty('volume', 0.8)  # Volume level (0.0 to 1.0)
+            engine.setProperty('rate', 150)  # Speed of speech
+            engine.setProperty('volume', 0.8)  # Volume level (0.0 to 1.0)
+            self._tts_engine = engine
             logger.info("TTS engine initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize TTS engine: {e}")
@@ -50,39 +430,40 @@ class AudioPlayer:
     def _init_pygame(self):
         """Initialize pygame mixer for audio file playback"""
         try:
-            # Suppress pygame welcome message
-            os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-            pygame.mixer.init()
-            self.pygame_initialized = True
+            _load_pygame().mixer.init()
+            self._pygame_initialized = True
             logger.info("Pygame mixer initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize pygame mixer: {e}")
 
-    def speak_text(self, text: str, rate: Optional[int] = None, volume: Optional[float] = None, voice_id: Optional[str] = None) -> Dict[str, Any]:
+    def speak_text(self, text: str, rate: Optional[int] = None, volume: Optional[float] = None, voice_id: Optional[str] = None,
+                   context: Optional[RequestContext] = None) -> Dict[str, Any]:
         """Convert text to speech and play it"""
+        context = context or RequestContext()
+        with self.device(lambda: context.cancelled) as held:
+            if not held or context.cancelled:
+                return cancelled_result()
+            return self._speak_text(text, rate, volume, voice_id, context)
+
+    def _speak_text(self, text: str, rate: Optional[int], volume: Optional[float], voice_id: Optional[str],
+                    context: RequestContext) -> Dict[str, Any]:
+
         # Simple check for Chinese characters
-        if re.search(r'[一-鿿]', text):
+        if uses_gtts(text):
             try:
                 # Use gTTS for Chinese text
                 if not self.pygame_initialized:
                     return {"success": False, "error": "Pygame not initialized for gTTS playback"}
-                
-                tts = gTTS(text, lang='zh-cn')
-                fp = BytesIO()
-                tts.write_to_fp(fp)
-                fp.seek(0)
-
-                pygame.mixer.music.load(fp)
-                if volume is not None:
-                    pygame.mixer.music.set_volume(max(0.0, min(1.0, volume)))
-                pygame.mixer.music.play()
-                
-                # Wait for playback to finish
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
 
+                key = speech_key(text, "gtts", lang="zh-cn", fmt="mp3")
+                cached = self._play_cached(key, "mp3", lambda report: self._fetch_gtts(text, context, progress=report),
+                                           volume, context,
+                                           {"text": text})
+                if cached is None:
+                    return cancelled_result()
                 return {
                     "success": True,
+                    "cached": cached,
                     "message": f"Successfully spoke Chinese text using gTTS: '{text[:50]}{'...' if len(text) > 50 else ''}'"
                 }
             except Exception as e:
@@ -97,16 +478,58 @@ class AudioPlayer:
             if voice_id:
                 self.tts_engine.setProperty('voice', voice_id)
 
-            # Set custom rate and volume if provided
+            # Set custom rate if provided
             if rate is not None:
                 self.tts_engine.setProperty('rate', rate)
+
+            if self.speech_cache and self.pygame_initialized:
+                # Render to audio once, then replay it from the cache; volume is applied by the mixer
+                recipe = {"text": text, "voice": self.tts_engine.getProperty('voice'),
+                          "rate": self.tts_engine.getProperty('rate')}
+                key, fmt = self._engine_key(text, recipe["voice"], recipe["rate"])
+                cached = self._play_cached(key, fmt, lambda report: self._render_pyttsx3(text, fmt, context, report),
+                                           volume, context, recipe)
+                if cached is None:
+                    return cancelled_result()
+                return {
+                    "success": True,
+                    "cached": cached,
+                    "message": f"Successfully spoke text: '{text[:50]}{'...' if len(text) > 50 else ''}'"
+                }
+
             if volume is not None:
                 self.tts_engine.setProperty('volume', max(0.0, min(1.0, volume)))
 
-            # Speak the text
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
+            # Speak the text; word callbacks report position and let a
+            # cancellation interrupt runAndWait
+            def on_word(name, location, length):
+                if context.cancelled:
+                    self.tts_engine.stop()
+                    return
+                context.report_progress(
+                    5 + 94 * min(1.0, location / max(1, len(text))), 100,
+                    f"Speaking character {location}/{len(text)}", throttle=True
+                )
 
+            def on_utterance_started(name):
+                context.report_progress(5, 100, "Playback started")
+
+            context.report_progress(0, 100, "Synthesizing speech with pyttsx3")
+            callbacks = [
+                self.tts_engine.connect('started-word', on_word),
+                self.tts_engine.connect('started-utterance', on_utterance_started),
+            ]
+            try:
+                with context.abort_with(self.tts_engine.stop):
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
+            finally:
+                for callback in callbacks:
+                    self.tts_engine.disconnect(callback)
+
+            if context.cancelled:
+                return cancelled_result()
+            context.report_progress(100, 100, "Finished")
             return {
                 "success": True,
                 "message": f"Successfully spoke text: '{text[:50]}{'...' if len(text) > 50 else ''}'"
@@ -114,27 +537,272 @@ class AudioPlayer:
         except Exception as e:
             return {"success": False, "error": f"Failed to speak text: {str(e)}"}
 
-    def list_voices(self) -> Dict[str, Any]:
-        """List available TTS voices"""
+    def _engine_key(self, text: str, voice: Optional[str], rate: Optional[int]):
+        """Speech cache key and audio format of ``text`` rendered by pyttsx3"""
+        driver = driver_name(self.tts_engine)
+        fmt = "aiff" if driver == "nsss" else "wav"
+        return speech_key(text, f"pyttsx3-{driver}", voice=voice, rate=rate, fmt=fmt), fmt
+
+    def prerender(self, text: str, rate: Optional[int] = None, voice_id: Optional[str] = None,
+                  lang: Optional[str] = None, timeout: float = PRERENDER_TIMEOUT,
+                  should_stop: Callable[[], bool] = lambda: False) -> Dict[str, Any]:
+        """Synthesize ``text`` into the speech cache under the key speak_text uses, without playing it"""
+        if not self.speech_cache:
+            return {"success": False, "error": "Speech cache is disabled"}
+        context = RequestContext()
+        context.deadline = time.monotonic() + timeout
+        try:
+            # Chinese text only touches the network, so any thread may pre-render it; the rest needs the audio worker
+            if uses_gtts(text):
+                key = speech_key(text, "gtts", lang="zh-cn", fmt="mp3")
+                if self.speech_cache.contains(key, self.storage_codec.format_for("mp3")):
+                    return {"success": True, "cached": True}
+                if self._synthesize(key, "mp3", lambda report: self._fetch_gtts(text, context, should_stop, report),
+                                    should_stop) is None:
+                    return {"success": False, "error": "Pre-render cancelled"}
+                return {"success": True, "cached": False}
+
+            with self.device(should_stop) as held:
+                if not held:
+                    return {"success": False, "error": "Pre-render cancelled"}
+                engine = self.tts_engine
+                if not engine:
+                    return {"success": False, "error": "TTS engine not available"}
+                if not voice_id and lang:
+                    voices, _ = self.voice_catalog.query(engine, language=lang, limit=1)
+                    if not voices:
+                        return {"success": False, "error": f"No voice for language '{lang}'"}
+                    voice_id = voices[0]["id"]
+
+                # Render with the phrase's settings, then restore the engine's own
+                previous = {"voice": engine.getProperty('voice'), "rate": engine.getProperty('rate')}
+                settings = {"voice": voice_id or previous["voice"],
+                            "rate": rate if rate is not None else previous["rate"]}
+                key, fmt = self._engine_key(text, settings["voice"], settings["rate"])
+                if self.speech_cache.contains(key, self.storage_codec.format_for(fmt)):
+                    return {"success": True, "cached": True}
+                try:
+                    for name, value in settings.items():
+                        engine.setProperty(name, value)
+                    data = self._synthesize(key, fmt, lambda report: self._render_pyttsx3(text, fmt, context, report),
+                                            should_stop)
+                finally:
+                    for name, value in previous.items():
+                        engine.setProperty(name, value)
+                if data is None:
+                    return {"success": False, "error": "Pre-render cancelled"}
+                return {"success": True, "cached": False}
+        except Exception as e:
+            return {"success": False, "error": f"Failed to pre-render '{text[:50]}': {str(e)}"}
+
+    def _play_cached(self, key: str, fmt: str, render: Callable[[Callable[..., None]], Optional[bytes]],
+                     volume: Optional[float], context: RequestContext, recipe: Dict[str, Any]) -> Optional[bool]:
+        """Play ``key``'s speech from memory, disk or ``render``; whether it was cached, None if cancelled"""
+        if self.speech_cache:
+            self.speech_cache.record_use(key, fmt, recipe)
+        sound = self.sound_cache.get(key) if self.sound_cache else None
+        if sound is not None:
+            return True if self._play_sound(sound, volume, context) else None
+
+        stored_fmt = self.storage_codec.format_for(fmt)
+        data = self.speech_cache.get(key, stored_fmt) if self.speech_cache else None
+        if data is None:
+            rendered = self._synthesize(key, fmt, render, lambda: context.cancelled, context.report_progress)
+            if rendered is None:
+                return None
+            return False if self._play_speech(*rendered, volume, context) else None
+
+        if self.sound_cache:
+            try:
+                sound = pygame.mixer.Sound(file=ClipReader(data))
+            except Exception as e:
+                logger.debug(f"Could not decode cached speech, streaming it instead: {e}")
+            else:
+                self.sound_cache.put(key, sound, decoded_size(sound))
+                return True if self._play_sound(sound, volume, context) else None
+        return True if self._play_speech(data, stored_fmt, volume, context) else None
+
+    def prefetch(self, limit: int, should_stop: Callable[[], bool] = lambda: False) -> Dict[str, Any]:
+        """Decode the ``limit`` most requested clips into memory; returns recipes of those evicted from disk"""
+        if not self.speech_cache:
+            return {"loaded": 0, "missing": []}
+        with self.device(should_stop) as held:
+            if not held:
+                return {"loaded": 0, "missing": []}
+            return self._prefetch(limit, should_stop)
+
+    def _prefetch(self, limit: int, should_stop: Callable[[], bool]) -> Dict[str, Any]:
+        decode = self.sound_cache is not None and self.pygame_initialized
+        budget = self.sound_cache.max_bytes if decode else 0
+        loaded, missing = [], []
+        for clip in self.speech_cache.hot_clips(limit):
+            if should_stop():
+                break
+            entry = self.sound_cache.peek(clip["key"]) if decode else None
+            if entry is None:
+                data = self.speech_cache.get(clip["key"], self.storage_codec.format_for(clip["fmt"]), touch=False)
+                if data is None:
+                    missing.append(clip["recipe"])
+                    continue
+                if not decode:
+                    continue
+                try:
+                    sound = pygame.mixer.Sound(file=ClipReader(data))
+                except Exception as e:
+                    logger.debug(f"Could not decode cached speech for prefetch: {e}")
+                    continue
+                entry = sound, decoded_size(sound)
+            if entry[1] <= budget:
+                budget -= entry[1]
+                loaded.append((clip["key"], entry))
+        for key, (sound, size) in reversed(loaded):
+            self.sound_cache.put(key, sound, size)
+        return {"loaded": len(loaded), "missing": missing}
+
+    def _synthesize(self, key: str, fmt: str, render: Callable[[Callable[..., None]], Optional[bytes]],
+                    should_stop: Callable[[], bool],
+                    progress: Optional[Callable[..., None]] = None) -> Optional[Tuple[bytes, str]]:
+        """Render and store the audio for ``key`` once for all concurrent callers; None if the render was cancelled"""
+        def flight():
+            data = render(lambda *args, **kwargs: self.synthesis.report(key, *args, **kwargs))
+            if data is None or not self.speech_cache:
+                return None if data is None else (data, fmt)
+            try:
+                stored = self.storage_codec.encode(data, fmt), self.storage_codec.format_for(fmt)
+            except Exception as e:
+                logger.warning(f"Could not convert speech to {self.storage_codec.name}, not caching it: {e}")
+                return data, fmt
+            self.speech_cache.put(key, stored[1], stored[0])
+            return stored
+
+        return self.synthesis.do(key, flight, should_stop, progress)
+
+    def _play_sound(self, sound, volume: Optional[float], context: RequestContext) -> bool:
+        """Play a decoded clip on a mixer channel until it ends; False if cancelled"""
+        # Cached sounds are shared, so always reset their volume
+        sound.set_volume(1.0 if volume is None else max(0.0, min(1.0, volume)))
+        duration = sound.get_length()
+        channel = sound.play()
+        if channel is None:
+            raise RuntimeError("No free mixer channel")
+        self.current_sound = channel
+        try:
+            with context.abort_with(channel.stop):
+                context.report_progress(50, 100, "Playback started")
+                started = time.monotonic()
+                clock = pygame.time.Clock()
+                while channel.get_busy():
+                    clock.tick(10)
+                    if duration:
+                        position = min(duration, time.monotonic() - started)
+                        context.report_progress(
+                            50 + 49 * position / duration, 100,
+                            f"Playing {position:.1f}s / {duration:.1f}s", throttle=True
+                        )
+        finally:
+            self.current_sound = None
+
+        if context.cancelled:
+            return False
+        context.report_progress(100, 100, "Finished")
+        return True
+
+    def _fetch_gtts(self, text: str, context: RequestContext, should_stop: Callable[[], bool] = lambda: False,
+                    progress: Optional[Callable[..., None]] = None) -> Optional[bytes]:
+        """Download Chinese speech from gTTS as MP3 (None if cancelled or ``should_stop`` says so).
+
+        Progress goes to ``progress`` if given, else to the request.
+        """
+        report = progress or context.report_progress
+        tts = _load_gtts()(text, lang='zh-cn', timeout=context.remaining())
+        try:
+            # gTTS splits long text into one request per ~100 characters
+            total_chunks = len(tts._tokenize(text))
+        except Exception:
+            total_chunks = 0
+        report(0, 100, "Synthesizing speech with gTTS")
+        fp = BytesIO()
+        # Fetch chunk by chunk so a cancellation stops the download early
+        for index, audio_chunk in enumerate(tts.stream(), start=1):
+            if context.cancelled or should_stop():
+                return None
+            fp.write(audio_chunk)
+            if total_chunks:
+                report(45 * min(1.0, index / total_chunks), 100, f"Fetched chunk {index}/{total_chunks}")
+        return fp.getvalue()
+
+    def _render_pyttsx3(self, text: str, fmt: str, context: RequestContext,
+                        progress: Optional[Callable[..., None]] = None) -> Optional[bytes]:
+        """Synthesize ``text`` to audio bytes with pyttsx3 without playing it (None if cancelled)"""
+        (progress or context.report_progress)(0, 100, "Synthesizing speech with pyttsx3")
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        try:
+            with context.abort_with(self.tts_engine.stop):
+                self.tts_engine.save_to_file(text, path)
+                self.tts_engine.runAndWait()
+            if context.cancelled:
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+    def _play_speech(self, data: Any, fmt: str, volume: Optional[float], context: RequestContext) -> bool:
+        """Play rendered speech on the music channel until it ends; False if cancelled.
+
+        ``data`` is bytes or a memoryview into the speech cache; the mixer
+        streams from it without a copy.
+        """
+        duration = estimate_mp3_duration(data) if fmt == "mp3" else estimate_wav_duration(data)
+        pygame.mixer.music.load(ClipReader(data), fmt)
+        if volume is not None:
+            pygame.mixer.music.set_volume(max(0.0, min(1.0, volume)))
+
+        with context.abort_with(pygame.mixer.music.stop):
+            pygame.mixer.music.play()
+            context.report_progress(50, 100, "Playback started")
+
+            # Wait for playback to finish
+            clock = pygame.time.Clock()
+            while pygame.mixer.music.get_busy():
+                clock.tick(10)
+                if duration:
+                    position = min(duration, pygame.mixer.music.get_pos() / 1000.0)
+                    context.report_progress(
+                        50 + 49 * position / duration, 100,
+                        f"Playing {position:.1f}s / {duration:.1f}s", throttle=True
+                    )
+
+        if context.cancelled:
+            return False
+        context.report_progress(100, 100, "Finished")
+        return True
+
+    def list_voices(self, language: Optional[str] = None, gender: Optional[str] = None, name: Optional[str] = None,
+                    offset: int = 0, limit: Optional[int] = None, refresh: bool = False) -> Dict[str, Any]:
+        """List available TTS voices, optionally filtered and paged (see VoiceCatalog.query)"""
         if not self.tts_engine:
             return {"success": False, "error": "TTS engine not available"}
         
         try:
-            voices = self.tts_engine.getProperty('voices')
-            voice_list = []
-            for voice in voices:
-                voice_list.append({
-                    "id": voice.id,
-                    "name": voice.name,
-                    "lang": voice.languages,
-                    "gender": voice.gender
-                })
-            return {"success": True, "voices": voice_list}
+            with self.device():
+                voices, total = self.voice_catalog.query(self.tts_engine, language, gender, name, offset, limit,
+                                                         refresh)
+            return {"success": True, "voices": voices, "total": total, "offset": offset}
         except Exception as e:
             return {"success": False, "error": f"Failed to list voices: {str(e)}"}
 
-    def play_audio_file(self, file_path: str, volume: Optional[float] = None) -> Dict[str, Any]:
+    def play_audio_file(self, file_path: str, volume: Optional[float] = None,
+                        context: Optional[RequestContext] = None) -> Dict[str, Any]:
         """Play an audio file"""
+        context = context or RequestContext()
+        with self.device(lambda: context.cancelled) as held:
+            if not held or context.cancelled:
+                return cancelled_result()
+            return self._play_audio_file(file_path, volume, context)
+
+    def _play_audio_file(self, file_path: str, volume: Optional[float], context: RequestContext) -> Dict[str, Any]:
         if not self.pygame_initialized:
             return {"success": False, "error": "Audio system not initialized"}
 
@@ -162,11 +830,15 @@ class AudioPlayer:
     def stop_audio(self) -> Dict[str, Any]:
         """Stop current audio playback"""
         try:
-            if self.pygame_initialized:
+            # Nothing to stop in a part of the stack that was never loaded
+            if self._pygame_initialized:
                 pygame.mixer.music.stop()
+            channel = self.current_sound
+            if channel is not None:
+                channel.stop()
 
-            if self.tts_engine:
-                self.tts_engine.stop()
+            if self._tts_engine:
+                self._tts_engine.stop()
 
             return {"success": True, "message": "Audio playback stopped"}
         except Exception as e:
@@ -175,303 +847,1234 @@ class AudioPlayer:
     def get_audio_status(self) -> Dict[str, Any]:
         """Get current audio playback status"""
         try:
+            # Like stop_audio, report on the stack as it is instead of loading it
             status = {
-                "tts_available": self.tts_engine is not None,
-                "pygame_available": self.pygame_initialized,
+                "tts_available": self._tts_engine is not None,
+                "pygame_available": self._pygame_initialized,
+                "tts_initialized": self._tts_loaded,
+                "pygame_initialized": self._pygame_loaded,
                 "music_playing": False
             }
 
-            if self.pygame_initialized:
-                status["music_playing"] = pygame.mixer.music.get_busy()
+            if self._pygame_initialized:
+                channel = self.current_sound
+                status["music_playing"] = pygame.mixer.music.get_busy() or bool(channel and channel.get_busy())
+            if self.speech_cache:
+                status["speech_cache"] = dict(self.speech_cache.stats(), coalesced=self.synthesis.shared,
+                                              codec=self.storage_codec.name)
+            if self.sound_cache:
+                status["sound_cache"] = self.sound_cache.stats()
 
             return {"success": True, "status": status}
         except Exception as e:
             return {"success": False, "error": f"Failed to get audio status: {str(e)}"}
 
+    def warm_up(self, phrase: Optional[str] = None,
+                should_stop: Callable[[], bool] = lambda: False) -> Dict[str, float]:
+        """Bring up the mixer and TTS engine, load the voice list and pre-render ``phrase``.
+
+        Returns the seconds each step took. ``should_stop`` is checked between
+        steps so a real request waiting for the audio worker cuts warmup short.
+        """
+        def render():
+            # Synthesize to a scratch file without playing it, which loads the driver's voice data
+            if not phrase or not self.tts_engine:
+                return
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                self.tts_engine.save_to_file(phrase, path)
+                self.tts_engine.runAndWait()
+            finally:
+                os.unlink(path)
+
+        timings: Dict[str, float] = {}
+        with self.device(should_stop) as held:
+            if held:
+                self._warm_up_steps(render, should_stop, timings)
+        return timings
+
+    def _warm_up_steps(self, render: Callable[[], None], should_stop: Callable[[], bool], timings: Dict[str, float]):
+        steps = (
+            ("mixer", lambda: self.pygame_initialized),
+            ("tts_engine", lambda: self.tts_engine),
+            ("voices", self.list_voices),
+            ("render", render),
+        )
+        for name, func in steps:
+            if should_stop():
+                break
+            start = time.monotonic()
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Warmup step '{name}' failed: {e}")
+            timings[name] = time.monotonic() - start
+
+# JSON Schema "type" keywords mapped to the Python types that satisfy them
+_SCHEMA_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+def _compile_property(name: str, schema: Dict[str, Any]) -> Callable[[Any], Optional[str]]:
+    """Compile one property schema into a check returning an error message or None"""
+    type_name = schema.get("type")
+    python_types = _SCHEMA_TYPES.get(type_name)
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    enum = schema.get("enum")
+    numeric = type_name in ("integer", "number")
+
+    def check(value: Any) -> Optional[str]:
+        if python_types is not None:
+            # bool is an int subclass, but JSON booleans are not numbers
+            if not isinstance(value, python_types) or (numeric and isinstance(value, bool)):
+                if not (type_name == "integer" and isinstance(value, float) and value.is_integer()):
+                    return f"'{name}' must be of type {type_name}"
+        if minimum is not None and value < minimum:
+            return f"'{name}' must be >= {minimum}"
+        if maximum is not None and value > maximum:
+            return f"'{name}' must be <= {maximum}"
+        if enum is not None and value not in enum:
+            return f"'{name}' must be one of {enum}"
+        return None
+
+    return check
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], List[str]]:
+    """Compile a tool inputSchema into a validator returning a list of errors.
+
+    Supports the subset of JSON Schema the tools use: required properties and
+    per-property type, minimum, maximum and enum. Unknown properties pass
+    through untouched.
+    """
+    required = tuple(schema.get("required", ()))
+    checks = {name: _compile_property(name, prop) for name, prop in schema.get("properties", {}).items()}
+
+    def validate(arguments: Dict[str, Any]) -> List[str]:
+        if not isinstance(arguments, dict):
+            return ["arguments must be an object"]
+        errors = [f"'{name}' is required" for name in required if name not in arguments]
+        for name, value in arguments.items():
+            check = checks.get(name)
+            if check is not None and value is not None:
+                error = check(value)
+                if error:
+                    errors.append(error)
+        return errors
+
+    return validate
+
+# Accepted by every tool to override its deadline for one call
+TIMEOUT_MS_SCHEMA = {
+    "type": "integer",
+    "description": "Abort the call if it runs longer than this many milliseconds (default: the tool's deadline)",
+    "minimum": 1
+}
+
+class Tool:
+    """A registered tool: its MCP definition, compiled validator and handler"""
+
+    def __init__(self, name: str, description: str, input_schema: Dict[str, Any],
+                 handler: Callable[[Dict[str, Any], RequestContext], Dict[str, Any]], blocking: bool = False,
+                 timeout: Optional[float] = None):
+        self.name = name
+        input_schema = dict(input_schema, properties=dict(input_schema.get("properties", {}),
+                                                          timeout_ms=TIMEOUT_MS_SCHEMA))
+        self.definition = {
+            "name": name,
+            "description": description,
+            "inputSchema": input_schema
+        }
+        self.validate = compile_schema(input_schema)
+        self.handler = handler
+        # Blocking tools hold the audio device and run on the audio worker
+        self.blocking = blocking
+        # Deadline in seconds (None = unbounded)
+        self.timeout = timeout
+
+class ToolRegistry:
+    """Name -> Tool mapping; new tools register here instead of editing the dispatcher"""
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        # Bumped on every change so cached tools/list payloads can be invalidated
+        self.version = 0
+
+    def register(self, name: str, description: str, input_schema: Dict[str, Any],
+                 handler: Callable[[Dict[str, Any], RequestContext], Dict[str, Any]], blocking: bool = False,
+                 timeout: Optional[float] = None) -> Tool:
+        """Register (or replace) a tool"""
+        tool = Tool(name, description, input_schema, handler, blocking, timeout)
+        self._tools[name] = tool
+        self.version += 1
+        return tool
+
+    def get(self, name: Optional[str]) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._tools
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(list(self._tools.values()))
+
+    def definitions(self) -> List[Dict[str, Any]]:
+        return [tool.definition for tool in self._tools.values()]
+
+def tool_result(text: str, is_error: bool = False) -> Dict[str, Any]:
+    """MCP tool result holding a single text item"""
+    return {
+        "content": [{"type": "text", "text": text}],
+        "isError": is_error
+    }
+
+def tool_error(result: Dict[str, Any]) -> Dict[str, Any]:
+    """MCP error result for a failed AudioPlayer call"""
+    return tool_result(f"Error: {result.get('error', 'Unknown error')}", is_error=True)
+
+# Voices per list_voices page unless the caller passes a limit
+VOICE_PAGE_SIZE = 50
+
+EMPTY_SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": []
+}
+
+def _parse_assignments(spec: str, expected: str) -> Dict[str, float]:
+    """Parse "a=1,b=2.5" into a dict of floats; ``expected`` names the form in errors"""
+    values = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected {expected}, got '{item.strip()}'")
+        values[name.strip()] = float(value)
+    return values
+
+def parse_tool_timeouts(spec: str) -> Dict[str, float]:
+    """Parse "speak_text=60,play_audio_file=300" into per-tool deadlines in seconds"""
+    return _parse_assignments(spec, "TOOL=SECONDS")
+
+def parse_session_weights(spec: str) -> Dict[str, float]:
+    """Parse "claude-desktop=2,*=0.5" into scheduling weights by client name ("*" for other clients)"""
+    weights = _parse_assignments(spec, "CLIENT=WEIGHT")
+    for name, weight in weights.items():
+        if weight <= 0:
+            raise ValueError(f"Session weight for '{name}' must be positive, got {weight:g}")
+    return weights
+
 class MCPAudioServer:
     """Simple MCP-compatible Audio Server"""
 
+    # How long a tool may ignore its expired deadline before the dispatcher gives up on it
+    HUNG_GRACE = 2.0
+
     def __init__(self):
         self.audio_player = AudioPlayer()
-        self.tools = {
-            "speak_text": {
-                "name": "speak_text",
-                "description": "Convert text to speech and play it through the system audio. Supports multiple languages and voice selection (for non-Chinese text).",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "text": {
-                            "type": "string",
-                            "description": "The text to convert to speech and play"
-                        },
-                        "rate": {
-                            "type": "integer",
-                            "description": "Speech rate (words per minute, default: 150)",
-                            "minimum": 50,
-                            "maximum": 300
-                        },
-                        "volume": {
-                            "type": "number",
-                            "description": "Volume level (0.0 to 1.0, default: 0.8)",
-                            "minimum": 0.0,
-                            "maximum": 1.0
-                        },
-                        "voice_id": {
-                            "type": "string",
-                            "description": "The ID of the voice to use (for non-Chinese text). See list_voices() for available IDs."
-                        }
+        self.registry = ToolRegistry()
+        self._register_builtin_tools()
+        self.timeout_counts: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        # Extra "Name: value" lines for get_audio_status (e.g. from the dispatcher)
+        self.status_providers: List[Callable[[], List[str]]] = []
+        # Set by the dispatcher: queues phrases for background pre-warming, returns how many were queued
+        self.prewarmer: Optional[Callable[[List[Dict[str, Any]]], int]] = None
+        self.prewarm_file: Optional[str] = None
+        env_timeouts = os.environ.get("AUDIO_SERVER_TOOL_TIMEOUTS")
+        if env_timeouts:
+            self.set_tool_timeouts(parse_tool_timeouts(env_timeouts))
+
+    @property
+    def tools(self) -> Dict[str, Dict[str, Any]]:
+        """Tool definitions by name"""
+        return {definition["name"]: definition for definition in self.registry.definitions()}
+
+    def _register_builtin_tools(self):
+        register = self.registry.register
+        register(
+            "speak_text",
+            "Convert text to speech and play it through the system audio. Supports multiple languages and voice selection (for non-Chinese text).",
+            {
+                "type": "object",
+                "properties": {
+                    "text": {
+                        "type": "string",
+                        "description": "The text to convert to speech and play"
                     },
-                    "required": ["text"]
-                }
+                    "rate": {
+                        "type": "integer",
+                        "description": "Speech rate (words per minute, default: 150)",
+                        "minimum": 50,
+                        "maximum": 300
+                    },
+                    "volume": {
+                        "type": "number",
+                        "description": "Volume level (0.0 to 1.0, default: 0.8)",
+                        "minimum": 0.0,
+                        "maximum": 1.0
+                    },
+                    "voice_id": {
+                        "type": "string",
+                        "description": "The ID of the voice to use (for non-Chinese text). See list_voices() for available IDs."
+                    }
+                },
+                "required": ["text"]
             },
-            "list_voices": {
-                "name": "list_voices",
-                "description": "List available text-to-speech voices for non-Chinese languages.",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
+            self._speak_text,
+            blocking=True,
+            timeout=120.0
+        )
+        register(
+            "list_voices",
+            "List available text-to-speech voices for non-Chinese languages.",
+            {
+                "type": "object",
+                "properties": {
+                    "language": {
+                        "type": "string",
+                        "description": "Only voices for this language tag or prefix (e.g. 'en' or 'en-us')"
+                    },
+                    "gender": {
+                        "type": "string",
+                        "description": "Only voices of this gender (e.g. 'female')"
+                    },
+                    "name": {
+                        "type": "string",
+                        "description": "Only voices whose name or ID contains this text"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of matching voices to skip (default: 0)",
+                        "minimum": 0
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Maximum number of voices to return (default: {VOICE_PAGE_SIZE})",
+                        "minimum": 1,
+                        "maximum": 500
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "Re-read the voice list from the TTS driver instead of the cache"
+                    }
+                },
+                "required": []
             },
-            "play_audio_file": {
-                "name": "play_audio_file",
-                "description": "Play an audio file through the system audio",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path to the audio file to play"
-                        },
-                        "volume": {
-                            "type": "number",
-                            "description": "Volume level (0.0 to 1.0)",
-                            "minimum": 0.0,
-                            "maximum": 1.0
-                        }
+            self._list_voices,
+            blocking=True,
+            timeout=30.0
+        )
+        register(
+            "play_audio_file",
+            "Play an audio file through the system audio",
+            {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "Path to the audio file to play"
                     },
-                    "required": ["file_path"]
-                }
+                    "volume": {
+                        "type": "number",
+                        "description": "Volume level (0.0 to 1.0)",
+                        "minimum": 0.0,
+                        "maximum": 1.0
+                    }
+                },
+                "required": ["file_path"]
             },
-            "stop_audio": {
-                "name": "stop_audio",
-                "description": "Stop current audio playback",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
+            self._play_audio_file,
+            blocking=True,
+            timeout=900.0
+        )
+        register(
+            "stop_audio",
+            "Stop current audio playback",
+            EMPTY_SCHEMA,
+            self._stop_audio,
+            timeout=5.0
+        )
+        register(
+            "get_audio_status",
+            "Get current audio system status and playback information",
+            EMPTY_SCHEMA,
+            self._get_audio_status,
+            timeout=5.0
+        )
+        register(
+            "prewarm_cache",
+            "Pre-synthesize phrases into the speech cache in the background so speaking them later is instant.",
+            {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "Phrase file to load (default: the server's --prewarm file)"
+                    },
+                    "phrases": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Phrases to pre-synthesize, each optionally followed by ' | ' and voice=, lang= and rate= options as in a phrase file"
+                    }
+                },
+                "required": []
             },
-            "get_audio_status": {
-                "name": "get_audio_status",
-                "description": "Get current audio system status and playback information",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
+            self._prewarm_cache,
+        )
+
+    def initialize_result(self) -> Dict[str, Any]:
+        """Result of the initialize handshake"""
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {
+                    "listChanged": False
                 }
+            },
+            "serverInfo": {
+                "name": "audio-server",
+                "version": "1.0.0"
             }
         }
 
     def list_tools(self) -> Dict[str, Any]:
         """List available tools"""
         return {
-            "tools": list(self.tools.values())
+            "tools": self.registry.definitions()
         }
 
-    def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Call a tool with given arguments"""
-        try:
-            if name == "speak_text":
-                text = arguments.get("text", "")
-                rate = arguments.get("rate")
-                volume = arguments.get("volume")
-                voice_id = arguments.get("voice_id")
-
-                if not text:
-                    return {
-                        "content": [{"type": "text", "text": "Error: No text provided"}],
-                        "isError": True
-                    }
+    def is_blocking(self, name: Optional[str]) -> bool:
+        """Whether a tool holds the audio device while it runs"""
+        tool = self.registry.get(name)
+        return tool is not None and tool.blocking
 
-                result = self.audio_player.speak_text(text, rate, volume, voice_id)
-                if result.get("success"):
-                    return {
-                        "content": [{"type": "text", "text": result.get("message", "Speech completed successfully")}],
-                        "isError": False
-                    }
-                else:
-                    return {
-                        "content": [{"type": "text", "text": f"Error: {result.get("error", "Unknown error")}"}],
-                        "isError": True
-                    }
-            
-            elif name == "list_voices":
-                result = self.audio_player.list_voices()
-                if result.get("success"):
-                    voices = result.get("voices", [])
-                    # Format the output for better readability
-                    voice_text = "Available Voices:\n" + "\n".join(
-                        [f"- ID: {v["id"]}\n  Name: {v["name"]}\n  Lang: {v["lang"]}\n  Gender: {v["gender"]}" for v in voices]
-                    )
-                    return {
-                        "content": [{"type": "text", "text": voice_text}],
-                        "isError": False
-                    }
-                else:
-                    return {
-                        "content": [{"type": "text", "text": f"Error: {result.get("error", "Unknown error")}"}],
-                        "isError": True
-                    }
+    def set_tool_timeouts(self, timeouts: Dict[str, float]):
+        """Override tool deadlines (seconds; 0 removes the deadline)"""
+        for name, seconds in timeouts.items():
+            tool = self.registry.get(name)
+            if tool is None:
+                raise ValueError(f"Unknown tool '{name}'")
+            tool.timeout = seconds or None
 
-            elif name == "play_audio_file":
-                file_path = arguments.get("file_path", "")
-                volume = arguments.get("volume")
+    def timeout_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Deadline and number of timeouts for every tool"""
+        with self._stats_lock:
+            counts = dict(self.timeout_counts)
+        return {
+            tool.name: {"timeout": tool.timeout, "timeouts": counts.get(tool.name, 0)}
+            for tool in self.registry
+        }
 
-                if not file_path:
-                    return {
-                        "content": [{"type": "text", "text": "Error: No file path provided"}],
-                        "isError": True
-                    }
+    def timeout_result(self, name: str, timeout: Optional[float]) -> Dict[str, Any]:
+        """MCP error result for a call aborted at its deadline"""
+        return tool_result(f"Error: '{name}' timed out after {(timeout or 0) * 1000:.0f} ms", is_error=True)
 
-                result = self.audio_player.play_audio_file(file_path, volume)
-                if result.get("success"):
-                    return {
-                        "content": [{"type": "text", "text": result.get("message", "Audio file played successfully")}],
-                        "isError": False
-                    }
-                else:
-                    return {
-                        "content": [{"type": "text", "text": f"Error: {result.get('error', 'Unknown error')}"}],
-                        "isError": True
-                    }
+    def call_tool(self, name: str, arguments: Dict[str, Any], context: Optional[RequestContext] = None) -> Dict[str, Any]:
+        """Call a tool with given arguments, enforcing its deadline"""
+        tool = self.registry.get(name)
+        if tool is None:
+            return tool_result(f"Error: Unknown tool '{name}'", is_error=True)
 
-            elif name == "stop_audio":
-                result = self.audio_player.stop_audio()
-                if result.get("success"):
-                    return {
-                        "content": [{"type": "text", "text": result.get("message", "Audio stopped successfully")}],
-                        "isError": False
-                    }
-                else:
-                    return {
-                        "content": [{"type": "text", "text": f"Error: {result.get('error', 'Unknown error')}"}],
-                        "isError": True
-                    }
+        arguments = arguments if arguments is not None else {}
+        errors = tool.validate(arguments)
+        if errors:
+            return tool_result(f"Error: Invalid arguments for '{name}': {'; '.join(errors)}", is_error=True)
 
-            elif name == "get_audio_status":
-                result = self.audio_player.get_audio_status()
-                if result.get("success"):
-                    status = result.get("status", {})
-                    status_text = f"Audio Status:\n- TTS Available: {status.get('tts_available', False)}\n- Pygame Available: {status.get('pygame_available', False)}\n- Music Playing: {status.get('music_playing', False)}"
-                    return {
-                        "content": [{"type": "text", "text": status_text}],
-                        "isError": False
-                    }
-                else:
-                    return {
-                        "content": [{"type": "text", "text": f"Error: {result.get('error', 'Unknown error')}"}],
-                        "isError": True
-                    }
+        context = context or RequestContext()
+        timeout = tool.timeout
+        if arguments.get("timeout_ms") is not None:
+            timeout = arguments["timeout_ms"] / 1000.0
+        if not timeout:
+            return self._invoke(tool, arguments, context)
 
-            else:
-                return {
-                    "content": [{"type": "text", "text": f"Error: Unknown tool '{name}'"}],
-                    "isError": True
-                }
+        context.timeout = timeout
+        context.deadline = time.monotonic() + timeout
+        finished = threading.Event()
+        watchdog = deadline_watchdog.schedule(timeout, self._on_deadline, name, context, finished)
+        try:
+            result = self._invoke(tool, arguments, context)
+        finally:
+            finished.set()
+            watchdog.cancel()
+        if context.timed_out:
+            return self.timeout_result(name, timeout)
+        return result
 
+    def _invoke(self, tool: Tool, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        try:
+            return tool.handler(arguments, context)
         except Exception as e:
-            logger.error(f"Error calling tool '{name}': {e}")
-            return {
-                "content": [{"type": "text", "text": f"Tool execution error: {str(e)}"}],
-                "isError": True
-            }
+            logger.error(f"Error calling tool '{tool.name}': {e}")
+            return tool_result(f"Tool execution error: {str(e)}", is_error=True)
+
+    def _on_deadline(self, name: str, context: RequestContext, finished: threading.Event):
+        """Watchdog callback: abort a call that ran past its deadline"""
+        if finished.is_set():
+            return
+        with self._stats_lock:
+            self.timeout_counts[name] = self.timeout_counts.get(name, 0) + 1
+        logger.warning(f"Tool '{name}' exceeded its {context.timeout:.1f}s deadline, aborting")
+        context.expire()
+        deadline_watchdog.schedule(self.HUNG_GRACE, self._on_hung, name, context, finished)
+
+    def _on_hung(self, name: str, context: RequestContext, finished: threading.Event):
+        """Watchdog callback: a tool stuck in a call that cannot be aborted is abandoned by the dispatcher"""
+        if not finished.is_set() and context.on_hung is not None:
+            logger.error(f"Tool '{name}' still running {self.HUNG_GRACE:.1f}s after its deadline")
+            context.on_hung()
+
+    def _speak_text(self, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        text = arguments.get("text", "")
+        if not text:
+            return tool_result("Error: No text provided", is_error=True)
+
+        result = self.audio_player.speak_text(
+            text, arguments.get("rate"), arguments.get("volume"), arguments.get("voice_id"), context
+        )
+        if not result.get("success"):
+            return tool_error(result)
+        return tool_result(result.get("message", "Speech completed successfully"))
+
+    def _list_voices(self, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        offset = arguments.get("offset") or 0
+        result = self.audio_player.list_voices(
+            arguments.get("language"), arguments.get("gender"), arguments.get("name"),
+            offset, arguments.get("limit") or VOICE_PAGE_SIZE, bool(arguments.get("refresh"))
+        )
+        if not result.get("success"):
+            return tool_error(result)
+
+        voices = result.get("voices", [])
+        total = result.get("total", len(voices))
+        if not voices:
+            return tool_result(f"No voices match the given filters ({total} matching, offset {offset}).")
+
+        # Format the output for better readability
+        end = offset + len(voices)
+        header = f"Available Voices ({offset + 1}-{end} of {total}"
+        header += f"; pass offset={end} for more):" if end < total else "):"
+        voice_text = header + "\n" + "\n".join(
+            f"- ID: {v['id']}\n  Name: {v['name']}\n  Lang: {v['lang']}\n  Gender: {v['gender']}"
+            for v in voices
+        )
+        return tool_result(voice_text)
+
+    def _play_audio_file(self, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        file_path = arguments.get("file_path", "")
+        if not file_path:
+            return tool_result("Error: No file path provided", is_error=True)
+
+        result = self.audio_player.play_audio_file(file_path, arguments.get("volume"), context)
+        if not result.get("success"):
+            return tool_error(result)
+        return tool_result(result.get("message", "Audio file played successfully"))
+
+    def _stop_audio(self, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        result = self.audio_player.stop_audio()
+        if not result.get("success"):
+            return tool_error(result)
+        return tool_result(result.get("message", "Audio stopped successfully"))
+
+    def _get_audio_status(self, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        result = self.audio_player.get_audio_status()
+        if not result.get("success"):
+            return tool_error(result)
+
+        status = result.get("status", {})
+
+        def availability(name: str) -> str:
+            if not status.get(f"{name}_initialized", True):
+                return "not initialized"
+            return str(status.get(f"{name}_available", False))
+
+        timeouts = ", ".join(
+            f"{name}={stats['timeouts']}" for name, stats in self.timeout_stats().items() if stats["timeouts"]
+        )
+        status_text = (
+            f"Audio Status:\n- TTS Available: {availability('tts')}"
+            f"\n- Pygame Available: {availability('pygame')}"
+            f"\n- Music Playing: {status.get('music_playing', False)}"
+            f"\n- Timeouts: {timeouts or 'none'}"
+        )
+        cache = status.get("speech_cache")
+        if cache:
+            status_text += (
+                f"\n- Speech Cache: {cache['entries']} entries ({cache['codec']}),"
+                f" {cache['bytes'] / (1024 * 1024):.1f} MB, {cache['hits']} hits, {cache['misses']} misses,"
+                f" {cache['coalesced']} coalesced"
+            )
+        sounds = status.get("sound_cache")
+        if sounds:
+            status_text += (
+                f"\n- Sound Cache: {sounds['entries']} clips, {sounds['bytes'] / (1024 * 1024):.1f}"
+                f" of {sounds['max_bytes'] / (1024 * 1024):.0f} MB, hit ratio {sounds['hit_ratio']:.0%}"
+            )
+        for provider in list(self.status_providers):
+            status_text += "".join(f"\n- {line}" for line in provider())
+        return tool_result(status_text)
+
+    def _prewarm_cache(self, arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        if self.prewarmer is None:
+            return tool_result("Error: Pre-warming needs the async dispatcher", is_error=True)
+        phrases = []
+        for index, line in enumerate(arguments.get("phrases") or []):
+            try:
+                phrase = parse_phrase(line)
+            except ValueError as e:
+                return tool_result(f"Error: Invalid phrase {index + 1}: {e}", is_error=True)
+            if phrase is not None:
+                phrases.append(phrase)
+        file_path = arguments.get("file_path") or (None if phrases else self.prewarm_file)
+        if file_path:
+            try:
+                phrases += load_phrase_file(file_path)
+            except (OSError, ValueError) as e:
+                return tool_result(f"Error: Cannot load phrase file: {e}", is_error=True)
+        if not phrases:
+            return tool_result("Error: No phrases given and no --prewarm file configured", is_error=True)
+        if self.audio_player.speech_cache is None:
+            return tool_result("Error: Speech cache is disabled", is_error=True)
+        queued = self.prewarmer(phrases)
+        return tool_result(f"Pre-warming {queued} phrases in the background; get_audio_status shows progress")
+
+# A response object, or a response already encoded by the dispatcher's codec
+Response = Union[Dict[str, Any], bytes]
+
+# Methods whose result is cached as bytes (tools/list is re-encoded when a tool is registered)
+STATIC_METHODS = ("initialize", "tools/list")
+
+# Blocking tool calls admitted (queued or running) before new ones are refused;
+# AUDIO_SERVER_MAX_QUEUE overrides it and 0 means unbounded
+DEFAULT_MAX_QUEUE = 16
+
+# JSON-RPC error code for a call refused because the audio queue is full
+SERVER_BUSY = -32000
+
+# JSON-RPC error code for a call refused by the session's rate limit
+RATE_LIMITED = -32001
+
+# Phrase pre-rendered by the warmup that follows initialize
+DEFAULT_WARMUP_PHRASE = "Ready."
+
+# Concurrent gTTS downloads for pre-warming and render-ahead
+RENDER_WORKERS = 4
+
+# Seconds between refreshes of the hot set when the audio queue drains
+PREFETCH_INTERVAL = 600.0
+
+def process_request(request: Dict[str, Any], mcp_server: Optional[MCPAudioServer] = None) -> Optional[Dict[str, Any]]:
+    """Process a decoded JSON-RPC request and return the response object (None for notifications)"""
+    mcp_server = mcp_server or get_server()
+    method = request.get("method")
+    params = request.get("params", {})
+    request_id = request.get("id")
+
+    # Handle notifications (no response expected)
+    if method and method.startswith("notifications/"):
+        logger.info(f"Received notification: {method}")
+        return None  # No response for notifications
+
+    # Ensure request_id is never None for responses
+    if request_id is None:
+        request_id = 0
+
+    if method == "initialize":
+        result = mcp_server.initialize_result()
+    elif method == "tools/list":
+        result = mcp_server.list_tools()
+    elif method == "tools/call":
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        # The tool result is already in MCP format
+        result = mcp_server.call_tool(tool_name, arguments)
+    elif method == "resources/list":
+        # Return empty resources list - this server doesn't provide resources
+        result = {"resources": []}
+    elif method == "prompts/list":
+        # Return empty prompts list - this server doesn't provide prompts
+        result = {"prompts": []}
+    else:
+        result = {"success": False, "error": f"Unknown method: {method}"}
+
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "result": result
+    }
+
+def error_response(request_id: Any, code: int, message: str, data: Any = None) -> Dict[str, Any]:
+    """Build a JSON-RPC error response"""
+    # Ensure request_id is never None
+    if request_id is None:
+        request_id = 0
+
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": error
+    }
+
+def safe_process_request(request: Any, mcp_server: Optional[MCPAudioServer] = None) -> Optional[Dict[str, Any]]:
+    """Process one request, turning failures into JSON-RPC error responses"""
+    if not isinstance(request, dict):
+        return error_response(None, -32600, "Invalid Request")
+    try:
+        return process_request(request, mcp_server)
+    except Exception as e:
+        logger.error(f"JSON-RPC error: {e}")
+        return error_response(request.get("id"), -32603, "Internal error", str(e))
 
 def handle_json_rpc_request(request_data: str) -> str:
-    """Handle JSON-RPC requests"""
+    """Handle JSON-RPC requests (a single request or a batch array)"""
     try:
         request = json.loads(request_data)
-        method = request.get("method")
-        params = request.get("params", {})
-        request_id = request.get("id")
+    except Exception as e:
+        logger.error(f"JSON-RPC error: {e}")
+        return json.dumps(error_response(0, -32603, "Internal error", str(e)))
+
+    if isinstance(request, list):
+        if not request:
+            return json.dumps(error_response(None, -32600, "Invalid Request", "Empty batch"))
+        responses = [r for r in (safe_process_request(item) for item in request) if r is not None]
+        # A batch made only of notifications gets no response at all
+        return json.dumps(responses) if responses else ""
+
+    response = safe_process_request(request)
+    return json.dumps(response) if response is not None else ""
+
+class ClientSession:
+    """One connected client: the stdio peer, an HTTP session or a socket connection"""
 
-        # Handle notifications (no response expected)
-        if method and method.startswith("notifications/"):
-            logger.info(f"Received notification: {method}")
-            return ""  # No response for notifications
+    def __init__(self, session_id: str = "stdio", notify: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 weight: float = 1.0):
+        self.session_id = session_id
+        self.notify = notify
+        self.weight = weight
+
+class AsyncJSONRPCServer:
+    """Concurrent JSON-RPC dispatcher: one task per message, audio calls on a single worker thread"""
+
+    def __init__(self, mcp_server: Optional[MCPAudioServer] = None, control_workers: int = 4,
+                 codec: Optional[JSONCodec] = None, max_queue: Optional[int] = None,
+                 session_rate: Optional[float] = None, session_burst: Optional[float] = None,
+                 warmup: Optional[bool] = None, warmup_phrase: Optional[str] = None,
+                 prewarm_file: Optional[str] = None, prefetch: Optional[int] = None,
+                 session_weights: Optional[Dict[str, float]] = None):
+        self.mcp_server = mcp_server or get_server()
+        self.codec = codec or get_codec()
+        if max_queue is None:
+            max_queue = int(os.environ.get("AUDIO_SERVER_MAX_QUEUE", DEFAULT_MAX_QUEUE))
+        self.max_queue = max_queue
+        # Blocking calls admitted to the audio worker and not finished yet
+        self.audio_queue_depth = 0
+        self.rejected_count = 0
+        if session_rate is None:
+            session_rate = float(os.environ.get("AUDIO_SERVER_SESSION_RATE", 0))
+        if session_burst is None:
+            session_burst = float(os.environ.get("AUDIO_SERVER_SESSION_BURST", 10))
+        self.scheduler = FairScheduler(session_rate, session_burst)
+        if session_weights is None:
+            session_weights = parse_session_weights(os.environ.get("AUDIO_SERVER_SESSION_WEIGHTS", ""))
+        self.session_weights = session_weights
+        if warmup is None:
+            warmup = os.environ.get("AUDIO_SERVER_WARMUP", "0") not in ("", "0")
+        self.warmup = warmup
+        self.warmup_phrase = warmup_phrase or os.environ.get("AUDIO_SERVER_WARMUP_PHRASE", DEFAULT_WARMUP_PHRASE)
+        # Seconds per warmup step once it has finished
+        self.warmup_timings: Optional[Dict[str, float]] = None
+        self._warmup_future = None
+        self.mcp_server.status_providers.append(self.status_lines)
+        self.audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-worker")
+        self.control_executor = ThreadPoolExecutor(max_workers=control_workers, thread_name_prefix="control-worker")
+        # gTTS downloads for pre-warm and render-ahead
+        self.render_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="render")
+        # Text -> contexts of the queued speak_text calls waiting on its render-ahead
+        self._render_waiters: Dict[str, List[RequestContext]] = {}
+        self._render_lock = threading.Lock()
+        self.prewarm_file = prewarm_file or os.environ.get("AUDIO_SERVER_PREWARM_FILE") or None
+        self.mcp_server.prewarm_file = self.prewarm_file
+        self.mcp_server.prewarmer = self.start_prewarm
+        self.prewarm_stats = {"queued": 0, "rendered": 0, "cached": 0, "failed": 0}
+        self._prewarm_lock = threading.Lock()
+        # pyttsx3 phrases waiting for the audio worker, submitted one at a time
+        self._prewarm_pending: Deque[Dict[str, Any]] = deque()
+        self._prewarm_running = False
+        # Number of most requested clips to keep warm (0 = off)
+        if prefetch is None:
+            prefetch = int(os.environ.get("AUDIO_SERVER_PREFETCH", 0))
+        self.prefetch = prefetch
+        self.prefetch_stats = {"runs": 0, "loaded": 0, "rerendered": 0}
+        self._last_prefetch: Optional[float] = None
+        if self.prewarm_file:
+            self.start_prewarm(load_phrase_file(self.prewarm_file))
+        if self.prefetch:
+            self.start_prefetch()
+        self._tasks: Set[asyncio.Task] = set()
+        # method -> (registry version, encoded result) for responses that never change
+        self._static_results: Dict[str, Any] = {}
+        # Tool calls still running (or queued), keyed by (session id, JSON-RPC id)
+        self.in_flight: Dict[Any, RequestContext] = {}
+
+    def executor_for(self, tool_name: Optional[str]) -> ThreadPoolExecutor:
+        """Pick the executor a tool call should run on"""
+        if self.mcp_server.is_blocking(tool_name):
+            return self.audio_executor
+        return self.control_executor
+
+    def _static_result(self, method: str) -> bytes:
+        """Encoded result of initialize or tools/list, serialized once and reused"""
+        version = self.mcp_server.registry.version
+        cached = self._static_results.get(method)
+        if cached is None or cached[0] != version:
+            if method == "initialize":
+                result = self.mcp_server.initialize_result()
+            else:
+                result = self.mcp_server.list_tools()
+            cached = (version, self.codec.dumps(result))
+            self._static_results[method] = cached
+        return cached[1]
 
-        # Ensure request_id is never None for responses
+    def encode(self, response: Any) -> bytes:
+        """Encode a response object, batch list or pre-encoded response"""
+        if isinstance(response, bytes):
+            return response
+        if isinstance(response, list):
+            return b"[" + b",".join(self.encode(item) for item in response) + b"]"
+        return self.codec.dumps(response)
+
+    def cancel_request(self, request_id: Any, reason: Optional[str] = None, session_id: str = "stdio") -> bool:
+        """Cancel an in-flight request; returns False if it is unknown or already done"""
+        context = self.in_flight.get((session_id, request_id))
+        if context is None:
+            logger.info(f"Ignoring cancellation of unknown request {request_id!r}")
+            return False
+        logger.info(f"Cancelling request {request_id!r}" + (f": {reason}" if reason else ""))
+        context.cancel()
+        return True
+
+    def cancel_session(self, session_id: str):
+        """Cancel everything a departing session still has in flight and forget its scheduling state"""
+        for (owner, request_id), context in list(self.in_flight.items()):
+            if owner == session_id:
+                logger.info(f"Cancelling request {request_id!r}: session {session_id} closed")
+                context.cancel()
+        self.scheduler.forget(session_id)
+
+    def reject_busy(self, request_id: Any, tool_name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Refuse a blocking call because the audio queue is full"""
+        self.rejected_count += 1
+        logger.warning(f"Audio queue full ({self.audio_queue_depth}/{self.max_queue}), refusing {tool_name!r}")
         if request_id is None:
-            request_id = 0
+            # A notification cannot be told it was refused
+            return None
+        return error_response(request_id, SERVER_BUSY, "Server busy", {
+            "queueDepth": self.audio_queue_depth,
+            "maxQueue": self.max_queue
+        })
 
-        if method == "initialize":
-            result = {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {
-                        "listChanged": False
-                    }
-                },
-                "serverInfo": {
-                    "name": "audio-server",
-                    "version": "1.0.0"
-                }
-            }
-        elif method == "tools/list":
-            result = server.list_tools()
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            tool_result = server.call_tool(tool_name, arguments)
-
-            # Return the tool result directly (it's already in MCP format)
-            result = tool_result
-        elif method == "resources/list":
-            # Return empty resources list - this server doesn't provide resources
-            result = {"resources": []}
-        elif method == "prompts/list":
-            # Return empty prompts list - this server doesn't provide prompts
-            result = {"prompts": []}
-        else:
-            result = {"success": False, "error": f"Unknown method: {method}"}
-
-        # For tools/call, the result is already in the correct format
-        if method == "tools/call":
-            response = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": result
-            }
-        else:
-            response = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": result
-            }
+    def reject_rate_limited(self, request_id: Any, session: ClientSession, retry_after: float) -> Optional[Dict[str, Any]]:
+        """Refuse a blocking call because the session is over its rate limit"""
+        logger.warning(f"Session {session.session_id} is over its rate limit")
+        if request_id is None:
+            return None
+        return error_response(request_id, RATE_LIMITED, "Rate limited", {
+            "retryAfterMs": int(retry_after * 1000) + 1
+        })
 
-        return json.dumps(response)
+    def start_warmup(self):
+        """Warm up the audio stack on the audio worker (once)"""
+        if self._warmup_future is not None:
+            return
+        logger.info("Warming up the audio stack")
+        self._warmup_future = self.audio_executor.submit(
+            self.mcp_server.audio_player.warm_up, self.warmup_phrase, lambda: self.audio_queue_depth > 0
+        )
+        self._warmup_future.add_done_callback(self._warmup_done)
 
-    except Exception as e:
-        logger.error(f"JSON-RPC error: {e}")
+    def _warmup_done(self, future):
         try:
-            request_id = request.get("id") if 'request' in locals() else 0
-        except:
-            request_id = 0
+            self.warmup_timings = future.result()
+        except Exception as e:
+            logger.error(f"Warmup failed: {e}")
+            self.warmup_timings = {}
+            return
+        steps = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.warmup_timings.items())
+        logger.info(f"Warmup finished: {steps or 'skipped'}")
 
-        # Ensure request_id is never None
-        if request_id is None:
-            request_id = 0
+    def start_prewarm(self, phrases: List[Dict[str, Any]]) -> int:
+        """Pre-render phrases into the speech cache in the background; returns how many were queued.
+
+        Chinese phrases are downloaded from gTTS in parallel off the audio
+        worker. pyttsx3 phrases are submitted to the audio worker one at a
+        time, so real calls queue behind at most one render.
+        """
+        if self.mcp_server.audio_player.speech_cache is None:
+            logger.warning("Speech cache is disabled, nothing to pre-warm")
+            return 0
+        logger.info(f"Pre-warming {len(phrases)} phrases")
+        with self._prewarm_lock:
+            self.prewarm_stats["queued"] += len(phrases)
+            for phrase in phrases:
+                if uses_gtts(phrase["text"]):
+                    self.render_executor.submit(self._prewarm_one, phrase)
+                else:
+                    self._prewarm_pending.append(phrase)
+        self._prewarm_next()
+        return len(phrases)
+
+    def start_prefetch(self):
+        """Warm the most requested clips on the audio worker, yielding to real calls.
+
+        Clips evicted from disk are rendered again through pre-warming.
+        """
+        player = self.mcp_server.audio_player
+        if player.speech_cache is None:
+            return
+        self._last_prefetch = time.monotonic()
+        try:
+            future = self.audio_executor.submit(player.prefetch, self.prefetch, lambda: self.audio_queue_depth > 0)
+        except RuntimeError:
+            # Shutting down
+            return
+        future.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Prefetch failed: {e}")
+            return
+        with self._prewarm_lock:
+            self.prefetch_stats["runs"] += 1
+            self.prefetch_stats["loaded"] = result["loaded"]
+            self.prefetch_stats["rerendered"] += len(result["missing"])
+        logger.info(f"Prefetch: {result['loaded']} hot clips in memory, {len(result['missing'])} to render again")
+        if result["missing"]:
+            self.start_prewarm(result["missing"])
+
+    def prefetch_when_idle(self):
+        """Refresh the hot set once the audio queue has drained, at most every PREFETCH_INTERVAL"""
+        if (self.prefetch and self.audio_queue_depth == 0 and self._last_prefetch is not None
+                and time.monotonic() - self._last_prefetch >= PREFETCH_INTERVAL):
+            self.start_prefetch()
+
+    def render_ahead(self, arguments: Dict[str, Any], context: RequestContext):
+        """Start downloading a queued speak_text call's Chinese speech while it waits"""
+        text = arguments.get("text") if isinstance(arguments, dict) else None
+        player = self.mcp_server.audio_player
+        if not isinstance(text, str) or not text or player.speech_cache is None or not uses_gtts(text):
+            return
+        with self._render_lock:
+            waiters = self._render_waiters.get(text)
+            if waiters is not None:
+                waiters.append(context)
+                return
+            waiters = self._render_waiters[text] = [context]
+
+        def should_stop() -> bool:
+            with self._render_lock:
+                return all(waiter.cancelled or waiter.remaining() == 0.0 for waiter in waiters)
+
+        def finished(_future):
+            with self._render_lock:
+                if self._render_waiters.get(text) is waiters:
+                    del self._render_waiters[text]
+
+        try:
+            future = self.render_executor.submit(player.prerender, text, should_stop=should_stop)
+        except RuntimeError:
+            # Shutting down
+            finished(None)
+            return
+        future.add_done_callback(finished)
+
+    def _leave_render_ahead(self, arguments: Dict[str, Any], context: RequestContext):
+        """Stop counting a finished speak_text call as waiting on its render-ahead"""
+        text = arguments.get("text") if isinstance(arguments, dict) else None
+        with self._render_lock:
+            waiters = self._render_waiters.get(text) if isinstance(text, str) else None
+            if waiters and context in waiters:
+                waiters.remove(context)
+
+    def _prewarm_next(self, _future=None):
+        with self._prewarm_lock:
+            if _future is None and self._prewarm_running:
+                return
+            if not self._prewarm_pending:
+                self._prewarm_running = False
+                return
+            phrase = self._prewarm_pending.popleft()
+            self._prewarm_running = True
+        try:
+            future = self.audio_executor.submit(self._prewarm_one, phrase)
+        except RuntimeError:
+            # Shutting down
+            return
+        future.add_done_callback(self._prewarm_next)
+
+    def _prewarm_one(self, phrase: Dict[str, Any]):
+        result = self.mcp_server.audio_player.prerender(
+            phrase["text"], phrase.get("rate"), phrase.get("voice"), phrase.get("lang")
+        )
+        if not result.get("success"):
+            logger.warning(f"Pre-warm failed: {result.get('error')}")
+            outcome = "failed"
+        else:
+            outcome = "cached" if result.get("cached") else "rendered"
+        with self._prewarm_lock:
+            self.prewarm_stats[outcome] += 1
+
+    def status_lines(self) -> List[str]:
+        """Queue, warmup and per-session scheduling lines for get_audio_status"""
+        lines = [f"Audio Queue: {self.audio_queue_depth}/{self.max_queue or 'unbounded'} "
+                 f"({self.rejected_count} refused)"]
+        if self.warmup:
+            if self.warmup_timings is not None:
+                warmup = f"done in {sum(self.warmup_timings.values()) * 1000:.0f} ms"
+            else:
+                warmup = "running" if self._warmup_future is not None else "waiting for initialize"
+            lines.append(f"Warmup: {warmup}")
+        with self._prewarm_lock:
+            stats = dict(self.prewarm_stats)
+        if stats["queued"]:
+            done = stats["rendered"] + stats["cached"] + stats["failed"]
+            lines.append(f"Prewarm: {done}/{stats['queued']} phrases ({stats['rendered']} rendered, "
+                         f"{stats['cached']} already cached, {stats['failed']} failed)")
+        if self.prefetch:
+            with self._prewarm_lock:
+                stats = dict(self.prefetch_stats)
+            lines.append(f"Prefetch: top {self.prefetch}, {stats['loaded']} clips in memory, "
+                         f"{stats['rerendered']} re-rendered")
+        for session_id, stats in self.scheduler.stats().items():
+            lines.append(
+                f"Session {session_id}: {stats['calls']} calls, wait avg {stats['waitAvgMs']} ms "
+                f"/ max {stats['waitMaxMs']} ms, {stats['serviceSeconds']}s audio, "
+                f"{stats['rateLimited']} rate limited"
+            )
+        return lines
+
+    def _run_tool(self, tool_name: Optional[str], arguments: Dict[str, Any], context: RequestContext) -> Dict[str, Any]:
+        """Executor entry point; skips work cancelled while it was queued"""
+        if context.cancelled:
+            return cancelled_tool_result()
+        return self.mcp_server.call_tool(tool_name, arguments, context)
+
+    async def _execute(self, tool_name: Optional[str], arguments: Dict[str, Any], context: RequestContext,
+                       blocking: bool) -> Dict[str, Any]:
+        """Run a tool call on its executor, giving up on one that ignores its deadline"""
+        loop = asyncio.get_running_loop()
+        while True:
+            executor = self.audio_executor if blocking else self.control_executor
+            future = loop.run_in_executor(executor, self._run_tool, tool_name, arguments, context)
+            hung = loop.create_future()
+            context.on_hung = lambda: loop.call_soon_threadsafe(lambda: hung.done() or hung.set_result(None))
+            await asyncio.wait((future, hung), return_when=asyncio.FIRST_COMPLETED)
+            if not future.done():
+                if blocking:
+                    self._replace_audio_worker(executor)
+                return self.mcp_server.timeout_result(tool_name, context.timeout)
+            if not future.cancelled():
+                return future.result()
+            if context.cancelled:
+                return cancelled_tool_result()
+            # Was queued on a worker that got replaced: run it on the new one
+
+    def _replace_audio_worker(self, stuck: ThreadPoolExecutor):
+        """Abandon an audio worker stuck in a tool call; queued calls move to a fresh one"""
+        if stuck is not self.audio_executor:
+            return
+        logger.error("Audio worker is stuck past a deadline; starting a new one")
+        self.mcp_server.audio_player.abandon_device()
+        self.audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-worker")
+        stuck.shutdown(wait=False, cancel_futures=True)
+
+    def assign_weight(self, session: ClientSession, params: Any):
+        """Give a session the weight configured for the client named in its ``initialize``"""
+        if not self.session_weights:
+            return
+        client_info = params.get("clientInfo") if isinstance(params, dict) else None
+        name = client_info.get("name") if isinstance(client_info, dict) else None
+        weight = self.session_weights.get(name, self.session_weights.get("*"))
+        if weight is not None:
+            session.weight = weight
+            logger.info(f"Session {session.session_id} ({name or 'unnamed client'}) has weight {weight:g}")
+
+    async def handle_request(self, request: Dict[str, Any], session: ClientSession,
+                             notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[Response]:
+        """Dispatch a decoded request, running tool calls off the event loop.
+
+        Progress notifications go to ``notify`` if given (a transport may route
+        them per request), otherwise to the session.
+        """
+        method = request.get("method")
+        if method == "notifications/cancelled":
+            params = request.get("params") or {}
+            self.cancel_request(params.get("requestId"), params.get("reason"), session.session_id)
+            return None
+
+        if method == "initialize":
+            self.assign_weight(session, request.get("params"))
+        if method == "initialize" and self.warmup and self._warmup_future is None:
+            # Runs once this task has written the initialize response
+            asyncio.get_running_loop().call_soon(self.start_warmup)
+
+        if method in STATIC_METHODS and "id" in request:
+            # Splice the cached result bytes around the request id
+            request_id = request["id"] if request["id"] is not None else 0
+            return (b'{"jsonrpc":"2.0","id":' + self.codec.dumps(request_id)
+                    + b',"result":' + self._static_result(method) + b"}")
+
+        if method != "tools/call":
+            # Other handshake and listing methods are cheap and answered inline
+            return process_request(request, self.mcp_server)
+
+        params = request.get("params", {})
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        request_id = request.get("id")
+
+        blocking = self.mcp_server.is_blocking(tool_name)
+        if blocking:
+            if self.max_queue and self.audio_queue_depth >= self.max_queue:
+                return self.reject_busy(request_id, tool_name)
+            retry_after = self.scheduler.admit(session.session_id)
+            if retry_after is not None:
+                return self.reject_rate_limited(request_id, session, retry_after)
+            self.audio_queue_depth += 1
 
-        error_response = {
+        progress_token = (params.get("_meta") or {}).get("progressToken")
+        context = RequestContext(request_id, progress_token, notify or session.notify)
+        key = (session.session_id, request_id)
+        if request_id is not None:
+            self.in_flight[key] = context
+        render_ahead = blocking and tool_name == "speak_text"
+        if render_ahead:
+            self.render_ahead(arguments, context)
+        try:
+            if blocking:
+                async with self.scheduler.turn(session.session_id, session.weight):
+                    result = await self._execute(tool_name, arguments, context, blocking)
+            else:
+                result = await self._execute(tool_name, arguments, context, blocking)
+        finally:
+            if blocking:
+                self.audio_queue_depth -= 1
+                self.prefetch_when_idle()
+            if render_ahead:
+                self._leave_render_ahead(arguments, context)
+            if self.in_flight.get(key) is context:
+                del self.in_flight[key]
+
+        if context.cancelled and not context.timed_out:
+            # MCP: no response is sent for a cancelled request
+            return None
+        return {
             "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {
-                "code": -32603,
-                "message": "Internal error",
-                "data": str(e)
-            }
+            "id": request_id if request_id is not None else 0,
+            "result": result
         }
-        return json.dumps(error_response)
+
+    async def handle_one(self, request: Any, session: ClientSession,
+                         notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[Response]:
+        """Handle one request, turning failures into JSON-RPC error responses"""
+        if not isinstance(request, dict):
+            return error_response(None, -32600, "Invalid Request")
+        try:
+            return await self.handle_request(request, session, notify)
+        except Exception as e:
+            logger.error(f"JSON-RPC error: {e}")
+            return error_response(request.get("id"), -32603, "Internal error", str(e))
+
+    async def handle_batch(self, requests: List[Any], session: ClientSession,
+                           notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Response]:
+        """Handle a batch array with its calls running concurrently.
+
+        Tasks are started in batch order, so audio tools still reach the audio
+        worker (and play) in the order the client listed them.
+        """
+        responses = await asyncio.gather(*(self.handle_one(request, session, notify) for request in requests))
+        return [response for response in responses if response is not None]
+
+    async def handle_decoded(self, request: Any, session: Optional[ClientSession] = None,
+                             notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> Any:
+        """Handle a decoded message (object or batch array); returns the response (see encode) or None"""
+        session = session or ClientSession()
+        if isinstance(request, list):
+            if not request:
+                return error_response(None, -32600, "Invalid Request", "Empty batch")
+            responses = await self.handle_batch(request, session, notify)
+            return responses or None
+        return await self.handle_one(request, session, notify)
+
+    async def handle_message(self, request_data: Union[bytes, str], session: Optional[ClientSession] = None,
+                             notify: Optional[Callable[[Dict[str, Any]], None]] = None) -> bytes:
+        """Decode one framed message, handle it and return the encoded response (b"" if none)"""
+        codec = self.codec
+        try:
+            request = codec.loads(request_data)
+        except Exception as e:
+            logger.error(f"JSON-RPC error: {e}")
+            return codec.dumps(error_response(0, -32603, "Internal error", str(e)))
+
+        response = await self.handle_decoded(request, session, notify)
+        return self.encode(response) if response is not None else b""
+
+    async def _handle_and_write(self, line: bytes, session: ClientSession, write: Callable[[bytes], None]):
+        response = await self.handle_message(line, session)
+        if response:  # Only write non-empty responses
+            write(response)
+
+    def _spawn(self, line: bytes, session: ClientSession, write: Callable[[bytes], None]):
+        task = asyncio.create_task(self._handle_and_write(line, session, write))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _spawn_all(self, lines: List[bytes], session: ClientSession, write: Callable[[bytes], None]):
+        for line in lines:
+            self._spawn(line, session, write)
+
+    async def serve_stdio(self):
+        """Read requests from stdin and answer them concurrently until EOF"""
+        loop = asyncio.get_running_loop()
+        eof = asyncio.Event()
+        writer = CoalescingWriter(sys.stdout.buffer)
+        session = ClientSession("stdio", lambda message: writer.write(self.codec.dumps(message)))
+
+        def on_lines(lines: List[bytes]):
+            # Runs on the reader thread; hand the whole chunk to the loop at once
+            loop.call_soon_threadsafe(self._spawn_all, lines, session, writer.write)
+
+        start_line_reader(sys.stdin.buffer, on_lines, lambda: loop.call_soon_threadsafe(eof.set))
+
+        try:
+            await eof.wait()
+            # Let in-flight requests finish before exiting on EOF
+            while self._tasks:
+                pending = list(self._tasks)
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._tasks.difference_update(pending)
+        finally:
+            writer.close()
+            self.shutdown()
+
+    def shutdown(self):
+        """Release worker threads and write out the usage counts not yet in the speech cache"""
+        self.audio_executor.shutdown(wait=False)
+        self.control_executor.shutdown(wait=False)
+        self.render_executor.shutdown(wait=False, cancel_futures=True)
+        if self.mcp_server.audio_player.speech_cache:
+            self.mcp_server.audio_player.speech_cache.flush_usage()
 
 def interactive_mode():
     """Run in interactive mode for testing"""
@@ -484,6 +2087,7 @@ def interactive_mode():
     print("  status - Get audio status", file=sys.stderr)
     print("  quit - Exit", file=sys.stderr)
     print(file=sys.stderr)
+    server = get_server()
 
     while True:
         try:
@@ -519,33 +2123,193 @@ def interactive_mode():
         except Exception as e:
             print(f"Error: {e}", file=sys.stderr)
 
+def cache_bundle_command(args: argparse.Namespace) -> int:
+    """Run --export-cache / --import-cache against the configured speech cache; returns the exit status"""
+    player = get_server().audio_player
+    if player.speech_cache is None:
+        print("Error: the speech cache is disabled", file=sys.stderr)
+        return 1
+    try:
+        if args.export_cache:
+            max_age = args.export_max_age_days * 24 * 3600 if args.export_max_age_days is not None else None
+            manifest = export_bundle(player.speech_cache, args.export_cache, args.export_min_uses, max_age,
+                                     player.storage_codec.name)
+            size = sum(clip["size"] for clip in manifest["clips"])
+            print(f"Exported {len(manifest['clips'])} clips ({size / (1024 * 1024):.1f} MB) to {args.export_cache}",
+                  file=sys.stderr)
+        if args.import_cache:
+            counts = import_bundle(player.speech_cache, args.import_cache, player.storage_codec.name)
+            print(f"Imported {counts['imported']} clips from {args.import_cache} "
+                  f"({counts['duplicate']} already cached, {counts['corrupt']} corrupt)", file=sys.stderr)
+            if counts["corrupt"]:
+                return 1
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def profile_startup(main_entered: float):
+    """Time each startup phase, including the lazily loaded audio stack, and report to stderr"""
+    phases = [("module imports (stdlib, transport, scheduler)", main_entered - _IMPORT_START)]
+
+    def timed(label: str, func: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return func()
+        except Exception as e:
+            label += f" [failed: {e}]"
+        finally:
+            phases.append((label, time.perf_counter() - start))
+
+    mcp_server = timed("MCPAudioServer() (tool registry)", get_server)
+    dispatcher = timed("dispatcher and codec", AsyncJSONRPCServer)
+    request = b'{"jsonrpc":"2.0","id":1,"method":"initialize","params":{}}'
+    timed("first initialize response", lambda: asyncio.run(dispatcher.handle_message(request)))
+    handshake = time.perf_counter() - _IMPORT_START
+    timed("import pyttsx3", _load_pyttsx3)
+    timed("import pygame", _load_pygame)
+    timed("import gtts", _load_gtts)
+    player = mcp_server.audio_player
+    timed("_init_tts (pyttsx3.init)", lambda: player.tts_engine)
+    timed("_init_pygame (mixer.init)", lambda: player.pygame_initialized)
+    dispatcher.shutdown()
+
+    total = time.perf_counter() - _IMPORT_START
+    width = max(len(label) for label, _ in phases)
+    print("Startup profile (ms, from module import):", file=sys.stderr)
+    for label, seconds in phases:
+        print(f"  {label:<{width}}  {seconds * 1000:8.1f}", file=sys.stderr)
+    print(f"  {'ready for initialize':<{width}}  {handshake * 1000:8.1f}", file=sys.stderr)
+    print(f"  {'audio stack ready':<{width}}  {total * 1000:8.1f}", file=sys.stderr)
+    print("For a per-module import breakdown run: python -X importtime audio_server.py --profile-startup",
+          file=sys.stderr)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="MCP Audio Server - audio playback for AI models")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--interactive", action="store_true", help="Run an interactive prompt for testing")
+    mode.add_argument("--http", action="store_true", help="Serve MCP over Streamable HTTP instead of stdio")
+    mode.add_argument("--daemon", action="store_true",
+                      help="Stay resident on a Unix socket for audio_proxy.py clients")
+    mode.add_argument("--profile-startup", action="store_true",
+                      help="Print a per-phase startup timing report to stderr and exit")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP port (default: 8765)")
+    parser.add_argument("--session-timeout", type=float, default=None, metavar="SECONDS",
+                        help="End HTTP sessions idle this long (default: 1800; 0 = never)")
+    parser.add_argument("--socket", default=None, help="Daemon socket path (default: per-user runtime dir)")
+    parser.add_argument("--codec", default=None, help="JSON codec: auto, orjson, msgspec or json")
+    parser.add_argument("--tool-timeout", action="append", default=[], metavar="TOOL=SECONDS",
+                        help="Override a tool's deadline (repeatable; 0 = no deadline)")
+    parser.add_argument("--warmup", action="store_true", default=None,
+                        help="Warm up the mixer, TTS engine and voice list right after initialize")
+    parser.add_argument("--warmup-phrase", default=None,
+                        help=f"Phrase pre-rendered during warmup (default: {DEFAULT_WARMUP_PHRASE!r})")
+    parser.add_argument("--prewarm", metavar="FILE", default=None,
+                        help="Pre-synthesize the phrases in FILE into the speech cache at startup")
+    parser.add_argument("--prefetch", type=int, metavar="N", default=None,
+                        help="Keep the N most requested clips warm: loaded into memory at startup and when idle, "
+                             "re-rendered if evicted (default: 0 = off)")
+    parser.add_argument("--session-rate", type=float, default=None,
+                        help="Audio calls per second allowed per session (default: unlimited)")
+    parser.add_argument("--session-weight", action="append", default=[], metavar="CLIENT=WEIGHT",
+                        help="Share of audio worker time for sessions of the named client, by the clientInfo name "
+                             "it sends in initialize ('*' for other clients; repeatable; default: 1)")
+    parser.add_argument("--session-burst", type=float, default=None,
+                        help="Audio calls a session may burst above its rate (default: 10)")
+    parser.add_argument("--max-queue", type=int, default=None,
+                        help=f"Audio calls queued before new ones get 'Server busy' (default: {DEFAULT_MAX_QUEUE}, 0 = unbounded)")
+    parser.add_argument("--speech-cache-mb", type=float, default=None,
+                        help=f"Size limit of the synthesized speech cache (default: {DEFAULT_SPEECH_CACHE_MB}, 0 = disabled)")
+    parser.add_argument("--speech-cache-days", type=float, default=None,
+                        help=f"Drop cached speech unused for this many days (default: {DEFAULT_SPEECH_CACHE_DAYS})")
+    parser.add_argument("--speech-cache-codec", choices=list(STORAGE_CODECS), default=None,
+                        help="Format cached speech is stored in: original (default), wav, vorbis or opus")
+    parser.add_argument("--export-cache", metavar="BUNDLE", default=None,
+                        help="Write the speech cache to a bundle file for other hosts, then exit")
+    parser.add_argument("--export-min-uses", type=float, metavar="N", default=None,
+                        help="Only export clips whose decayed request count is at least N")
+    parser.add_argument("--export-max-age-days", type=float, metavar="N", default=None,
+                        help="Only export clips used within the last N days")
+    parser.add_argument("--import-cache", metavar="BUNDLE", default=None,
+                        help="Add the clips of a bundle to the speech cache, skipping ones already cached, then exit")
+    parser.add_argument("--sound-cache-mb", type=float, default=None,
+                        help=f"Memory for decoded clips of repeated speech (default: {DEFAULT_SOUND_CACHE_MB}, 0 = disabled)")
+    return parser.parse_args(argv)
+
 def main():
     """Main function"""
-    if len(sys.argv) > 1 and sys.argv[1] == "--interactive":
+    main_entered = time.perf_counter()
+    args = parse_args()
+    configure_logging()
+    if args.profile_startup:
+        profile_startup(main_entered)
+        return
+    if args.interactive:
         interactive_mode()
-    else:
-        # JSON-RPC mode for MCP integration
-        logger.info("Starting MCP Audio Server in JSON-RPC mode...")
-        logger.info("Send JSON-RPC requests to stdin")
+        return
 
-        try:
-            while True:
-                line = sys.stdin.readline()
-                if not line:
-                    break
+    try:
+        for spec in args.tool_timeout:
+            get_server().set_tool_timeouts(parse_tool_timeouts(spec))
+        if any(value is not None for value in (args.speech_cache_mb, args.speech_cache_days, args.speech_cache_codec)):
+            get_server().audio_player.configure_speech_cache(args.speech_cache_mb, args.speech_cache_days,
+                                                             args.speech_cache_codec)
+        if args.sound_cache_mb is not None:
+            get_server().audio_player.configure_sound_cache(args.sound_cache_mb)
+        if args.export_cache or args.import_cache:
+            sys.exit(cache_bundle_command(args))
+        session_weights = None
+        if args.session_weight:
+            session_weights = {}
+            for spec in args.session_weight:
+                session_weights.update(parse_session_weights(spec))
+        dispatcher = AsyncJSONRPCServer(codec=get_codec(args.codec), max_queue=args.max_queue,
+                                        session_rate=args.session_rate, session_burst=args.session_burst,
+                                        session_weights=session_weights,
+                                        warmup=args.warmup, warmup_phrase=args.warmup_phrase,
+                                        prewarm_file=args.prewarm, prefetch=args.prefetch)
+        if args.http:
+            from http_transport import serve_http
 
-                response = handle_json_rpc_request(line.strip())
-                if response:  # Only print non-empty responses
-                    print(response)
-                    sys.stdout.flush()
+            logger.info("Starting MCP Audio Server in Streamable HTTP mode...")
+            asyncio.run(serve_http(dispatcher, args.host, args.port, session_timeout=args.session_timeout))
+        elif args.daemon:
+            from audio_proxy import default_socket_path
+            from unix_transport import serve_unix
 
-        except KeyboardInterrupt:
-            logger.info("Server stopped by user")
-        except Exception as e:
-            logger.error(f"Server error: {e}")
+            logger.info("Starting MCP Audio Server as a resident daemon...")
+            asyncio.run(serve_unix(dispatcher, args.socket or default_socket_path()))
+        else:
+            # JSON-RPC mode for MCP integration
+            logger.info("Starting MCP Audio Server in JSON-RPC mode...")
+            logger.info("Send JSON-RPC requests to stdin")
+            asyncio.run(dispatcher.serve_stdio())
+    except KeyboardInterrupt:
+        logger.info("Server stopped by user")
+    except Exception as e:
+        logger.error(f"Server error: {e}")
+
+_server: Optional[MCPAudioServer] = None
+_server_lock = threading.Lock()
+
+def get_server() -> MCPAudioServer:
+    """The shared MCPAudioServer, created on first use"""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = MCPAudioServer()
+    return _server
 
-# Initialize server
-server = MCPAudioServer()
+def __getattr__(name: str) -> Any:
+    # Keep ``audio_server.server`` working without building it at import time
+    if name == "server":
+        return get_server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
+    # Transports import this module by name; make them share this instance
+    sys.modules.setdefault("audio_server", sys.modules[__name__])
     main()
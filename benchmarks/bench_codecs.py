@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the stdio transport: messages/sec per JSON codec.
+
+Each round frames a block of newline-delimited requests with LineFramer,
+decodes every line and encodes a response, which is the per-message work the
+server does outside the audio tools themselves.
+
+Usage:
+    python benchmarks/bench_codecs.py [--messages 20000] [--rounds 5]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transport import JSONCodec, LineFramer, available_codecs
+
+def sample_payloads():
+    """Representative messages: small calls, long text, voice lists, base64 audio"""
+    return {
+        "small": {
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "get_audio_status", "arguments": {}}
+        },
+        "long_text": {
+            "jsonrpc": "2.0", "id": 2, "method": "tools/call",
+            "params": {"name": "speak_text", "arguments": {"text": "这是一个很长的测试句子。" * 400, "rate": 150}}
+        },
+        "voice_list": {
+            "jsonrpc": "2.0", "id": 3,
+            "result": {"voices": [
+                {"id": f"voice-{i}", "name": f"Voice {i}", "lang": ["en-us"], "gender": "female"}
+                for i in range(300)
+            ]}
+        },
+        "base64_audio": {
+            "jsonrpc": "2.0", "id": 4,
+            "result": {"content": [{"type": "audio", "mimeType": "audio/mpeg",
+                                    "data": base64.b64encode(os.urandom(256 * 1024)).decode("ascii")}]}
+        },
+    }
+
+def bench_codec(codec: JSONCodec, message, count: int, rounds: int) -> float:
+    """Best messages/sec over several rounds of frame + decode + encode"""
+    line = JSONCodec().dumps(message) + b"\n"
+    block = line * count
+    chunk = 64 * 1024
+    best = 0.0
+    for _ in range(rounds):
+        framer = LineFramer()
+        start = time.perf_counter()
+        for offset in range(0, len(block), chunk):
+            for frame in framer.feed(block[offset:offset + chunk]):
+                codec.dumps(codec.loads(frame))
+        elapsed = time.perf_counter() - start
+        best = max(best, count / elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stdio transport codecs")
+    parser.add_argument("--messages", type=int, default=20000, help="Small messages per round (large payloads scale down)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per measurement (best is reported)")
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    payloads = sample_payloads()
+    print(f"Codecs available: {', '.join(codecs)}")
+    print(f"{'payload':<14}{'bytes':>10}" + "".join(f"{name:>14}" for name in codecs))
+
+    for label, message in payloads.items():
+        size = len(JSONCodec().dumps(message))
+        # Keep each round to roughly the same number of bytes
+        count = max(20, min(args.messages, args.messages * 200 // size))
+        rates = [bench_codec(codec, message, count, args.rounds) for codec in codecs.values()]
+        print(f"{label:<14}{size:>10}" + "".join(f"{rate:>10,.0f} m/s" for rate in rates))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for JSON-RPC dispatch overhead.
+
+Measures requests/sec through AsyncJSONRPCServer.handle_message for the
+cached static methods (initialize, tools/list) and for a cheap tool call, so
+the cost of decoding, validation, dispatch and encoding can be compared
+without any audio work.
+
+Usage:
+    python benchmarks/bench_dispatch.py [--requests 20000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_server import AsyncJSONRPCServer, MCPAudioServer, tool_result
+from transport import JSONCodec
+
+def sample_requests():
+    """Requests that never touch the audio device"""
+    return {
+        "initialize": {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        "tools/list": {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+        "tools/call": {
+            "jsonrpc": "2.0", "id": 3, "method": "tools/call",
+            "params": {"name": "echo", "arguments": {"text": "ping"}}
+        },
+        "invalid_args": {
+            "jsonrpc": "2.0", "id": 4, "method": "tools/call",
+            "params": {"name": "echo", "arguments": {"text": 42}}
+        },
+    }
+
+async def bench_request(dispatcher: AsyncJSONRPCServer, line: bytes, count: int, rounds: int) -> float:
+    """Best requests/sec over several rounds of sequential handle_message calls"""
+    best = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(count):
+            await dispatcher.handle_message(line)
+        elapsed = time.perf_counter() - start
+        best = max(best, count / elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON-RPC dispatch overhead")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per measurement (best is reported)")
+    args = parser.parse_args()
+
+    server = MCPAudioServer()
+    server.registry.register(
+        "echo",
+        "Echo the given text",
+        {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]},
+        lambda arguments, context: tool_result(arguments["text"])
+    )
+    dispatcher = AsyncJSONRPCServer(server)
+    print(f"Codec: {dispatcher.codec.name}")
+
+    async def run():
+        for label, request in sample_requests().items():
+            line = JSONCodec().dumps(request)
+            rate = await bench_request(dispatcher, line, args.requests, args.rounds)
+            print(f"{label:<14}{rate:>12,.0f} req/s  ({1e6 / rate:.1f} µs/req)")
+
+    try:
+        asyncio.run(run())
+    finally:
+        dispatcher.shutdown()
+
+if __name__ == "__main__":
+    main()
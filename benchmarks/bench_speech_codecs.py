@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the speech cache's storage codecs: hit latency and bytes per second of speech.
+
+Each available codec converts the sample clips once, stores them in a
+SpeechCache in a temporary directory and then serves cache hits: the lookup
+plus decoding the clip with the pygame mixer, which is what replaying speech
+from disk costs. No audio is played.
+
+The samples are MP3 files given with --clip (such as saved gTTS output);
+without any, a few phrases are fetched from gTTS.
+
+Usage:
+    python benchmarks/bench_speech_codecs.py [--clip speech.mp3 ...] [--hits 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Decode without opening an audio device
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+import audio_server
+from audio_server import AudioPlayer, RequestContext
+from speech_cache import ClipReader, SpeechCache
+from speech_codec import available_storage_codecs
+
+PHRASES = ["构建完成", "测试失败，请检查日志", "部署已经完成，所有服务运行正常。"]
+
+def sample_clips(paths):
+    """MP3 clips from the given files, or fetched from gTTS"""
+    if paths:
+        clips = []
+        for path in paths:
+            with open(path, "rb") as f:
+                clips.append(f.read())
+        return clips
+    player = AudioPlayer(cache_dir="")
+    clips = [player._fetch_gtts(text, RequestContext()) for text in PHRASES]
+    if not all(clips):
+        sys.exit("Could not fetch samples from gTTS; pass MP3 files with --clip")
+    return clips
+
+def bench_codec(codec, clips, hits: int):
+    """(stored bytes per second of speech, ms to convert a clip, median and p95 ms per hit)"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory)
+        fmt = codec.format_for("mp3")
+        start = time.perf_counter()
+        for index, clip in enumerate(clips):
+            cache.put(f"clip{index}", fmt, codec.encode(clip, "mp3"))
+        convert_ms = (time.perf_counter() - start) * 1000 / len(clips)
+
+        latencies = []
+        for hit in range(hits):
+            start = time.perf_counter()
+            audio_server.pygame.mixer.Sound(file=ClipReader(cache.get(f"clip{hit % len(clips)}", fmt)))
+            latencies.append((time.perf_counter() - start) * 1000)
+        stored = cache.stats()["bytes"]
+
+    seconds = 0.0
+    for clip in clips:
+        samples, rate, channels = codec.decode(clip, "mp3")
+        seconds += len(samples) / (2 * channels * rate)
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    return stored / seconds, convert_ms, statistics.median(latencies), p95
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark speech cache storage codecs")
+    parser.add_argument("--clip", action="append", default=[], help="MP3 sample (repeatable; default: fetch from gTTS)")
+    parser.add_argument("--hits", type=int, default=200, help="Cache hits timed per codec")
+    args = parser.parse_args()
+
+    player = AudioPlayer(cache_dir="")
+    if not player.pygame_initialized:
+        sys.exit("pygame mixer not available")
+    codecs = available_storage_codecs(player.decode_pcm)
+    clips = sample_clips(args.clip)
+    print(f"Codecs available: {', '.join(codecs)}; {len(clips)} clips, mixer {audio_server.pygame.mixer.get_init()}")
+    print(f"{'codec':<10}{'bytes/s':>12}{'convert':>12}{'hit p50':>12}{'hit p95':>12}")
+
+    for name, codec in codecs.items():
+        rate, convert_ms, median, p95 = bench_codec(codec, clips, args.hits)
+        print(f"{name:<10}{rate:>12,.0f}{convert_ms:>9.1f} ms{median:>9.2f} ms{p95:>9.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: time from exec to the first initialize response.
+
+Spawns the server (or the daemon proxy) repeatedly, sends an initialize
+request on stdin and measures how long the first response line takes to
+arrive on stdout. Reports min/p50/p95/max; with --max-p95-ms it exits
+non-zero when p95 exceeds the budget, so it can guard against startup
+regressions in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 20] [--proxy] [--max-p95-ms 500]
+"""
+
+import argparse
+import math
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INITIALIZE = b'{"jsonrpc":"2.0","id":1,"method":"initialize","params":{}}\n'
+
+def time_first_response(command) -> float:
+    """Seconds from spawning ``command`` to its first line on stdout"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT)
+    try:
+        process.stdin.write(INITIALIZE)
+        process.stdin.flush()
+        line = process.stdout.readline()
+        elapsed = time.perf_counter() - start
+        if b'"result"' not in line:
+            raise RuntimeError(f"Unexpected response: {line[:200]!r}")
+        return elapsed
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+def percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time to first initialize response")
+    parser.add_argument("--runs", type=int, default=20, help="Number of cold starts to measure")
+    parser.add_argument("--proxy", action="store_true",
+                        help="Start through audio_proxy.py (the daemon is started once, reused and left running)")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Fail if p95 exceeds this many ms")
+    args = parser.parse_args()
+
+    script = "audio_proxy.py" if args.proxy else "audio_server.py"
+    command = [sys.executable, os.path.join(PROJECT_ROOT, script)]
+    if args.proxy:
+        # The first connection spawns the daemon; keep it out of the measurement
+        time_first_response(command)
+
+    samples = [time_first_response(command) * 1000 for _ in range(args.runs)]
+    p50 = percentile(samples, 0.50)
+    p95 = percentile(samples, 0.95)
+    print(f"{script}: {args.runs} runs, time to first response (ms)")
+    print(f"  min {min(samples):7.1f}   p50 {p50:7.1f}   p95 {p95:7.1f}   max {max(samples):7.1f}")
+
+    if args.max_p95_ms is not None and p95 > args.max_p95_ms:
+        print(f"❌ p95 {p95:.1f} ms exceeds the {args.max_p95_ms:.1f} ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Shared pytest setup: keep every test's caches out of the user's real cache directory
+"""
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Point AUDIO_SERVER_CACHE_DIR (also inherited by spawned servers) at a per-test directory"""
+    monkeypatch.setenv("AUDIO_SERVER_CACHE_DIR", str(tmp_path / "cache"))
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Streamable HTTP transport for the MCP Audio Server.
+
+One resident process serves many MCP sessions over HTTP, all sharing the same
+AsyncJSONRPCServer and therefore the same warm TTS engine, mixer and audio
+worker:
+
+- ``POST /mcp`` carries a JSON-RPC message or batch. The reply is
+  ``application/json``, or an SSE stream when the client accepts one and asked
+  for progress, so progress notifications arrive before the final response.
+- ``GET /mcp`` opens an SSE stream for server notifications of that session.
+- ``DELETE /mcp`` ends the session and cancels its in-flight requests.
+
+Sessions are identified by the ``Mcp-Session-Id`` header handed out in the
+``initialize`` response. A session with no requests, calls in flight or open
+streams for the idle timeout is ended as if it had been deleted. The server
+binds to 127.0.0.1 by default and rejects cross-origin browser requests.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from audio_server import AsyncJSONRPCServer, ClientSession, error_response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PATH = "/mcp"
+
+# Upper bounds for a single request, to keep a bad client from exhausting memory
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Comment line sent on idle SSE streams so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# Sessions left idle this long are ended (clients that never send DELETE)
+DEFAULT_SESSION_TIMEOUT = 30 * 60.0
+# Longest wait between checks for idle sessions
+SESSION_SWEEP_SECONDS = 60.0
+
+LOCAL_ORIGIN_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+}
+
+class HTTPSession(ClientSession):
+    """An MCP session over HTTP; notifications fan out to its open GET streams"""
+
+    def __init__(self, session_id: str, loop: asyncio.AbstractEventLoop):
+        super().__init__(session_id, self._notify_streams)
+        self._loop = loop
+        self.streams: Set["asyncio.Queue[Dict[str, Any]]"] = set()
+        self.last_active = time.monotonic()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def _notify_streams(self, message: Dict[str, Any]):
+        # Called from audio worker threads
+        self._loop.call_soon_threadsafe(self._publish, message)
+
+    def _publish(self, message: Dict[str, Any]):
+        for stream in self.streams:
+            stream.put_nowait(message)
+
+class HTTPRequest:
+    """A parsed HTTP/1.1 request"""
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = urlsplit(target).path
+        self.headers = headers
+        self.body = body
+
+    def accepts(self, media_type: str) -> bool:
+        return media_type in self.headers.get("accept", "")
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+class HTTPError(Exception):
+    """Reject the current request with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class StreamableHTTPTransport:
+    """Serve an AsyncJSONRPCServer over MCP Streamable HTTP.
+
+    ``session_timeout`` is how many idle seconds end a session (0 keeps
+    sessions until DELETE); it defaults to AUDIO_SERVER_HTTP_SESSION_TIMEOUT
+    or 30 minutes.
+    """
+
+    def __init__(self, dispatcher: AsyncJSONRPCServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 path: str = DEFAULT_PATH, session_timeout: Optional[float] = None):
+        self.dispatcher = dispatcher
+        self.codec = dispatcher.codec
+        self.host = host
+        self.port = port
+        self.path = path
+        if session_timeout is None:
+            session_timeout = float(os.environ.get("AUDIO_SERVER_HTTP_SESSION_TIMEOUT", DEFAULT_SESSION_TIMEOUT))
+        self.session_timeout = session_timeout
+        self.sessions: Dict[str, HTTPSession] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self) -> Tuple[str, int]:
+        """Start listening; returns the bound (host, port)"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        if self.session_timeout:
+            self._sweeper = asyncio.create_task(self._expire_idle_sessions())
+        host, port = self._server.sockets[0].getsockname()[:2]
+        logger.info(f"Streamable HTTP transport listening on http://{host}:{port}{self.path}")
+        return host, port
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and cancel every session's in-flight work"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        for session_id in list(self.sessions):
+            self._end_session(session_id)
+
+    def _end_session(self, session_id: str):
+        self.sessions.pop(session_id, None)
+        self.dispatcher.cancel_session(session_id)
+
+    def _is_busy(self, session: HTTPSession) -> bool:
+        """Whether a session has an open stream or a call in flight"""
+        return bool(session.streams) or any(owner == session.session_id for owner, _ in self.dispatcher.in_flight)
+
+    async def _expire_idle_sessions(self):
+        """End sessions that have been idle for the session timeout"""
+        while True:
+            await asyncio.sleep(min(self.session_timeout, SESSION_SWEEP_SECONDS))
+            now = time.monotonic()
+            for session in list(self.sessions.values()):
+                if self._is_busy(session):
+                    session.touch()
+                elif now - session.last_active >= self.session_timeout:
+                    logger.info(f"HTTP session {session.session_id} expired after {self.session_timeout:.0f}s idle")
+                    self._end_session(session.session_id)
+
+    # -- HTTP plumbing -----------------------------------------------------
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(400, "Too many headers")
+
+        body = b""
+        if method == "POST":
+            if "chunked" in headers.get("transfer-encoding", "").lower():
+                raise HTTPError(411, "Chunked request bodies are not supported")
+            length_header = headers.get("content-length")
+            if length_header is None:
+                raise HTTPError(400, "Missing Content-Length")
+            if not length_header.isdecimal():
+                raise HTTPError(400, f"Invalid Content-Length: {length_header!r}")
+            length = int(length_header)
+            if length > MAX_BODY_BYTES:
+                raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            body = await reader.readexactly(length)
+        return HTTPRequest(method, target, headers, body)
+
+    def _write_head(self, writer: asyncio.StreamWriter, status: int, headers: Dict[str, str]):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, body: bytes = b"",
+                        content_type: str = "application/json", headers: Optional[Dict[str, str]] = None):
+        head = {"Content-Type": content_type, "Content-Length": str(len(body))}
+        head.update(headers or {})
+        self._write_head(writer, status, head)
+        if body:
+            writer.write(body)
+
+    def _sse_event(self, message: Any) -> bytes:
+        return b"event: message\ndata: " + self.dispatcher.encode(message) + b"\n\n"
+
+    def _check_origin(self, request: HTTPRequest):
+        """Reject browser requests from non-local origins (DNS rebinding protection)"""
+        origin = request.headers.get("origin")
+        if origin and urlsplit(origin).hostname not in LOCAL_ORIGIN_HOSTS:
+            raise HTTPError(403, f"Origin not allowed: {origin}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                request = None
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    self._check_origin(request)
+                    if request.path != self.path:
+                        raise HTTPError(404, f"Unknown path {request.path}")
+
+                    if request.method == "POST":
+                        keep_open = await self._handle_post(request, reader, writer)
+                    elif request.method == "GET":
+                        keep_open = await self._handle_get(request, reader, writer)
+                    elif request.method == "DELETE":
+                        keep_open = self._handle_delete(request, writer)
+                    else:
+                        raise HTTPError(405, f"Method {request.method} not allowed")
+                except HTTPError as e:
+                    self._write_response(writer, e.status, str(e).encode("utf-8"), "text/plain; charset=utf-8")
+                    keep_open = e.status < 500 and request is not None and request.keep_alive
+                await writer.drain()
+                if not (keep_open and request.keep_alive):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"HTTP connection error: {e}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    # -- MCP endpoints -----------------------------------------------------
+
+    def _session_for(self, request: HTTPRequest, messages: List[Any]) -> HTTPSession:
+        if any(isinstance(m, dict) and m.get("method") == "initialize" for m in messages):
+            session = HTTPSession(uuid.uuid4().hex, asyncio.get_running_loop())
+            self.sessions[session.session_id] = session
+            logger.info(f"HTTP session {session.session_id} started")
+            return session
+
+        session_id = request.headers.get("mcp-session-id")
+        if not session_id:
+            raise HTTPError(400, "Missing Mcp-Session-Id header; send initialize first")
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, f"Unknown session {session_id}")
+        session.touch()
+        return session
+
+    async def _handle_post(self, request: HTTPRequest, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> bool:
+        try:
+            message = self.codec.loads(request.body)
+        except Exception as e:
+            body = self.codec.dumps(error_response(0, -32700, "Parse error", str(e)))
+            self._write_response(writer, 400, body)
+            return True
+
+        messages = message if isinstance(message, list) else [message]
+        session = self._session_for(request, messages)
+        session_header = {"Mcp-Session-Id": session.session_id}
+
+        expects_response = any(isinstance(m, dict) and "method" in m and "id" in m for m in messages) or not messages
+        if not expects_response:
+            # Notifications (and client responses) are acknowledged without a body
+            await self.dispatcher.handle_decoded(message, session)
+            self._write_response(writer, 202, headers=session_header)
+            return True
+
+        wants_progress = any(
+            isinstance(m, dict) and ((m.get("params") or {}).get("_meta") or {}).get("progressToken") is not None
+            for m in messages
+        )
+        if wants_progress and request.accepts("text/event-stream"):
+            await self._stream_post(message, session, writer)
+            return False
+
+        response = await self.dispatcher.handle_decoded(message, session)
+        body = self.dispatcher.encode(response) if response is not None else b""
+        self._write_response(writer, 200 if body else 202, body, headers=session_header)
+        return True
+
+    async def _stream_post(self, message: Any, session: HTTPSession, writer: asyncio.StreamWriter):
+        """Answer a POST with an SSE stream: progress events, then the response"""
+        loop = asyncio.get_running_loop()
+        events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+        def notify(notification: Dict[str, Any]):
+            loop.call_soon_threadsafe(events.put_nowait, notification)
+
+        self._write_head(writer, 200, {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "close",
+            "Mcp-Session-Id": session.session_id,
+        })
+        await writer.drain()
+
+        handling = asyncio.create_task(self.dispatcher.handle_decoded(message, session, notify))
+        try:
+            while not handling.done():
+                next_event = asyncio.create_task(events.get())
+                done, _ = await asyncio.wait({handling, next_event}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    writer.write(self._sse_event(next_event.result()))
+                    await writer.drain()
+                else:
+                    next_event.cancel()
+
+            # Progress queued just before the response still goes out first
+            while not events.empty():
+                writer.write(self._sse_event(events.get_nowait()))
+            response = handling.result()
+            if response is not None:
+                writer.write(self._sse_event(response))
+            await writer.drain()
+        except ConnectionError:
+            # The client went away mid-stream: treat it as a cancellation
+            for item in messages_with_ids(message):
+                self.dispatcher.cancel_request(item["id"], "HTTP stream closed", session.session_id)
+            raise
+
+    async def _handle_get(self, request: HTTPRequest, reader: asyncio.StreamReader,
+                          writer: asyncio.StreamWriter) -> bool:
+        if not request.accepts("text/event-stream"):
+            raise HTTPError(405, "GET requires Accept: text/event-stream")
+        session_id = request.headers.get("mcp-session-id", "")
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404 if session_id else 400, "Unknown or missing Mcp-Session-Id")
+
+        stream: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        session.streams.add(stream)
+        self._write_head(writer, 200, {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "close",
+            "Mcp-Session-Id": session.session_id,
+        })
+        await writer.drain()
+
+        # Any read completing (data or EOF) means the client is done with the stream
+        disconnected = asyncio.create_task(reader.read(1))
+        try:
+            while session.session_id in self.sessions:
+                next_event = asyncio.create_task(stream.get())
+                done, _ = await asyncio.wait({disconnected, next_event}, timeout=SSE_KEEPALIVE_SECONDS,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    next_event.cancel()
+                    break
+                if next_event in done:
+                    writer.write(self._sse_event(next_event.result()))
+                else:
+                    next_event.cancel()
+                    writer.write(b": keepalive\n\n")
+                await writer.drain()
+        finally:
+            disconnected.cancel()
+            session.streams.discard(stream)
+        return False
+
+    def _handle_delete(self, request: HTTPRequest, writer: asyncio.StreamWriter) -> bool:
+        session_id = request.headers.get("mcp-session-id", "")
+        if session_id not in self.sessions:
+            raise HTTPError(404, f"Unknown session {session_id}")
+        self._end_session(session_id)
+        logger.info(f"HTTP session {session_id} ended")
+        self._write_response(writer, 200)
+        return True
+
+def messages_with_ids(message: Any) -> List[Dict[str, Any]]:
+    """The requests in a message or batch that expect a response"""
+    messages = message if isinstance(message, list) else [message]
+    return [m for m in messages if isinstance(m, dict) and "id" in m]
+
+async def serve_http(dispatcher: AsyncJSONRPCServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                     path: str = DEFAULT_PATH, session_timeout: Optional[float] = None):
+    """Run the Streamable HTTP transport until interrupted"""
+    transport = StreamableHTTPTransport(dispatcher, host, port, path, session_timeout)
+    try:
+        await transport.serve_forever()
+    finally:
+        await transport.close()
+        dispatcher.shutdown()
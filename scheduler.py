@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Fair scheduling of audio work across client sessions.
+
+All sessions share one audio worker. FairScheduler hands out turns on it with
+weighted fair queuing: each session keeps a FIFO of waiting calls and a
+virtual time that advances by the worker time it used divided by its weight,
+and the next turn goes to the waiting session with the lowest virtual time.
+A session flooding the server therefore only delays itself, while a session
+that was idle does not bank credit to burst ahead later.
+
+Optionally each session is also rate limited by a token bucket, so a noisy
+client is refused (and told when to retry) before its calls even queue up.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``burst``"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> Optional[float]:
+        """Take one token; returns None on success or the seconds until one is available"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return None
+        return (1.0 - self.tokens) / self.rate
+
+class SessionStats:
+    """Per-session scheduling counters"""
+
+    def __init__(self):
+        self.calls = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.service_time = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "rateLimited": self.rate_limited,
+            "waitAvgMs": round(1000 * self.total_wait / self.calls, 1) if self.calls else 0.0,
+            "waitMaxMs": round(1000 * self.max_wait, 1),
+            "serviceSeconds": round(self.service_time, 3),
+        }
+
+class FairScheduler:
+    """Weighted fair queuing of audio turns across sessions.
+
+    Runs on the event loop thread only. ``rate`` (calls per second) and
+    ``burst`` configure the per-session token buckets; a rate of 0 disables
+    rate limiting.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: float = 10.0):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        # session id -> waiting (future, enqueue time) pairs, in arrival order
+        self._queues: Dict[str, Deque[Tuple[asyncio.Future, float]]] = {}
+        self._vtime: Dict[str, float] = {}
+        # Virtual time of the turn currently (or last) granted
+        self._clock = 0.0
+        self._busy = False
+        # Session holding the current turn
+        self._holder: Optional[str] = None
+        # Closed sessions whose state goes once their last call is done
+        self._closed: Set[str] = set()
+        self.sessions: Dict[str, SessionStats] = {}
+
+    def _stats(self, session_id: str) -> SessionStats:
+        stats = self.sessions.get(session_id)
+        if stats is None:
+            stats = self.sessions[session_id] = SessionStats()
+        return stats
+
+    def admit(self, session_id: str) -> Optional[float]:
+        """Charge one call to the session's bucket; returns seconds to wait if it is empty"""
+        if self.rate <= 0:
+            return None
+        bucket = self._buckets.get(session_id)
+        if bucket is None:
+            bucket = self._buckets[session_id] = TokenBucket(self.rate, self.burst)
+        retry_after = bucket.try_take()
+        if retry_after is not None:
+            self._stats(session_id).rate_limited += 1
+        return retry_after
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _grant(self, session_id: str, waited: float):
+        stats = self._stats(session_id)
+        stats.calls += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        self._clock = self._vtime.get(session_id, self._clock)
+        self._holder = session_id
+
+    def forget(self, session_id: str):
+        """Drop a closed session's bucket, virtual time and stats once it has no call waiting or running"""
+        self._closed.add(session_id)
+        self._prune(session_id)
+
+    def _prune(self, session_id: str):
+        if session_id not in self._closed or session_id in self._queues or session_id == self._holder:
+            return
+        self._closed.discard(session_id)
+        self._buckets.pop(session_id, None)
+        self._vtime.pop(session_id, None)
+        self.sessions.pop(session_id, None)
+
+    async def acquire(self, session_id: str):
+        """Wait for this session's turn on the audio worker"""
+        if not self._busy:
+            self._busy = True
+            self._vtime[session_id] = max(self._vtime.get(session_id, 0.0), self._clock)
+            self._grant(session_id, 0.0)
+            return
+
+        queue = self._queues.get(session_id)
+        if not queue:
+            queue = self._queues[session_id] = deque()
+            # A session becoming active starts at the current virtual time
+            self._vtime[session_id] = max(self._vtime.get(session_id, 0.0), self._clock)
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, time.monotonic())
+        queue.append(entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The turn was granted just as we were cancelled: pass it on
+                self.release(session_id, 0.0, weight=1.0)
+            elif entry in queue:
+                queue.remove(entry)
+                if not queue:
+                    del self._queues[session_id]
+                    self._prune(session_id)
+            raise
+
+    def release(self, session_id: str, service_time: float, weight: float = 1.0):
+        """End a turn that used ``service_time`` seconds and start the next one"""
+        self._stats(session_id).service_time += service_time
+        self._vtime[session_id] = self._vtime.get(session_id, self._clock) + service_time / max(weight, 1e-6)
+        self._holder = None
+
+        while self._queues:
+            next_session = min(self._queues, key=lambda sid: self._vtime.get(sid, 0.0))
+            queue = self._queues[next_session]
+            waiter, enqueued = queue.popleft()
+            if not queue:
+                del self._queues[next_session]
+            if waiter.done():
+                self._prune(next_session)
+                continue
+            waiter.set_result(None)
+            self._grant(next_session, time.monotonic() - enqueued)
+            break
+        else:
+            self._busy = False
+        self._prune(session_id)
+
+    @asynccontextmanager
+    async def turn(self, session_id: str, weight: float = 1.0) -> AsyncIterator[None]:
+        """Hold the audio worker for the duration of the block"""
+        await self.acquire(session_id)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(session_id, time.monotonic() - start, weight)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-session calls, queue wait times and worker time used"""
+        # Called from worker threads (get_audio_status) while the loop may add sessions
+        return {session_id: stats.as_dict() for session_id, stats in list(self.sessions.items())}
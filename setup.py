@@ -20,13 +20,13 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/mcp-audio-server",
     packages=find_packages(),
+    py_modules=["audio_server", "audio_client", "audio_proxy", "scheduler", "transport", "http_transport", "unix_transport", "voice_catalog", "speech_cache", "speech_codec"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
@@ -34,11 +34,12 @@ setup(
         "Topic :: Multimedia :: Sound/Audio",
         "Topic :: Communications",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
     install_requires=requirements,
     entry_points={
         "console_scripts": [
             "mcp-audio-server=audio_server:main",
+            "mcp-audio-proxy=audio_proxy:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,771 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache of synthesized speech.
+
+Each entry holds the rendered audio of one utterance, named after the
+SHA-256 of everything that changes the output: the normalized text, engine,
+language, voice, rate and audio format. Volume is applied at playback and is
+not part of the key. Entries are packed into append-only segment files and
+indexed in SQLite, so the server processes on a host share one cache and
+never see partial audio. The cache is trimmed least recently used first once
+it grows past its size limit, and entries unused for longer than the age
+limit are dropped.
+
+SoundCache is the in-memory tier in front of it: decoded clips of the
+utterances that are replayed most, so a hit skips both the disk and the
+decoder. SingleFlight makes concurrent requests for the same key share one
+synthesis. export_bundle and import_bundle copy cached speech between
+hosts as a single zip file.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+# Index of the clips in a cache directory (plus its -wal and -shm files)
+INDEX_NAME = "index.sqlite3"
+# Seconds to wait for another process holding the index lock
+INDEX_BUSY_TIMEOUT = 10.0
+# Layout of the index; an index with any other version is left alone and not used
+INDEX_VERSION = 1
+# Clips are appended to segments of up to this size (smaller for small caches)
+SEGMENT_BYTES = 32 * 1024 * 1024
+MIN_SEGMENT_BYTES = 256 * 1024
+SEGMENT_FILE = re.compile(r"segment-(\d+)\.dat")
+# A sealed segment is compacted once less than this fraction of it is live
+COMPACT_BELOW = 0.5
+# Usage scores halve after this long without a request
+USAGE_HALF_LIFE = 7 * 24 * 3600
+# Usage records whose score has decayed below this are forgotten
+MIN_USAGE_SCORE = 0.05
+# Seconds request counts are gathered in memory before they are written to the index
+USAGE_FLUSH_INTERVAL = 30.0
+
+@contextmanager
+def _transaction(db: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Write transaction that takes the index lock up front"""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def normalize_text(text: str) -> str:
+    """Canonical form of an utterance: NFC, whitespace collapsed and trimmed"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+def speech_key(text: str, engine: str, lang: Optional[str] = None, voice: Optional[str] = None,
+               rate: Optional[float] = None, fmt: str = "mp3") -> str:
+    """Cache key for an utterance rendered with the given settings"""
+    material = json.dumps([normalize_text(text), engine, lang, voice, rate, fmt], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class ClipReader(io.RawIOBase):
+    """Seekable file object over a clip's bytes, such as a memoryview into a segment mapping.
+
+    Reads copy only what the consumer asks for, so a mapped clip can be
+    handed to the decoder without materializing it first.
+    """
+
+    def __init__(self, data: Any):
+        super().__init__()
+        self._view = memoryview(data)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+class SpeechCache:
+    """Rendered speech in ``directory``, shared by every server process on the host.
+
+    Clips are appended to segment files (``segment-NNNNNN.dat``) and a SQLite
+    index in WAL mode maps each key to its segment, offset and length, so
+    thousands of short phrases cost a few large files instead of one inode
+    each. Appends happen under the index's write lock, which serializes
+    writers across processes; reads return a memoryview into a read-only
+    mmap of the segment, without copying. Evicting a clip only drops its
+    index row; once less than half of a sealed segment is live, a background
+    compactor moves the live clips to the active segment and deletes it.
+
+    All processes agree on the LRU order and total size through the index,
+    and a clip rendered by one process is a hit for the others. An index
+    with another layout version is not used (nor modified). Hit/miss
+    counters are per process.
+
+    The index also keeps an exponentially decayed request count per key,
+    with what is needed to render it again, so the hot set survives
+    restarts and evictions (see record_use and hot_clips). Counts are
+    gathered in memory and written in batches (see flush_usage).
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, max_age: float = DEFAULT_MAX_AGE,
+                 segment_bytes: Optional[int] = None, usage_half_life: float = USAGE_HALF_LIFE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.usage_half_life = usage_half_life
+        # Small caches get small segments so evicted space is reclaimed early
+        self.segment_bytes = segment_bytes or min(SEGMENT_BYTES, max(MIN_SEGMENT_BYTES, max_bytes // 8))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # Segment id -> read-only mapping of the segment file
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._compacting = False
+        self._lock = threading.RLock()
+        # Key -> (fmt, recipe, score, updated) counted since the last flush
+        self._pending_usage: Dict[str, Tuple[str, Dict[str, Any], float, float]] = {}
+        self._usage_timer: Optional[threading.Timer] = None
+        self._usage_lock = threading.Lock()
+
+    def _decay(self, age: float) -> float:
+        """Factor a usage score has decayed by after ``age`` seconds"""
+        return 0.5 ** (max(age, 0.0) / self.usage_half_life)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:06d}.dat")
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, INDEX_NAME), timeout=INDEX_BUSY_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Factor a usage score has decayed by after ``age`` seconds
+            conn.create_function("decay", 1, self._decay, deterministic=True)
+            try:
+                with _transaction(conn):
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    if version == 0:
+                        self._create_index(conn)
+                    elif version != INDEX_VERSION:
+                        raise sqlite3.DatabaseError(f"speech cache index has version {version}, "
+                                                    f"this server reads version {INDEX_VERSION}")
+                    self._remove_orphans(conn)
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def _create_index(self, db: sqlite3.Connection):
+        db.execute("CREATE TABLE segments (id INTEGER PRIMARY KEY AUTOINCREMENT, bytes INTEGER NOT NULL)")
+        db.execute("CREATE TABLE clips (name TEXT PRIMARY KEY, segment INTEGER NOT NULL, offset INTEGER NOT NULL, "
+                   "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        db.execute("CREATE INDEX clips_by_last_used ON clips (last_used)")
+        db.execute("CREATE INDEX clips_by_segment ON clips (segment)")
+        db.execute("CREATE TABLE usage (key TEXT PRIMARY KEY, fmt TEXT NOT NULL, recipe TEXT NOT NULL, "
+                   "score REAL NOT NULL, updated REAL NOT NULL)")
+        db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    def _remove_orphans(self, db: sqlite3.Connection):
+        """Delete segment files the index does not know (left by a writer or compactor that died)"""
+        known = {segment for segment, in db.execute("SELECT id FROM segments")}
+        for name in os.listdir(self.directory):
+            match = SEGMENT_FILE.fullmatch(name)
+            if match and int(match.group(1)) not in known:
+                _unlink(os.path.join(self.directory, name))
+
+    def _append(self, db: sqlite3.Connection, name: str, data: bytes, last_used: float):
+        """Append a clip to the active segment; the caller holds the index write lock"""
+        row = db.execute("SELECT id, bytes FROM segments ORDER BY id DESC LIMIT 1").fetchone()
+        if row is None or (row[1] and row[1] + len(data) > self.segment_bytes):
+            segment = db.execute("INSERT INTO segments (bytes) VALUES (0)").lastrowid
+        else:
+            segment = row[0]
+        with open(self._segment_path(segment), "ab") as f:
+            # The file may be longer than recorded if a writer died mid-append
+            offset = f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        db.execute("UPDATE segments SET bytes = ? WHERE id = ?", (offset + len(data), segment))
+        db.execute("INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?)", (name, segment, offset, len(data), last_used))
+
+    def _view(self, db: sqlite3.Connection, segment: int, offset: int, size: int) -> memoryview:
+        """Zero-copy view of a clip, mapping (or remapping a grown) segment as needed"""
+        mapping = self._maps.get(segment)
+        if mapping is None or offset + size > len(mapping):
+            with open(self._segment_path(segment), "rb") as f:
+                if offset + size > os.fstat(f.fileno()).st_size:
+                    raise EOFError(f"segment {segment} is shorter than its index says")
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # Forget mappings of segments compacted away by any process
+            live = {live_segment for live_segment, in db.execute("SELECT id FROM segments")}
+            for stale in [stale for stale in self._maps if stale not in live]:
+                del self._maps[stale]
+            self._maps[segment] = mapping
+        return memoryview(mapping)[offset:offset + size]
+
+    def get(self, key: str, fmt: str, touch: bool = True) -> Optional[memoryview]:
+        """The cached audio for ``key`` as a view into its segment, or None on a miss.
+
+        With ``touch`` False the lookup is not counted and the clip keeps its
+        place in the LRU order.
+        """
+        name = f"{key}.{fmt}"
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._db()
+                view = None
+                # A compactor may move the clip between the lookup and the mapping; look again once
+                for _ in range(2):
+                    row = db.execute("SELECT segment, offset, size, last_used FROM clips WHERE name = ?",
+                                     (name,)).fetchone()
+                    if row is None:
+                        break
+                    segment, offset, size, last_used = row
+                    if self.max_age and now - last_used > self.max_age:
+                        db.execute("DELETE FROM clips WHERE name = ? AND last_used = ?", (name, last_used))
+                        self.evictions += 1
+                        break
+                    try:
+                        view = self._view(db, segment, offset, size)
+                        break
+                    except FileNotFoundError:
+                        continue
+                    except (EOFError, ValueError):
+                        # Truncated segment, or an empty clip (which cannot be mapped)
+                        db.execute("DELETE FROM clips WHERE name = ? AND segment = ?", (name, segment))
+                        break
+                if not touch:
+                    return view
+                if view is None:
+                    self.misses += 1
+                    return None
+                db.execute("UPDATE clips SET last_used = ? WHERE name = ?", (now, name))
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Speech cache unavailable: {e}")
+                self.misses += 1
+                return None
+            self.hits += 1
+            return view
+
+    def contains(self, key: str, fmt: str) -> bool:
+        """Whether ``key`` is cached and unexpired, without counting a hit or miss"""
+        with self._lock:
+            try:
+                row = self._db().execute("SELECT last_used FROM clips WHERE name = ?", (f"{key}.{fmt}",)).fetchone()
+            except (OSError, sqlite3.Error):
+                return False
+        return row is not None and (not self.max_age or time.time() - row[0] <= self.max_age)
+
+    def put(self, key: str, fmt: str, data: bytes):
+        """Store ``data`` for ``key`` and trim the cache to its limits; empty audio is not stored"""
+        if not data:
+            logger.warning(f"Not caching empty speech for {key}.{fmt}")
+            return
+        name = f"{key}.{fmt}"
+        with self._lock:
+            try:
+                db = self._db()
+                with _transaction(db):
+                    self._append(db, name, data, time.time())
+                    self.evictions += self._evict(db, keep=name)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not cache speech: {e}")
+                return
+        self._maybe_compact()
+
+    def record_use(self, key: str, fmt: str, recipe: Dict[str, Any]):
+        """Count a request for ``key`` (rendered as ``fmt``) in its decayed usage score.
+
+        ``recipe`` is the phrase that renders the clip (text plus the
+        pre-warm options), kept so a popular clip can be rendered again.
+        The count is kept in memory, so this never waits on the index; a
+        timer writes it within USAGE_FLUSH_INTERVAL seconds.
+        """
+        now = time.time()
+        with self._usage_lock:
+            pending = self._pending_usage.get(key)
+            score = 1.0 if pending is None else pending[2] * self._decay(now - pending[3]) + 1
+            self._pending_usage[key] = (fmt, recipe, score, now)
+            if self._usage_timer is None:
+                self._usage_timer = threading.Timer(USAGE_FLUSH_INTERVAL, self._run_usage_flush)
+                self._usage_timer.daemon = True
+                self._usage_timer.start()
+
+    def _run_usage_flush(self):
+        with self._usage_lock:
+            self._usage_timer = None
+        self.flush_usage()
+
+    def flush_usage(self):
+        """Write the request counts gathered by record_use to the index in one transaction"""
+        with self._usage_lock:
+            pending, self._pending_usage = self._pending_usage, {}
+        if not pending:
+            return
+        rows = [(key, fmt, json.dumps(recipe, ensure_ascii=False), score, updated)
+                for key, (fmt, recipe, score, updated) in pending.items()]
+        with self._lock:
+            try:
+                db = self._db()
+                with _transaction(db):
+                    db.executemany(
+                        "INSERT INTO usage VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                        "score = score * decay(excluded.updated - updated) + excluded.score, "
+                        "updated = excluded.updated, fmt = excluded.fmt, recipe = excluded.recipe",
+                        rows
+                    )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not record speech cache usage: {e}")
+
+    def hot_clips(self, limit: int) -> List[Dict[str, Any]]:
+        """The ``limit`` most requested keys by decayed score, hottest first.
+
+        Each is a dict of ``key``, ``fmt`` (as rendered), ``recipe`` and
+        ``score``; keys whose score has decayed away are forgotten.
+        """
+        self.flush_usage()
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._db()
+                db.execute("DELETE FROM usage WHERE score * decay(? - updated) < ?", (now, MIN_USAGE_SCORE))
+                rows = db.execute("SELECT key, fmt, recipe, score * decay(? - updated) AS current FROM usage "
+                                  "ORDER BY current DESC LIMIT ?", (now, limit)).fetchall()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not read speech cache usage: {e}")
+                return []
+        return [{"key": key, "fmt": fmt, "recipe": json.loads(recipe), "score": score}
+                for key, fmt, recipe, score in rows]
+
+    def clips(self) -> List[Dict[str, Any]]:
+        """Every cached clip: ``key``, ``fmt``, ``size``, ``last_used`` and its ``usage`` record (or None)"""
+        self.flush_usage()
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            clips = db.execute("SELECT name, size, last_used FROM clips").fetchall()
+            usage = {key: {"fmt": fmt, "recipe": json.loads(recipe), "score": score}
+                     for key, fmt, recipe, score in db.execute(
+                         "SELECT key, fmt, recipe, score * decay(? - updated) FROM usage", (now,))}
+        result = []
+        for name, size, last_used in clips:
+            key, _, fmt = name.rpartition(".")
+            result.append({"key": key, "fmt": fmt, "size": size, "last_used": last_used, "usage": usage.get(key)})
+        return result
+
+    def add_usage(self, key: str, fmt: str, recipe: Dict[str, Any], score: float):
+        """Adopt a usage record from elsewhere (such as a bundle) unless ``key`` already has one"""
+        self.flush_usage()
+        with self._lock:
+            try:
+                self._db().execute("INSERT INTO usage VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO NOTHING",
+                                   (key, fmt, json.dumps(recipe, ensure_ascii=False), score, time.time()))
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not record speech cache usage: {e}")
+
+    def _evict(self, db: sqlite3.Connection, keep: str) -> int:
+        """Drop index rows past the age and size limits; returns how many were dropped"""
+        evicted = 0
+        if self.max_age:
+            evicted += db.execute("DELETE FROM clips WHERE last_used < ? AND name != ?",
+                                  (time.time() - self.max_age, keep)).rowcount
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()[0]
+        if total > self.max_bytes:
+            for name, size in db.execute("SELECT name, size FROM clips WHERE name != ? ORDER BY last_used",
+                                         (keep,)).fetchall():
+                if total <= self.max_bytes:
+                    break
+                db.execute("DELETE FROM clips WHERE name = ?", (name,))
+                evicted += 1
+                total -= size
+        return evicted
+
+    def _compaction_candidates(self, db: sqlite3.Connection) -> List[int]:
+        """Sealed segments less than COMPACT_BELOW live"""
+        rows = db.execute(
+            "SELECT s.id, s.bytes, COALESCE(SUM(c.size), 0) FROM segments s LEFT JOIN clips c ON c.segment = s.id "
+            "WHERE s.id < (SELECT MAX(id) FROM segments) GROUP BY s.id"
+        ).fetchall()
+        return [segment for segment, total, live in rows if live < total * COMPACT_BELOW]
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._compacting:
+                return
+            try:
+                if not self._compaction_candidates(self._db()):
+                    return
+            except (OSError, sqlite3.Error):
+                return
+            self._compacting = True
+        threading.Thread(target=self._run_compactor, name="speech-cache-compactor", daemon=True).start()
+
+    def _run_compactor(self):
+        try:
+            reclaimed = self.compact()
+            if reclaimed:
+                logger.info(f"Speech cache compaction reclaimed {reclaimed / (1024 * 1024):.1f} MB")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Speech cache compaction failed: {e}")
+        finally:
+            self._compacting = False
+
+    def compact(self) -> int:
+        """Rewrite sparse sealed segments, one per transaction; returns the bytes reclaimed"""
+        reclaimed = 0
+        while True:
+            with self._lock:
+                db = self._db()
+                with _transaction(db):
+                    candidates = self._compaction_candidates(db)
+                    if not candidates:
+                        return reclaimed
+                    segment = candidates[0]
+                    total = db.execute("SELECT bytes FROM segments WHERE id = ?", (segment,)).fetchone()[0]
+                    clips = db.execute("SELECT name, offset, size, last_used FROM clips WHERE segment = ?",
+                                       (segment,)).fetchall()
+                    if clips:
+                        with open(self._segment_path(segment), "rb") as f:
+                            for name, offset, size, last_used in clips:
+                                f.seek(offset)
+                                self._append(db, name, f.read(size), last_used)
+                    db.execute("DELETE FROM segments WHERE id = ?", (segment,))
+                # Readers holding views into the old mapping keep it alive until they finish
+                self._maps.pop(segment, None)
+                _unlink(self._segment_path(segment))
+                reclaimed += total - sum(size for _, _, size, _ in clips)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and sizes (for all processes), and this process's counters"""
+        with self._lock:
+            try:
+                db = self._db()
+                entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clips").fetchone()
+                segments, disk = db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM segments").fetchone()
+            except (OSError, sqlite3.Error):
+                entries = size = segments = disk = 0
+            return {
+                "entries": entries,
+                "bytes": size,
+                "segments": segments,
+                "disk_bytes": disk,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+class SoundCache:
+    """Byte-budgeted in-memory LRU of decoded clips (such as pygame Sound objects).
+
+    Sizes are supplied by the caller, since only it knows how large a decoded
+    clip is. A clip larger than the whole budget is not kept.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key: str) -> Optional[Tuple[Any, int]]:
+        """The clip and size for ``key``, without counting a lookup or refreshing it"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, value: Any, size: int):
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, memory use and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+PHRASE_OPTIONS = ("voice", "lang", "rate")
+
+def parse_phrase(line: str) -> Optional[Dict[str, Any]]:
+    """Parse one phrase list line (see load_phrase_file); None for blank and comment lines"""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    text, _, options = line.partition(" | ")
+    phrase: Dict[str, Any] = {"text": text.strip()}
+    if not phrase["text"]:
+        raise ValueError("missing phrase text")
+    for option in options.split():
+        name, sep, value = option.partition("=")
+        if not sep or name not in PHRASE_OPTIONS:
+            raise ValueError(f"unknown option '{option}' (expected voice=, lang= or rate=)")
+        if name == "rate":
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError("rate must be an integer") from None
+        phrase[name] = value
+    return phrase
+
+def load_phrase_file(path: str) -> List[Dict[str, Any]]:
+    """Read a pre-warm phrase list.
+
+    One phrase per line, optionally followed by `` | `` and space-separated
+    ``voice=``, ``lang=`` and ``rate=`` options::
+
+        Build finished
+        Tests failed | voice=english rate=180
+        构建完成
+
+    Blank lines and lines starting with ``#`` are skipped.
+    """
+    phrases = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            try:
+                phrase = parse_phrase(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+            if phrase is not None:
+                phrases.append(phrase)
+    return phrases
+
+BUNDLE_FORMAT = "mcp-audio-server/speech-bundle"
+BUNDLE_VERSION = 1
+BUNDLE_MANIFEST = "manifest.json"
+
+def export_bundle(cache: SpeechCache, path: str, min_score: Optional[float] = None,
+                  max_age: Optional[float] = None, codec: Optional[str] = None) -> Dict[str, Any]:
+    """Write cached clips to a bundle file; returns the manifest.
+
+    The bundle is a zip of the clips (stored as is, audio does not compress)
+    plus ``manifest.json`` listing each clip's name, size, SHA-256 and usage
+    record. ``min_score`` keeps clips whose decayed usage score is at least
+    that; ``max_age`` keeps clips used within that many seconds. ``codec``
+    records the storage codec the clips are in.
+    """
+    now = time.time()
+    selected = [
+        clip for clip in cache.clips()
+        if (min_score is None or (clip["usage"] or {}).get("score", 0) >= min_score)
+        and (max_age is None or now - clip["last_used"] <= max_age)
+    ]
+    manifest: Dict[str, Any] = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": now,
+        "codec": codec,
+        "clips": [],
+    }
+    temp_path = f"{path}.tmp"
+    try:
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_STORED) as bundle:
+            for clip in selected:
+                data = cache.get(clip["key"], clip["fmt"], touch=False)
+                if data is None:
+                    # Evicted since it was listed
+                    continue
+                name = f"{clip['key']}.{clip['fmt']}"
+                with bundle.open(f"clips/{name}", "w") as f:
+                    f.write(data)
+                manifest["clips"].append({
+                    "name": name,
+                    "size": len(data),
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "usage": clip["usage"],
+                })
+            bundle.writestr(BUNDLE_MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=1))
+        os.replace(temp_path, path)
+    except BaseException:
+        _unlink(temp_path)
+        raise
+    return manifest
+
+def import_bundle(cache: SpeechCache, path: str, codec: Optional[str] = None) -> Dict[str, int]:
+    """Add the clips of a bundle to the cache; returns counts of imported, duplicate and corrupt clips.
+
+    Clips already cached are skipped without reading them. Every imported
+    clip is checked against its SHA-256. Clips are stored least used first,
+    so the most used are evicted last if the bundle exceeds the cache's
+    size limit. Raises ValueError if ``path`` is not a bundle.
+    """
+    counts = {"imported": 0, "duplicate": 0, "corrupt": 0}
+    try:
+        with zipfile.ZipFile(path) as bundle:
+            manifest = json.loads(bundle.read(BUNDLE_MANIFEST))
+            if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+                raise ValueError(f"{path}: not a version {BUNDLE_VERSION} speech cache bundle")
+            if codec and manifest.get("codec") and manifest["codec"] != codec:
+                logger.warning(f"{path} holds {manifest['codec']} clips but this cache stores {codec}; "
+                               "they are only hit by servers using the same codec")
+            clips = sorted(manifest["clips"], key=lambda clip: (clip.get("usage") or {}).get("score", 0))
+            for clip in clips:
+                key, _, fmt = clip["name"].rpartition(".")
+                usage = clip.get("usage")
+                if usage:
+                    cache.add_usage(key, usage["fmt"], usage["recipe"], usage["score"])
+                if cache.contains(key, fmt):
+                    counts["duplicate"] += 1
+                    continue
+                try:
+                    data = bundle.read(f"clips/{clip['name']}")
+                except (KeyError, zipfile.BadZipFile):
+                    data = None
+                if data is None or hashlib.sha256(data).hexdigest() != clip["sha256"]:
+                    logger.warning(f"{path}: {clip['name']} is missing or corrupt, skipped")
+                    counts["corrupt"] += 1
+                    continue
+                cache.put(key, fmt, data)
+                counts["imported"] += 1
+    except (zipfile.BadZipFile, KeyError, json.JSONDecodeError) as e:
+        raise ValueError(f"{path}: not a speech cache bundle ({e})") from None
+    return counts
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        # Progress callbacks of the callers waiting on the flight, and what was reported so far
+        self.listeners: List[Callable[..., None]] = []
+        self.reports: List[Tuple[tuple, Dict[str, Any]]] = []
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving meanwhile share its result.
+
+    A follower stops waiting (returning None) once ``should_stop`` says so. If
+    the leader's call returns None (it was cancelled), followers retry and one
+    of them takes over; an exception is re-raised in every caller.
+
+    Progress the running call sends through ``report`` reaches the
+    ``progress`` callback of every caller waiting on it; a caller that joins
+    late first receives what was reported before it arrived.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        # Calls answered by another caller's flight
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any], should_stop: Callable[[], bool] = lambda: False,
+           progress: Optional[Callable[..., None]] = None) -> Any:
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                missed = list(flight.reports)
+                if progress is not None:
+                    flight.listeners.append(progress)
+            if leader:
+                try:
+                    flight.result = fn()
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._flights[key]
+                    flight.done.set()
+                return flight.result
+
+            if progress is not None:
+                for args, kwargs in missed:
+                    progress(*args, **kwargs)
+            try:
+                while not flight.done.wait(0.05):
+                    if should_stop():
+                        return None
+            finally:
+                if progress is not None:
+                    with self._lock:
+                        flight.listeners.remove(progress)
+            if flight.error is not None:
+                raise flight.error
+            if flight.result is not None:
+                with self._lock:
+                    self.shared += 1
+                return flight.result
+            if should_stop():
+                return None
+
+    def report(self, key: str, *args, **kwargs):
+        """Pass a progress report from ``key``'s running call to every caller waiting on it"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                return
+            flight.reports.append((args, kwargs))
+            listeners = list(flight.listeners)
+        for listener in listeners:
+            listener(*args, **kwargs)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Storage codecs for the speech cache.
+
+Speech is rendered as MP3 (gTTS) or WAV/AIFF (pyttsx3). A storage codec
+decides what the cache keeps, converting once when a clip is stored:
+the original bytes, 16-bit PCM WAV (largest on disk, but a hit needs almost
+no decoding) or Ogg Vorbis/Opus (smallest, more decoding per hit). Vorbis
+and Opus need the soundfile package with a libsndfile that can encode them.
+
+Codecs that convert decode through a ``decode(data, fmt)`` callable that
+returns interleaved 16-bit samples with their rate and channel count; the
+server passes the pygame mixer's decoder.
+"""
+
+import io
+import logging
+import os
+import wave
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# decode(data, fmt) -> (16-bit samples, sample rate, channels)
+Decoder = Callable[[bytes, str], Tuple[bytes, int, int]]
+
+class StorageCodec:
+    """Keeps speech in the format it was rendered in (always available)"""
+
+    name = "original"
+
+    def __init__(self, decode: Optional[Decoder] = None):
+        self._decode = decode
+
+    def format_for(self, fmt: str) -> str:
+        """Format of the stored clip for speech rendered as ``fmt``"""
+        return fmt
+
+    def encode(self, data: bytes, fmt: str) -> bytes:
+        """Convert speech rendered as ``fmt`` for storage"""
+        return data
+
+    def decode(self, data: bytes, fmt: str) -> Tuple[bytes, int, int]:
+        if self._decode is None:
+            raise RuntimeError(f"The {self.name} codec needs a decoder")
+        return self._decode(data, fmt)
+
+class PCMCodec(StorageCodec):
+    """16-bit PCM WAV at the mixer's sample rate"""
+
+    name = "wav"
+
+    def format_for(self, fmt: str) -> str:
+        return "wav"
+
+    def encode(self, data: bytes, fmt: str) -> bytes:
+        if fmt == "wav":
+            return data
+        samples, rate, channels = self.decode(data, fmt)
+        out = io.BytesIO()
+        with wave.open(out, "wb") as audio:
+            audio.setnchannels(channels)
+            audio.setsampwidth(2)
+            audio.setframerate(rate)
+            audio.writeframes(samples)
+        return out.getvalue()
+
+class VorbisCodec(StorageCodec):
+    """Ogg Vorbis, encoded with soundfile"""
+
+    name = "vorbis"
+    container = "OGG"
+    subtype = "VORBIS"
+    extension = "ogg"
+
+    def __init__(self, decode: Optional[Decoder] = None):
+        super().__init__(decode)
+        import soundfile
+        if self.subtype not in soundfile.available_subtypes(self.container):
+            raise ImportError(f"libsndfile {soundfile.__libsndfile_version__} cannot encode {self.subtype}")
+        self._soundfile = soundfile
+
+    def format_for(self, fmt: str) -> str:
+        return self.extension
+
+    def _samples(self, data: bytes, fmt: str) -> Tuple[bytes, int, int]:
+        return self.decode(data, fmt)
+
+    def encode(self, data: bytes, fmt: str) -> bytes:
+        samples, rate, channels = self._samples(data, fmt)
+        out = io.BytesIO()
+        with self._soundfile.SoundFile(out, "w", samplerate=rate, channels=channels,
+                                       format=self.container, subtype=self.subtype) as audio:
+            audio.buffer_write(samples, dtype="int16")
+        return out.getvalue()
+
+class OpusCodec(VorbisCodec):
+    """Ogg Opus, encoded with soundfile (libsndfile 1.0.29 or later)"""
+
+    name = "opus"
+    subtype = "OPUS"
+    extension = "opus"
+    # Opus only encodes these rates
+    RATES = (8000, 12000, 16000, 24000, 48000)
+
+    def __init__(self, decode: Optional[Decoder] = None):
+        super().__init__(decode)
+        import numpy
+        self._numpy = numpy
+
+    def _samples(self, data: bytes, fmt: str) -> Tuple[bytes, int, int]:
+        samples, rate, channels = self.decode(data, fmt)
+        if rate in self.RATES:
+            return samples, rate, channels
+        # Linear resampling to 48 kHz is plenty for speech
+        np = self._numpy
+        frames = np.frombuffer(samples, dtype=np.int16).reshape(-1, channels).astype(np.float32)
+        count = int(len(frames) * 48000 / rate)
+        positions = np.linspace(0, len(frames) - 1, count)
+        resampled = np.column_stack([np.interp(positions, np.arange(len(frames)), frames[:, channel])
+                                     for channel in range(channels)])
+        return resampled.round().astype(np.int16).tobytes(), 48000, channels
+
+STORAGE_CODECS = {
+    "original": StorageCodec,
+    "wav": PCMCodec,
+    "vorbis": VorbisCodec,
+    "opus": OpusCodec,
+}
+
+def available_storage_codecs(decode: Optional[Decoder] = None) -> Dict[str, StorageCodec]:
+    """Instantiate every storage codec whose libraries are installed"""
+    codecs = {}
+    for name, codec_class in STORAGE_CODECS.items():
+        try:
+            codecs[name] = codec_class(decode)
+        except (ImportError, OSError):
+            continue
+    return codecs
+
+def get_storage_codec(name: Optional[str] = None, decode: Optional[Decoder] = None) -> StorageCodec:
+    """Return the named storage codec, falling back to "original" if it is unavailable.
+
+    The default can be set with the AUDIO_SERVER_SPEECH_CACHE_CODEC environment variable.
+    """
+    name = name or os.environ.get("AUDIO_SERVER_SPEECH_CACHE_CODEC", "original")
+    if name not in STORAGE_CODECS:
+        raise ValueError(f"Unknown speech cache codec '{name}', expected one of: {', '.join(STORAGE_CODECS)}")
+    try:
+        return STORAGE_CODECS[name](decode)
+    except (ImportError, OSError) as e:
+        # soundfile raises OSError when libsndfile itself is missing
+        logger.warning(f"Speech cache codec '{name}' is unavailable ({e}), storing speech as rendered")
+        return StorageCodec(decode)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Stand-ins for pygame, gTTS and pyttsx3 shared by the audio tests
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_server
+from audio_server import AudioPlayer
+
+class FakeMusic:
+    """pygame.mixer.music stand-in that records what it was asked to play.
+
+    A loaded clip "plays" for ``play_seconds`` unless it is stopped.
+    """
+
+    def __init__(self, play_seconds: float = 0.0):
+        self.play_seconds = play_seconds
+        self.played = []
+        self.stopped = 0
+        self._started = 0.0
+        self._ends = 0.0
+
+    def load(self, source, namehint=""):
+        self.played.append(source.read())
+
+    def set_volume(self, volume):
+        pass
+
+    def play(self):
+        self._started = time.monotonic()
+        self._ends = self._started + self.play_seconds
+
+    def get_busy(self):
+        return time.monotonic() < self._ends
+
+    def get_pos(self):
+        return int((time.monotonic() - self._started) * 1000)
+
+    def stop(self):
+        self.stopped += 1
+        self._ends = 0.0
+
+class FakeChannel:
+    def get_busy(self):
+        return False
+
+    def stop(self):
+        pass
+
+class FakeSound:
+    """pygame Sound stand-in: one second of decoded audio per instance"""
+
+    decoded = 0
+
+    def __init__(self, file):
+        FakeSound.decoded += 1
+        self.data = file.read()
+        self.plays = 0
+
+    def get_length(self):
+        return 1.0
+
+    def get_raw(self):
+        # 100 frames of 16-bit stereo
+        return b"\x01\x00" * 200
+
+    def set_volume(self, volume):
+        pass
+
+    def play(self):
+        self.plays += 1
+        return FakeChannel()
+
+def fake_pygame(music: Optional[FakeMusic] = None) -> SimpleNamespace:
+    mixer = SimpleNamespace(music=music or FakeMusic(), Sound=FakeSound, get_init=lambda: (22050, -16, 2))
+    clock = SimpleNamespace(tick=lambda fps: time.sleep(0.01))
+    return SimpleNamespace(mixer=mixer, time=SimpleNamespace(Clock=lambda: clock))
+
+class FakeGTTS:
+    """gTTS stand-in that returns the text as "MP3" data.
+
+    The download comes in ``chunks`` pieces, each taking ``chunk_seconds``;
+    ``downloads`` and ``fetched`` count streams started and chunks fetched.
+    """
+
+    chunks = 1
+    chunk_seconds = 0.0
+    downloads = 0
+    fetched = 0
+
+    @classmethod
+    def reset(cls, chunks: int = 1, chunk_seconds: float = 0.0):
+        cls.chunks, cls.chunk_seconds = chunks, chunk_seconds
+        cls.downloads = cls.fetched = 0
+
+    def __init__(self, text, lang="en", timeout=None):
+        self.text = text
+
+    def _tokenize(self, text):
+        return [text] * self.chunks
+
+    def stream(self):
+        FakeGTTS.downloads += 1
+        for index in range(self.chunks):
+            time.sleep(self.chunk_seconds)
+            FakeGTTS.fetched += 1
+            yield self.text.encode("utf-8") if index == 0 else b""
+
+class RenderingEngine:
+    """pyttsx3 engine stand-in that renders "text@rate" into a file and records each render"""
+
+    def __init__(self):
+        self.props = {"voice": "default", "rate": 150}
+        self.rendered = []
+        self._pending = []
+
+    @property
+    def renders(self) -> int:
+        return len(self.rendered)
+
+    def setProperty(self, name, value):
+        self.props[name] = value
+
+    def getProperty(self, name):
+        if name == "voices":
+            voice = type("Voice", (), {"id": "english", "name": "English", "languages": ["en-gb"], "gender": None})
+            return [voice]
+        return self.props[name]
+
+    def save_to_file(self, text, path):
+        self._pending.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self._pending:
+            self.rendered.append((text, self.props["voice"], self.props["rate"]))
+            with open(path, "wb") as f:
+                f.write(f"{text}@{self.props['rate']}".encode())
+        self._pending = []
+
+    def stop(self):
+        pass
+
+@contextmanager
+def patched_audio(pygame=None, gtts=None) -> Iterator[None]:
+    """Swap fakes into audio_server's lazily imported pygame and gTTS, restoring them afterwards"""
+    original = audio_server.pygame, audio_server.gTTS
+    if pygame is not None:
+        audio_server.pygame = pygame
+    if gtts is not None:
+        audio_server.gTTS = gtts
+    try:
+        yield
+    finally:
+        audio_server.pygame, audio_server.gTTS = original
+
+def ready_player(cache_dir: str, engine=None) -> AudioPlayer:
+    """AudioPlayer caching under ``cache_dir`` whose mixer (and engine, if given) count as initialized"""
+    player = AudioPlayer(cache_dir=cache_dir)
+    player._pygame_initialized, player._pygame_loaded = True, True
+    if engine is not None:
+        player._tts_engine, player._tts_loaded = engine, True
+    return player
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        time.sleep(0.02)
@@ -121,8 +121,8 @@ def test_all_mcp_methods():
                 if test["name"] == "tools/list":
                     tools = result.get("tools", [])
                     print(f"   Found {len(tools)} tools")
-                    if len(tools) != 5:
-                        print(f"   ❌ Expected 5 tools, but found {len(tools)}")
+                    if len(tools) != 6:
+                        print(f"   ❌ Expected 6 tools, but found {len(tools)}")
                         all_passed = False
                 elif test["name"] == "resources/list":
                     resources = result.get("resources", [])
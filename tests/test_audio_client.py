@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the in-process AudioClient API
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_client import AudioClient, AudioResult, AudioStatus, Voice
+from audio_fakes import FakeGTTS, FakeMusic, fake_pygame, patched_audio, ready_player
+from audio_server import AsyncJSONRPCServer, MCPAudioServer, cancelled_result
+
+class OverlapMusic(FakeMusic):
+    """FakeMusic that counts plays started while another clip is still playing"""
+
+    def __init__(self, play_seconds: float):
+        super().__init__(play_seconds)
+        self.overlaps = 0
+
+    def load(self, source, namehint=""):
+        if self.get_busy():
+            self.overlaps += 1
+        super().load(source, namehint)
+
+class FakePlayer:
+    """AudioPlayer stand-in whose speech takes a fixed time and honors cancellation"""
+
+    def __init__(self, speak_seconds: float = 0.2):
+        self.speak_seconds = speak_seconds
+        self.spoken = []
+
+    def speak_text(self, text, rate=None, volume=None, voice_id=None, context=None):
+        deadline = time.monotonic() + self.speak_seconds
+        context.report_progress(0, 100, "Synthesizing")
+        while time.monotonic() < deadline:
+            if context.cancelled:
+                return cancelled_result()
+            time.sleep(0.01)
+        self.spoken.append(text)
+        context.report_progress(100, 100, "Finished")
+        return {"success": True, "message": f"Spoke: {text}"}
+
+    def play_audio_file(self, file_path, volume=None, context=None):
+        return {"success": False, "error": f"Audio file not found: {file_path}"}
+
+    def stop_audio(self):
+        return {"success": True, "message": "Audio playback stopped"}
+
+    def get_audio_status(self):
+        return {"success": True, "status": {"tts_available": True, "pygame_available": True, "music_playing": False}}
+
+    def list_voices(self, **filters):
+        return {"success": True, "voices": [{"id": "v1", "name": "Voice 1", "lang": ["en-us"], "gender": "female"}]}
+
+def test_speak_returns_typed_result_with_timings():
+    """Jobs run in order and report how long they queued and ran"""
+    player = FakePlayer(speak_seconds=0.2)
+
+    async def scenario():
+        async with AudioClient(player) as audio:
+            first = audio.speak("one")
+            second = audio.speak("two")
+            return await first, await second
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, AudioResult) and first.success and first.message == "Spoke: one"
+    assert player.spoken == ["one", "two"]
+    assert first.queued_seconds < 0.05 and 0.15 < first.run_seconds < 0.5, first
+    assert second.queued_seconds > 0.15, "second job waits for the first"
+    assert abs(second.total_seconds - second.queued_seconds - second.run_seconds) < 1e-9
+    print(f"✅ Typed results: queued {second.queued_seconds:.2f}s, ran {second.run_seconds:.2f}s")
+
+def test_cancel_timeout_and_progress():
+    """Jobs can be cancelled, time out and stream progress to a callback"""
+    player = FakePlayer(speak_seconds=2.0)
+    progress = []
+
+    async def scenario():
+        async with AudioClient(player) as audio:
+            job = audio.speak("cancel me")
+            await asyncio.sleep(0.1)
+            job.cancel()
+            cancelled = await job
+            timed_out = await audio.speak("too slow", timeout=0.1)
+            player.speak_seconds = 0.05
+            done = await audio.speak("quick", on_progress=lambda *args: progress.append(args))
+            return cancelled, timed_out, done
+
+    cancelled, timed_out, done = asyncio.run(scenario())
+    assert cancelled.cancelled and not cancelled.success and not cancelled.timed_out, cancelled
+    assert timed_out.timed_out and not timed_out.cancelled, timed_out
+    assert timed_out.error == "Timed out after 100 ms" and timed_out.run_seconds < 0.5
+    assert done.success
+    assert progress == [(0, 100, "Synthesizing"), (100, 100, "Finished")], progress
+    print("✅ Cancellation, timeout and progress callbacks work")
+
+def test_status_voices_and_stop():
+    """Queries return dataclasses; stop cancels pending jobs"""
+    player = FakePlayer(speak_seconds=1.0)
+
+    async def scenario():
+        async with AudioClient(player) as audio:
+            status = await audio.status()
+            voices = await audio.voices()
+            job = audio.speak("interrupted")
+            await asyncio.sleep(0.05)
+            stopped = await audio.stop()
+            return status, voices, stopped, await job, await audio.play_file("/missing.mp3")
+
+    status, voices, stopped, interrupted, missing = asyncio.run(scenario())
+    assert status == AudioStatus(tts_available=True, pygame_available=True, music_playing=False)
+    assert voices == [Voice(id="v1", name="Voice 1", lang=["en-us"], gender="female")]
+    assert stopped.success and interrupted.cancelled
+    assert not missing.success and "not found" in missing.error
+    print("✅ Status, voices and stop return typed results")
+
+def test_client_and_server_take_turns():
+    """An AudioClient and the dispatcher driving the same player never play at once"""
+    FakeGTTS.reset()
+    music = OverlapMusic(play_seconds=0.15)
+    with patched_audio(pygame=fake_pygame(music), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        player = ready_player(cache_dir)
+        player.configure_sound_cache(0)
+        server = MCPAudioServer()
+        server.audio_player = player
+        dispatcher = AsyncJSONRPCServer(server)
+
+        async def scenario():
+            async with AudioClient(player) as audio:
+                jobs = [audio.speak(f"客户端{i}") for i in range(3)]
+                calls = [asyncio.create_task(dispatcher.handle_message(json.dumps({
+                    "jsonrpc": "2.0", "id": i, "method": "tools/call",
+                    "params": {"name": "speak_text", "arguments": {"text": f"服务器{i}"}}
+                }))) for i in range(3)]
+                return await asyncio.gather(*jobs), await asyncio.gather(*calls)
+
+        results, responses = asyncio.run(scenario())
+        dispatcher.shutdown()
+
+        assert all(result.success for result in results), results
+        assert all(not json.loads(response)["result"]["isError"] for response in responses), responses
+        assert len(music.played) == 6 and music.overlaps == 0, f"{music.overlaps} overlapping plays"
+    print("✅ AudioClient and dispatcher took turns on the shared player")
+
+if __name__ == "__main__":
+    print("🧪 Testing AudioClient")
+    print("=" * 50)
+    test_speak_returns_typed_result_with_timings()
+    test_cancel_timeout_and_progress()
+    test_status_voices_and_stop()
+    test_client_and_server_take_turns()
+    print("\n🎉 All AudioClient tests passed!")
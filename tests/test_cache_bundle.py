@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test exporting and importing speech cache bundles
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to path
+sys.path.insert(0, PROJECT_ROOT)
+
+from speech_cache import SpeechCache, export_bundle, import_bundle
+
+def filled_cache(directory: str) -> SpeechCache:
+    """Cache with a popular clip, a rarely used one and one unused for ten days"""
+    cache = SpeechCache(directory)
+    for key, uses in (("hot", 3), ("rare", 1)):
+        cache.put(key, "mp3", key.encode() * 50)
+        for _ in range(uses):
+            cache.record_use(key, "mp3", {"text": key})
+    cache.flush_usage()
+    cache.put("stale", "mp3", b"stale" * 50)
+    cache._db().execute("UPDATE clips SET last_used = last_used - 10 * 86400 WHERE name = 'stale.mp3'")
+    return cache
+
+def test_round_trip_with_filters():
+    """Filtered exports select by usage and age; imports skip clips already cached"""
+    with tempfile.TemporaryDirectory() as directory:
+        source = filled_cache(os.path.join(directory, "source"))
+        bundle = os.path.join(directory, "speech.bundle")
+
+        hot = export_bundle(source, bundle, min_score=2)
+        assert [clip["name"] for clip in hot["clips"]] == ["hot.mp3"]
+        recent = export_bundle(source, bundle, max_age=86400)
+        assert sorted(clip["name"] for clip in recent["clips"]) == ["hot.mp3", "rare.mp3"]
+
+        manifest = export_bundle(source, bundle, codec="original")
+        assert len(manifest["clips"]) == 3 and not os.path.exists(bundle + ".tmp")
+
+        target = SpeechCache(os.path.join(directory, "target"))
+        target.put("rare", "mp3", b"rare" * 50)
+        assert import_bundle(target, bundle, codec="original") == {"imported": 2, "duplicate": 1, "corrupt": 0}
+        assert target.get("stale", "mp3") == b"stale" * 50
+        assert target.hot_clips(1)[0]["recipe"] == {"text": "hot"}, "usage travels with the clips"
+        assert import_bundle(target, bundle)["duplicate"] == 3
+    print("✅ Bundles round-trip with filters and deduplication")
+
+def test_corrupt_clips_are_rejected():
+    """A clip that does not match its checksum is skipped; other files are not bundles"""
+    with tempfile.TemporaryDirectory() as directory:
+        bundle = os.path.join(directory, "speech.bundle")
+        export_bundle(filled_cache(os.path.join(directory, "source")), bundle)
+
+        tampered = os.path.join(directory, "tampered.bundle")
+        with zipfile.ZipFile(bundle) as original, zipfile.ZipFile(tampered, "w") as copy:
+            for item in original.infolist():
+                data = original.read(item)
+                copy.writestr(item, b"x" * len(data) if item.filename == "clips/hot.mp3" else data)
+
+        target = SpeechCache(os.path.join(directory, "target"))
+        assert import_bundle(target, tampered)["corrupt"] == 1
+        assert target.get("hot", "mp3") is None
+
+        try:
+            import_bundle(target, os.path.join(directory, "target", "index.sqlite3"))
+        except ValueError as e:
+            assert "not a speech cache bundle" in str(e)
+        else:
+            raise AssertionError("a non-bundle was imported")
+    print("✅ Corrupt clips and non-bundles are rejected")
+
+def test_command_line():
+    """--export-cache and --import-cache move the cache between hosts and exit"""
+    with tempfile.TemporaryDirectory() as directory:
+        filled_cache(os.path.join(directory, "source", "speech"))
+        bundle = os.path.join(directory, "speech.bundle")
+
+        def run(cache_dir, *args):
+            env = dict(os.environ, AUDIO_SERVER_CACHE_DIR=cache_dir)
+            return subprocess.run([sys.executable, "audio_server.py", *args], cwd=PROJECT_ROOT, env=env,
+                                  capture_output=True, text=True, timeout=60)
+
+        exported = run(os.path.join(directory, "source"), "--export-cache", bundle, "--export-min-uses", "0.5")
+        assert exported.returncode == 0 and "Exported 2 clips" in exported.stderr, exported.stderr
+        with zipfile.ZipFile(bundle) as f:
+            assert json.loads(f.read("manifest.json"))["codec"] == "original"
+
+        imported = run(os.path.join(directory, "fresh"), "--import-cache", bundle)
+        assert imported.returncode == 0 and "Imported 2 clips" in imported.stderr, imported.stderr
+        assert SpeechCache(os.path.join(directory, "fresh", "speech")).stats()["entries"] == 2
+    print("✅ Command line export and import")
+
+if __name__ == "__main__":
+    print("🧪 Testing speech cache bundles")
+    print("=" * 50)
+    test_round_trip_with_filters()
+    test_corrupt_clips_are_rejected()
+    test_command_line()
+    print("\n🎉 All bundle tests passed!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test cancelling a real AudioPlayer call while it downloads and while it plays
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_fakes import FakeGTTS, FakeMusic, fake_pygame, patched_audio, ready_player, wait_for
+from audio_server import RequestContext, cancelled_result
+from speech_cache import speech_key
+
+TEXT = "构建完成"
+
+def speak_in_background(player, context: RequestContext):
+    """Start speak_text on a thread; returns the thread and the list its result lands in"""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(player.speak_text(TEXT, context=context)))
+    thread.start()
+    return thread, results
+
+def test_cancel_mid_download():
+    """Cancelling during the gTTS download stops it at the next chunk and plays nothing"""
+    FakeGTTS.reset(chunks=20, chunk_seconds=0.05)
+    music = FakeMusic()
+    with patched_audio(pygame=fake_pygame(music), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        player = ready_player(cache_dir)
+        context = RequestContext()
+        thread, results = speak_in_background(player, context)
+        wait_for(lambda: FakeGTTS.fetched >= 3)
+        context.cancel()
+        thread.join(timeout=1.0)
+
+        assert not thread.is_alive(), "speak_text kept downloading after cancel"
+        assert results == [cancelled_result()], results
+        assert FakeGTTS.fetched < FakeGTTS.chunks, f"all {FakeGTTS.fetched} chunks fetched"
+        assert music.played == [], "cancelled speech was played"
+        assert not player.speech_cache.contains(speech_key(TEXT, "gtts", lang="zh-cn", fmt="mp3"), "mp3")
+    print(f"✅ Download stopped after {FakeGTTS.fetched}/{FakeGTTS.chunks} chunks")
+
+def test_cancel_during_playback():
+    """Cancelling during playback stops the mixer at once; the finished download stays cached"""
+    FakeGTTS.reset()
+    music = FakeMusic(play_seconds=5.0)
+    with patched_audio(pygame=fake_pygame(music), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        player = ready_player(cache_dir)
+        context = RequestContext()
+        thread, results = speak_in_background(player, context)
+        wait_for(lambda: music.get_busy())
+        start = time.monotonic()
+        context.cancel()
+        thread.join(timeout=1.0)
+        elapsed = time.monotonic() - start
+
+        assert not thread.is_alive(), "speak_text kept playing after cancel"
+        assert results == [cancelled_result()], results
+        assert music.stopped == 1 and not music.get_busy()
+        assert player.speech_cache.contains(speech_key(TEXT, "gtts", lang="zh-cn", fmt="mp3"), "mp3")
+    print(f"✅ Playback stopped {elapsed:.2f}s after cancel")
+
+def test_cancelled_before_start():
+    """A call cancelled before it reaches the audio worker downloads nothing"""
+    FakeGTTS.reset()
+    with patched_audio(pygame=fake_pygame(), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        context = RequestContext()
+        context.cancel()
+        assert ready_player(cache_dir).speak_text(TEXT, context=context) == cancelled_result()
+        assert FakeGTTS.downloads == 0
+    print("✅ Cancelled call never started")
+
+if __name__ == "__main__":
+    print("🧪 Testing cancellation of audio calls")
+    print("=" * 50)
+    test_cancel_mid_download()
+    test_cancel_during_playback()
+    test_cancelled_before_start()
+    print("\n🎉 All cancellation tests passed!")
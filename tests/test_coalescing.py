@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test that concurrent requests for the same speech share one synthesis
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_fakes import FakeGTTS, fake_pygame, patched_audio, ready_player, wait_for
+from audio_server import AsyncJSONRPCServer, ClientSession, MCPAudioServer
+from speech_cache import SingleFlight, speech_key
+
+def test_single_flight_shares_one_call():
+    """Concurrent callers with one key run the function once"""
+    flights = SingleFlight()
+    calls = []
+
+    def render():
+        calls.append(1)
+        time.sleep(0.2)
+        return b"audio"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", render))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b"audio"] * 5 and len(calls) == 1 and flights.shared == 4
+    assert flights.do("k", lambda: b"again") == b"again", "finished flights are not reused"
+    print("✅ Single flight shares one call")
+
+def test_cancelled_leader_hands_over():
+    """A follower takes over when the leader's call is cancelled; errors reach everyone"""
+    flights = SingleFlight()
+    started = threading.Event()
+
+    def cancelled():
+        started.set()
+        time.sleep(0.1)
+        return None
+
+    leader = threading.Thread(target=flights.do, args=("k", cancelled))
+    leader.start()
+    started.wait()
+    assert flights.do("k", lambda: b"follower") == b"follower"
+    leader.join()
+
+    def broken():
+        time.sleep(0.1)
+        raise RuntimeError("network down")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("e", broken)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["network down"] * 3
+    print("✅ Cancelled leaders hand over, errors propagate")
+
+def test_progress_reaches_every_caller():
+    """Every caller sharing a flight gets its progress, including what was reported before it joined"""
+    flights = SingleFlight()
+    reported = threading.Event()
+    release = threading.Event()
+
+    def render():
+        flights.report("k", 0, 100, "started")
+        reported.set()
+        release.wait()
+        flights.report("k", 50, 100, "halfway")
+        return b"audio"
+
+    leader_seen, follower_seen = [], []
+    leader = threading.Thread(target=flights.do, args=("k", render),
+                              kwargs={"progress": lambda *args: leader_seen.append(args[2])})
+    leader.start()
+    reported.wait()
+    follower = threading.Thread(target=flights.do, args=("k", render),
+                                kwargs={"progress": lambda *args: follower_seen.append(args[2])})
+    follower.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert leader_seen == follower_seen == ["started", "halfway"], (leader_seen, follower_seen)
+    print("✅ Flight progress reaches every caller")
+
+def test_burst_of_identical_requests_downloads_once():
+    """Sessions asking for the same Chinese text at once share one gTTS download"""
+    FakeGTTS.reset(chunk_seconds=0.3)
+    with patched_audio(pygame=fake_pygame(), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        server = MCPAudioServer()
+        server.audio_player = ready_player(cache_dir)
+        dispatcher = AsyncJSONRPCServer(server)
+
+        async def speak(session_id):
+            return json.loads(await dispatcher.handle_message(json.dumps({
+                "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                "params": {"name": "speak_text", "arguments": {"text": "构建完成"}}
+            }), ClientSession(session_id)))
+
+        async def scenario():
+            return await asyncio.gather(*(speak(f"session-{i}") for i in range(4)))
+
+        start = time.monotonic()
+        responses = asyncio.run(scenario())
+        elapsed = time.monotonic() - start
+        dispatcher.shutdown()
+
+        assert all(not r["result"]["isError"] for r in responses), responses
+        assert FakeGTTS.downloads == 1, f"{FakeGTTS.downloads} downloads"
+        assert elapsed < 2 * FakeGTTS.chunk_seconds, f"calls waited for repeated downloads ({elapsed:.2f}s)"
+    print(f"✅ 4 identical requests, 1 download, {elapsed:.2f}s")
+
+def test_render_ahead_stops_when_callers_give_up():
+    """Cancelling or timing out every waiting call stops the render-ahead download"""
+    for arguments, cancel in (({"text": "构建完成"}, True), ({"text": "部署完成", "timeout_ms": 300}, False)):
+        FakeGTTS.reset(chunks=20, chunk_seconds=0.05)
+        with patched_audio(pygame=fake_pygame(), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+            server = MCPAudioServer()
+            server.audio_player = ready_player(cache_dir)
+            dispatcher = AsyncJSONRPCServer(server)
+
+            async def scenario():
+                call = asyncio.create_task(dispatcher.handle_message(json.dumps({
+                    "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                    "params": {"name": "speak_text", "arguments": arguments}
+                })))
+                await asyncio.sleep(0.3)
+                if cancel:
+                    await dispatcher.handle_message(json.dumps({
+                        "jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 1}
+                    }))
+                return await asyncio.wait_for(call, timeout=2.0)
+
+            asyncio.run(scenario())
+            # The render thread notices at its next chunk
+            wait_for(lambda: not dispatcher._render_waiters)
+            fetched = FakeGTTS.fetched
+            dispatcher.shutdown()
+
+            assert fetched < FakeGTTS.chunks, f"{fetched} of {FakeGTTS.chunks} chunks fetched"
+            assert not server.audio_player.speech_cache.contains(
+                speech_key(arguments["text"], "gtts", lang="zh-cn", fmt="mp3"), "mp3")
+        print(f"✅ Render-ahead stopped after {fetched}/{FakeGTTS.chunks} chunks ({'cancel' if cancel else 'timeout'})")
+
+def test_render_ahead_reports_progress():
+    """A call that joins its render-ahead download still gets the synthesis notifications"""
+    FakeGTTS.reset(chunks=4, chunk_seconds=0.1)
+    with patched_audio(pygame=fake_pygame(), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        server = MCPAudioServer()
+        server.audio_player = ready_player(cache_dir)
+        dispatcher = AsyncJSONRPCServer(server)
+        sent = []
+        # Keep the audio worker busy so the call waits while render-ahead leads the download
+        dispatcher.audio_executor.submit(time.sleep, 0.25)
+        response = json.loads(asyncio.run(dispatcher.handle_message(json.dumps({
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "speak_text", "arguments": {"text": "构建完成"}, "_meta": {"progressToken": "t"}}
+        }), ClientSession("s", sent.append))))
+        dispatcher.shutdown()
+
+        assert not response["result"]["isError"], response
+        assert FakeGTTS.downloads == 1
+        messages = [m["params"].get("message") for m in sent]
+        assert messages[:5] == ["Synthesizing speech with gTTS"] + [f"Fetched chunk {i}/4" for i in range(1, 5)], messages
+        assert "Finished" in messages
+    print("✅ Render-ahead progress reaches the waiting call")
+
+if __name__ == "__main__":
+    print("🧪 Testing synthesis coalescing")
+    print("=" * 50)
+    test_single_flight_shares_one_call()
+    test_cancelled_leader_hands_over()
+    test_progress_reaches_every_caller()
+    test_burst_of_identical_requests_downloads_once()
+    test_render_ahead_stops_when_callers_give_up()
+    test_render_ahead_reports_progress()
+    print("\n🎉 All coalescing tests passed!")
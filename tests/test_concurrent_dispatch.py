@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test concurrent JSON-RPC dispatch for MCP Audio Server
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_server import AsyncJSONRPCServer, MCPAudioServer
+
+class SlowSpeechServer(MCPAudioServer):
+    """MCPAudioServer whose speak_text takes a fixed, long time"""
+
+    def __init__(self, speak_seconds: float = 1.0):
+        super().__init__()
+        self.speak_seconds = speak_seconds
+
+    def call_tool(self, name, arguments, context=None):
+        if name == "speak_text":
+            deadline = time.monotonic() + self.speak_seconds
+            while time.monotonic() < deadline:
+                if context is not None and context.cancelled:
+                    return {"content": [{"type": "text", "text": "cancelled"}], "isError": True}
+                time.sleep(0.01)
+            return {"content": [{"type": "text", "text": "spoken"}], "isError": False}
+        return super().call_tool(name, arguments, context)
+
+def tool_call(request_id, name, arguments=None):
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments or {}}
+    })
+
+def test_status_not_blocked_by_speech():
+    """get_audio_status answers while speak_text is still running"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=1.0))
+    finished = []
+
+    async def run(line):
+        response = json.loads(await dispatcher.handle_message(line))
+        finished.append((response["id"], time.monotonic()))
+
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(
+            run(tool_call(1, "speak_text", {"text": "A long utterance"})),
+            run(tool_call(2, "get_audio_status")),
+            run(json.dumps({"jsonrpc": "2.0", "id": 3, "method": "tools/list"})),
+        )
+        return start
+
+    start = asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    order = [request_id for request_id, _ in finished]
+    assert order[-1] == 1, f"speak_text should finish last, got {order}"
+    status_time = dict(finished)[2] - start
+    assert status_time < 0.5, f"status took {status_time:.2f}s behind speech"
+    print(f"✅ Status answered in {status_time * 1000:.1f} ms while speech was playing")
+
+def test_notifications_get_no_response():
+    """Notifications produce no output"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer())
+    response = asyncio.run(dispatcher.handle_message(
+        json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"})
+    ))
+    dispatcher.shutdown()
+    assert response == b""
+    print("✅ Notification produced no response")
+
+def test_batch_runs_concurrently():
+    """A batch returns one array; status calls don't wait for speech"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.3))
+    batch = "[" + ",".join([
+        tool_call(1, "speak_text", {"text": "one"}),
+        tool_call(2, "speak_text", {"text": "two"}),
+        tool_call(3, "get_audio_status"),
+        json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}),
+        json.dumps("not a request"),
+    ]) + "]"
+
+    start = time.monotonic()
+    responses = json.loads(asyncio.run(dispatcher.handle_message(batch)))
+    elapsed = time.monotonic() - start
+    dispatcher.shutdown()
+
+    assert isinstance(responses, list)
+    assert [r.get("id") for r in responses] == [1, 2, 3, 0]
+    assert responses[3]["error"]["code"] == -32600
+    # The two utterances share the audio worker, so they take ~2x speak_seconds
+    assert 0.55 < elapsed < 1.0, f"batch took {elapsed:.2f}s"
+    print(f"✅ Batch of {len(responses)} responses in {elapsed:.2f}s")
+
+def test_empty_and_notification_batches():
+    """Empty batches are invalid; notification-only batches get no response"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer())
+    empty = json.loads(asyncio.run(dispatcher.handle_message("[]")))
+    silent = asyncio.run(dispatcher.handle_message(
+        json.dumps([{"jsonrpc": "2.0", "method": "notifications/initialized"}])
+    ))
+    dispatcher.shutdown()
+    assert empty["error"]["code"] == -32600
+    assert silent == b""
+    print("✅ Empty and notification-only batches handled")
+
+def test_cancellation_stops_speech():
+    """notifications/cancelled aborts the running call and suppresses its response"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=5.0))
+
+    async def scenario():
+        speech = asyncio.create_task(dispatcher.handle_message(tool_call(1, "speak_text", {"text": "long"})))
+        queued = asyncio.create_task(dispatcher.handle_message(tool_call(2, "speak_text", {"text": "next"})))
+        await asyncio.sleep(0.1)
+        assert set(dispatcher.in_flight) == {("stdio", 1), ("stdio", 2)}
+        for request_id in (2, 1):
+            await dispatcher.handle_message(json.dumps({
+                "jsonrpc": "2.0",
+                "method": "notifications/cancelled",
+                "params": {"requestId": request_id, "reason": "test"}
+            }))
+        return await asyncio.wait_for(asyncio.gather(speech, queued), timeout=1.0)
+
+    start = time.monotonic()
+    responses = asyncio.run(scenario())
+    elapsed = time.monotonic() - start
+    dispatcher.shutdown()
+
+    assert responses == [b"", b""], responses
+    assert not dispatcher.in_flight
+    print(f"✅ Cancelled speech released the worker after {elapsed:.2f}s")
+
+def test_full_queue_refuses_with_busy_error():
+    """Blocking calls beyond max_queue get "Server busy" while status still answers"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.3), max_queue=2)
+
+    async def scenario():
+        calls = [dispatcher.handle_message(tool_call(i, "speak_text", {"text": f"utterance {i}"}))
+                 for i in range(1, 5)]
+        calls.append(dispatcher.handle_message(tool_call(5, "get_audio_status")))
+        calls.append(dispatcher.handle_message(json.dumps({"jsonrpc": "2.0", "id": 6, "method": "tools/list"})))
+        return [json.loads(response) for response in await asyncio.gather(*calls)]
+
+    responses = {response["id"]: response for response in asyncio.run(scenario())}
+    dispatcher.shutdown()
+
+    assert "result" in responses[1] and "result" in responses[2]
+    for request_id in (3, 4):
+        error = responses[request_id]["error"]
+        assert error["code"] == -32000 and error["message"] == "Server busy", error
+        assert error["data"] == {"queueDepth": 2, "maxQueue": 2}, error
+    assert "result" in responses[5] and "result" in responses[6]
+    assert dispatcher.audio_queue_depth == 0 and dispatcher.rejected_count == 2
+    print("✅ Full audio queue refused extra calls; status and tools/list still answered")
+
+if __name__ == "__main__":
+    test_status_not_blocked_by_speech()
+    test_notifications_get_no_response()
+    test_batch_runs_concurrently()
+    test_empty_and_notification_batches()
+    test_cancellation_stops_speech()
+    test_full_queue_refuses_with_busy_error()
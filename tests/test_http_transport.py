@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test the Streamable HTTP transport against 127.0.0.1
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_server import AsyncJSONRPCServer, MCPAudioServer
+from http_transport import StreamableHTTPTransport
+
+def start_transport(session_timeout=None):
+    """Run a transport on an ephemeral port in a background event loop"""
+    loop = asyncio.new_event_loop()
+    dispatcher = AsyncJSONRPCServer(MCPAudioServer())
+    transport = StreamableHTTPTransport(dispatcher, "127.0.0.1", 0, session_timeout=session_timeout)
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    host, port = asyncio.run_coroutine_threadsafe(transport.start(), loop).result(5)
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(transport.close(), loop).result(5)
+        dispatcher.shutdown()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return host, port, transport, stop
+
+def post(connection, message, session_id=None, accept="application/json, text/event-stream"):
+    headers = {"Content-Type": "application/json", "Accept": accept}
+    if session_id:
+        headers["Mcp-Session-Id"] = session_id
+    connection.request("POST", "/mcp", json.dumps(message), headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+def sse_messages(body: bytes):
+    return [json.loads(line[len(b"data: "):]) for line in body.splitlines() if line.startswith(b"data: ")]
+
+def test_http_session_lifecycle():
+    """initialize hands out a session; tools work; DELETE ends it"""
+    host, port, transport, stop = start_transport()
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        response, body = post(connection, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+        session_id = response.getheader("Mcp-Session-Id")
+        assert response.status == 200 and session_id
+        assert json.loads(body)["result"]["serverInfo"]["name"] == "audio-server"
+
+        response, body = post(connection, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session_id)
+        assert response.status == 202 and body == b""
+
+        response, body = post(connection, [
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+            {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+             "params": {"name": "get_audio_status", "arguments": {}}},
+        ], session_id)
+        assert response.status == 200
+        assert [r["id"] for r in json.loads(body)] == [2, 3]
+
+        response, _ = post(connection, {"jsonrpc": "2.0", "id": 4, "method": "tools/list"})
+        assert response.status == 400
+        response, _ = post(connection, {"jsonrpc": "2.0", "id": 4, "method": "tools/list"}, "unknown")
+        assert response.status == 404
+
+        connection.request("DELETE", "/mcp", headers={"Mcp-Session-Id": session_id})
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200 and session_id not in transport.sessions
+        print("✅ HTTP session lifecycle works")
+    finally:
+        stop()
+
+def test_http_progress_streams_as_sse():
+    """A call with a progressToken is answered as an SSE stream ending in the response"""
+    host, port, transport, stop = start_transport()
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        response, _ = post(connection, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+        session_id = response.getheader("Mcp-Session-Id")
+
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        response, body = post(connection, {
+            "jsonrpc": "2.0", "id": 2, "method": "tools/call",
+            "params": {"name": "speak_text", "arguments": {"text": "Hello over HTTP"},
+                       "_meta": {"progressToken": "speech-1"}}
+        }, session_id)
+        assert response.getheader("Content-Type") == "text/event-stream"
+        messages = sse_messages(body)
+        assert messages[-1]["id"] == 2
+        progress = [m for m in messages if m.get("method") == "notifications/progress"]
+        assert all(m["params"]["progressToken"] == "speech-1" for m in progress)
+        print(f"✅ SSE stream carried {len(progress)} progress events before the response")
+    finally:
+        stop()
+
+def test_http_rejects_foreign_origin():
+    """Requests from non-local browser origins are refused"""
+    host, port, _, stop = start_transport()
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        connection.request("POST", "/mcp", "{}", {"Origin": "http://evil.example"})
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 403
+        print("✅ Foreign origin rejected")
+    finally:
+        stop()
+
+def raw_post_status(host, port, length_header: str) -> int:
+    """Status of a POST sent with the given Content-Length header line ("" for none)"""
+    with socket.create_connection((host, port), timeout=10) as sock:
+        sock.sendall(f"POST /mcp HTTP/1.1\r\nHost: {host}\r\n{length_header}\r\n{{}}".encode("latin-1"))
+        return int(sock.recv(1024).split(b" ", 2)[1])
+
+def test_http_rejects_bad_content_length():
+    """A POST with a missing or malformed Content-Length gets 400"""
+    host, port, _, stop = start_transport()
+    try:
+        assert raw_post_status(host, port, "") == 400
+        assert raw_post_status(host, port, "Content-Length: abc\r\n") == 400
+        assert raw_post_status(host, port, "Content-Length: -1\r\n") == 400
+        print("✅ Bad Content-Length rejected")
+    finally:
+        stop()
+
+def test_http_idle_sessions_expire():
+    """Sessions idle past the timeout are ended; one with an open stream is kept"""
+    host, port, transport, stop = start_transport(session_timeout=0.3)
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        response, _ = post(connection, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+        idle = response.getheader("Mcp-Session-Id")
+        response, _ = post(connection, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+        streaming = response.getheader("Mcp-Session-Id")
+
+        listener = http.client.HTTPConnection(host, port, timeout=10)
+        listener.request("GET", "/mcp", headers={"Accept": "text/event-stream", "Mcp-Session-Id": streaming})
+        # Keep the response: closing it closes the stream
+        stream = listener.getresponse()
+        assert stream.status == 200
+
+        time.sleep(1.0)
+        assert idle not in transport.sessions, "idle session was kept"
+        assert streaming in transport.sessions, "session with an open stream expired"
+        response, _ = post(connection, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, idle)
+        assert response.status == 404
+        stream.close()
+        print("✅ Idle HTTP sessions expire")
+    finally:
+        stop()
+
+if __name__ == "__main__":
+    test_http_session_lifecycle()
+    test_http_progress_streams_as_sse()
+    test_http_rejects_foreign_origin()
+    test_http_rejects_bad_content_length()
+    test_http_idle_sessions_expire()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test that importing audio_server is cheap and the audio stack loads on first use
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AUDIO_MODULES = ("pygame", "pyttsx3", "gtts")
+
+def run_python(code: str, stdin: str = "") -> str:
+    """Run code in a fresh interpreter from the project root and return its stdout"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], input=stdin, capture_output=True, text=True,
+        cwd=PROJECT_ROOT, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+def test_import_loads_no_audio_stack():
+    """Importing the module and building the server touches no audio library"""
+    output = run_python(
+        "import json, logging, sys\n"
+        "import audio_server\n"
+        "server = audio_server.server\n"
+        "assert server is audio_server.get_server()\n"
+        f"print(json.dumps([m for m in {AUDIO_MODULES!r} if m in sys.modules]))\n"
+        "print(json.dumps(logging.getLogger().handlers == []))\n"
+    )
+    loaded, untouched_logging = (json.loads(line) for line in output.splitlines())
+    assert loaded == [], f"audio modules imported eagerly: {loaded}"
+    assert untouched_logging, "importing must not configure the root logger"
+    print("✅ Import is side-effect free")
+
+def test_handshake_without_audio_stack():
+    """initialize and tools/list are answered before any audio library is loaded"""
+    requests = "\n".join(json.dumps(request) for request in (
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+    ))
+    output = run_python(
+        "import asyncio, json, sys\n"
+        "from audio_server import AsyncJSONRPCServer\n"
+        "dispatcher = AsyncJSONRPCServer()\n"
+        "async def main():\n"
+        "    for line in sys.stdin:\n"
+        "        print((await dispatcher.handle_message(line.encode())).decode())\n"
+        "asyncio.run(main())\n"
+        "dispatcher.shutdown()\n"
+        f"print(json.dumps([m for m in {AUDIO_MODULES!r} if m in sys.modules]))\n",
+        stdin=requests
+    )
+    initialize, tools, loaded = (json.loads(line) for line in output.splitlines())
+    assert initialize["result"]["serverInfo"]["name"] == "audio-server"
+    assert len(tools["result"]["tools"]) == 6
+    assert loaded == [], f"handshake loaded {loaded}"
+    print("✅ Handshake answered without loading pygame, pyttsx3 or gTTS")
+
+def test_status_without_audio_stack():
+    """get_audio_status reports the stack as not initialized instead of loading it"""
+    output = run_python(
+        "import json, sys\n"
+        "from audio_server import AudioPlayer\n"
+        "status = AudioPlayer(cache_dir='').get_audio_status()['status']\n"
+        "print(json.dumps(status))\n"
+        f"print(json.dumps([m for m in {AUDIO_MODULES!r} if m in sys.modules]))\n"
+    )
+    status, loaded = (json.loads(line) for line in output.splitlines())
+    assert status["tts_initialized"] is False and status["pygame_initialized"] is False
+    assert status["tts_available"] is False and status["music_playing"] is False
+    assert loaded == [], f"get_audio_status loaded {loaded}"
+    print("✅ Status reported without loading pygame, pyttsx3 or gTTS")
+
+def test_profile_startup_report():
+    """--profile-startup prints every phase to stderr and nothing to stdout"""
+    result = subprocess.run(
+        [sys.executable, "audio_server.py", "--profile-startup"], capture_output=True, text=True,
+        cwd=PROJECT_ROOT, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "", "stdout is reserved for JSON-RPC"
+    for phase in ("module imports", "first initialize response", "import pygame",
+                  "_init_tts", "_init_pygame", "ready for initialize"):
+        assert phase in result.stderr, f"missing phase '{phase}':\n{result.stderr}"
+    print("✅ Startup profile reports every phase")
+
+if __name__ == "__main__":
+    print("🧪 Testing lazy initialization")
+    print("=" * 50)
+    test_import_loads_no_audio_stack()
+    test_handshake_without_audio_stack()
+    test_status_without_audio_stack()
+    test_profile_startup_report()
+    print("\n🎉 All lazy initialization tests passed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test usage statistics and prefetching the hot set at startup
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_fakes import FakeGTTS, fake_pygame, patched_audio, ready_player, wait_for
+from audio_server import AsyncJSONRPCServer, AudioPlayer, MCPAudioServer
+from speech_cache import SpeechCache, speech_key
+
+def player_for(cache_dir: str) -> AudioPlayer:
+    player = ready_player(cache_dir)
+    player.configure_sound_cache(1)
+    return player
+
+def key_for(text: str) -> str:
+    return speech_key(text, "gtts", lang="zh-cn", fmt="mp3")
+
+def test_usage_scores_decay_and_persist():
+    """Request counts decay with their half-life, survive a reopen and are forgotten once cold"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory, usage_half_life=60)
+        for _ in range(3):
+            cache.record_use("a", "mp3", {"text": "A"})
+        cache.record_use("b", "mp3", {"text": "B"})
+        assert SpeechCache(directory).hot_clips(5) == [], "counts stay in memory until flushed"
+        cache.flush_usage()
+
+        hot = SpeechCache(directory, usage_half_life=60).hot_clips(5)
+        assert [clip["key"] for clip in hot] == ["a", "b"]
+        assert hot[0]["recipe"] == {"text": "A"} and abs(hot[0]["score"] - 3) < 0.01
+
+        # Two half-lives later, a counts for a quarter as much
+        cache._db().execute("UPDATE usage SET updated = updated - 120 WHERE key = 'a'")
+        cache.record_use("a", "mp3", {"text": "A"})
+        assert abs(cache.hot_clips(1)[0]["score"] - 1.75) < 0.01
+
+        cache._db().execute("UPDATE usage SET updated = updated - 6000")
+        assert cache.hot_clips(5) == [], "cold keys are forgotten"
+    print("✅ Usage scores decay and persist")
+
+def test_usage_flushed_by_timer():
+    """Counts gathered in memory reach the index within the flush interval, without a read"""
+    import speech_cache
+    interval = speech_cache.USAGE_FLUSH_INTERVAL
+    speech_cache.USAGE_FLUSH_INTERVAL = 0.1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SpeechCache(directory)
+            cache.record_use("a", "mp3", {"text": "A"})
+            cache.record_use("a", "mp3", {"text": "A"})
+            other = SpeechCache(directory)
+            wait_for(lambda: other.hot_clips(1))
+            assert abs(other.hot_clips(1)[0]["score"] - 2) < 0.01
+    finally:
+        speech_cache.USAGE_FLUSH_INTERVAL = interval
+    print("✅ Usage counts are flushed by the timer")
+
+def test_restart_warms_hot_set():
+    """After a restart the hottest clips are in memory and an evicted one is rendered again"""
+    FakeGTTS.reset()
+    with patched_audio(pygame=fake_pygame(), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        before = player_for(cache_dir)
+        for text, times in (("构建完成", 3), ("测试失败", 2), ("部署完成", 1)):
+            for _ in range(times):
+                assert before.speak_text(text)["success"]
+        # The second most popular clip has since been evicted from disk
+        before.speech_cache._db().execute("DELETE FROM clips WHERE name = ?", (key_for("测试失败") + ".mp3",))
+        before.speech_cache.flush_usage()
+
+        FakeGTTS.downloads = 0
+        server = MCPAudioServer()
+        server.audio_player = player = player_for(cache_dir)
+        dispatcher = AsyncJSONRPCServer(server, prefetch=2)
+        wait_for(lambda: dispatcher.prewarm_stats["rendered"] == 1)
+        dispatcher.shutdown()
+
+        assert dispatcher.prefetch_stats == {"runs": 1, "loaded": 1, "rerendered": 1}, dispatcher.prefetch_stats
+        assert player.sound_cache.peek(key_for("构建完成")) is not None
+        assert player.sound_cache.peek(key_for("部署完成")) is None, "only the top 2 are prefetched"
+        assert player.speech_cache.contains(key_for("测试失败"), "mp3")
+        assert FakeGTTS.downloads == 1
+
+        assert player.speak_text("构建完成")["cached"]
+        assert player.sound_cache.stats()["hits"] == 1 and player.speech_cache.stats()["hits"] == 0
+        assert "Prefetch: top 2, 1 clips in memory, 1 re-rendered" in dispatcher.status_lines()
+    print("✅ Restart warms the hot set")
+
+if __name__ == "__main__":
+    print("🧪 Testing usage-driven prefetch")
+    print("=" * 50)
+    test_usage_scores_decay_and_persist()
+    test_usage_flushed_by_timer()
+    test_restart_warms_hot_set()
+    print("\n🎉 All prefetch tests passed!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test pre-warming the speech cache from a phrase list
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_fakes import FakeGTTS, RenderingEngine, patched_audio, wait_for
+from audio_server import AsyncJSONRPCServer, AudioPlayer, MCPAudioServer
+from speech_cache import load_phrase_file, speech_key
+
+PHRASES = """\
+# Fixed prompts
+Build finished
+Tests failed | rate=180 lang=en
+
+构建完成
+测试失败
+部署完成
+"""
+
+def write_phrases(directory: str) -> str:
+    path = os.path.join(directory, "phrases.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(PHRASES)
+    return path
+
+def prewarm_server(cache_dir: str) -> MCPAudioServer:
+    server = MCPAudioServer()
+    server.audio_player = AudioPlayer(cache_dir=cache_dir)
+    server.audio_player._tts_engine = RenderingEngine()
+    server.audio_player._tts_loaded = True
+    return server
+
+def test_phrase_file_format():
+    """Comments and blank lines are skipped; options are parsed and checked"""
+    with tempfile.TemporaryDirectory() as directory:
+        phrases = load_phrase_file(write_phrases(directory))
+        assert phrases[:2] == [{"text": "Build finished"}, {"text": "Tests failed", "rate": 180, "lang": "en"}]
+        assert len(phrases) == 5
+
+        bad = os.path.join(directory, "bad.txt")
+        with open(bad, "w", encoding="utf-8") as f:
+            f.write("Hello | pitch=3\n")
+        try:
+            load_phrase_file(bad)
+        except ValueError as e:
+            assert "bad.txt:1" in str(e)
+        else:
+            raise AssertionError("unknown option accepted")
+    print("✅ Phrase file format")
+
+def test_startup_prewarm_fills_cache_in_parallel():
+    """Phrases are rendered at startup; gTTS downloads overlap"""
+    FakeGTTS.reset(chunk_seconds=0.3)
+    with patched_audio(gtts=FakeGTTS), tempfile.TemporaryDirectory() as directory:
+        server = prewarm_server(os.path.join(directory, "cache"))
+        start = time.monotonic()
+        dispatcher = AsyncJSONRPCServer(server, prewarm_file=write_phrases(directory))
+        stats = dispatcher.prewarm_stats
+        wait_for(lambda: stats["rendered"] + stats["cached"] + stats["failed"] == 5)
+        elapsed = time.monotonic() - start
+        dispatcher.shutdown()
+
+        engine = server.audio_player._tts_engine
+        assert stats == {"queued": 5, "rendered": 5, "cached": 0, "failed": 0}, stats
+        assert elapsed < 3 * FakeGTTS.chunk_seconds, f"gTTS downloads ran one after another ({elapsed:.2f}s)"
+        assert engine.rendered == [("Build finished", "default", 150), ("Tests failed", "english", 180)]
+        assert engine.props == {"voice": "default", "rate": 150}, "engine settings are restored"
+
+        cache = server.audio_player.speech_cache
+        assert cache.contains(speech_key("构建完成", "gtts", lang="zh-cn", fmt="mp3"), "mp3")
+        key, fmt = server.audio_player._engine_key("Tests failed", "english", 180)
+        assert cache.contains(key, fmt), "speak_text with voice_id=english, rate=180 will hit"
+        assert "Prewarm: 5/5 phrases (5 rendered" in dispatcher.status_lines()[1]
+    print(f"✅ Startup pre-warm filled the cache in {elapsed:.2f}s")
+
+def test_prewarm_tool_skips_cached_phrases():
+    """prewarm_cache runs on demand and leaves cached phrases alone"""
+    with tempfile.TemporaryDirectory() as directory:
+        server = prewarm_server(os.path.join(directory, "cache"))
+        dispatcher = AsyncJSONRPCServer(server)
+
+        async def call(phrases):
+            return json.loads(await dispatcher.handle_message(json.dumps({
+                "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                "params": {"name": "prewarm_cache", "arguments": {"phrases": phrases}}
+            })))
+
+        first = asyncio.run(call(["Deploy done", "Deploy failed"]))
+        wait_for(lambda: dispatcher.prewarm_stats["rendered"] == 2)
+        asyncio.run(call(["Deploy done"]))
+        wait_for(lambda: dispatcher.prewarm_stats["cached"] == 1)
+        dispatcher.shutdown()
+
+        assert "Pre-warming 2 phrases" in first["result"]["content"][0]["text"], first
+        assert len(server.audio_player._tts_engine.rendered) == 2
+    print("✅ prewarm_cache tool works on demand")
+
+def test_prewarm_tool_checks_phrase_options():
+    """prewarm_cache is a built-in tool; its phrases take the phrase file's options and are checked the same way"""
+    with tempfile.TemporaryDirectory() as directory:
+        server = prewarm_server(os.path.join(directory, "cache"))
+        assert "prewarm_cache" in server.registry
+        no_dispatcher = server.call_tool("prewarm_cache", {"phrases": ["Deploy done"]})
+        assert no_dispatcher["isError"] and "dispatcher" in no_dispatcher["content"][0]["text"]
+
+        dispatcher = AsyncJSONRPCServer(server)
+        bad = server.call_tool("prewarm_cache", {"phrases": ["Deploy done", "Deploy failed | pitch=3"]})
+        assert bad["isError"] and "Invalid phrase 2: unknown option 'pitch=3'" in bad["content"][0]["text"], bad
+        bad_rate = server.call_tool("prewarm_cache", {"phrases": ["Deploy failed | rate=fast"]})
+        assert bad_rate["isError"] and "rate must be an integer" in bad_rate["content"][0]["text"], bad_rate
+        assert dispatcher.prewarm_stats["queued"] == 0, "nothing is queued when a phrase is invalid"
+
+        server.call_tool("prewarm_cache", {"phrases": ["Deploy failed | voice=english rate=180"]})
+        wait_for(lambda: dispatcher.prewarm_stats["rendered"] == 1)
+        dispatcher.shutdown()
+
+        assert server.audio_player._tts_engine.rendered == [("Deploy failed", "english", 180)]
+    print("✅ prewarm_cache checks phrase options")
+
+if __name__ == "__main__":
+    print("🧪 Testing speech cache pre-warming")
+    print("=" * 50)
+    test_phrase_file_format()
+    test_startup_prewarm_fills_cache_in_parallel()
+    test_prewarm_tool_skips_cached_phrases()
+    test_prewarm_tool_checks_phrase_options()
+    print("\n🎉 All pre-warm tests passed!")
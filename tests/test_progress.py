@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test progress notifications for MCP Audio Server
+"""
+
+import os
+import sys
+import tempfile
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_fakes import FakeGTTS, fake_pygame, patched_audio, ready_player
+from audio_server import RequestContext, estimate_mp3_duration
+
+def test_progress_requires_token():
+    """Without a progressToken nothing is sent"""
+    sent = []
+    RequestContext(1, None, sent.append).report_progress(10, 100, "ignored")
+    assert sent == []
+    print("✅ No notifications without a progress token")
+
+def test_progress_is_monotonic_and_throttled():
+    """Progress never goes backwards and throttled updates are spaced out"""
+    sent = []
+    context = RequestContext(1, "token", sent.append)
+    context.report_progress(0, 100, "Synthesizing")
+    context.report_progress(50, 100, "Playback started")
+    context.report_progress(40, 100, "stale")
+    context.report_progress(60, 100, "too soon", throttle=True)
+    context.report_progress(100, 100, "Finished")
+
+    assert [m["params"]["message"] for m in sent] == ["Synthesizing", "Playback started", "Finished"]
+    assert all(m["method"] == "notifications/progress" for m in sent)
+    assert all(m["params"]["progressToken"] == "token" for m in sent)
+    print("✅ Progress is monotonic and throttled")
+
+def test_no_progress_after_cancel():
+    """A cancelled request stops reporting progress"""
+    sent = []
+    context = RequestContext(1, "token", sent.append)
+    context.cancel()
+    context.report_progress(10, 100)
+    assert sent == []
+    print("✅ Cancelled requests report no progress")
+
+def test_speak_text_progress_with_speech_cache():
+    """speak_text with the speech cache on reports synthesis, each fetched chunk and the end"""
+    FakeGTTS.reset(chunks=3)
+    with patched_audio(pygame=fake_pygame(), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        player = ready_player(cache_dir)
+        assert player.speech_cache is not None
+        sent = []
+        result = player.speak_text("构建完成", context=RequestContext(1, "token", sent.append))
+        assert result["success"] and not result["cached"], result
+        messages = [m["params"].get("message") for m in sent]
+        assert messages == ["Synthesizing speech with gTTS", "Fetched chunk 1/3", "Fetched chunk 2/3",
+                            "Fetched chunk 3/3", "Playback started", "Finished"], messages
+        progress = [m["params"]["progress"] for m in sent]
+        assert progress == sorted(progress) and progress[-1] == 100
+
+        # Replaying from the cache skips the synthesis steps
+        sent.clear()
+        assert player.speak_text("构建完成", context=RequestContext(2, "token", sent.append))["cached"]
+        assert [m["params"].get("message") for m in sent] == ["Playback started", "Finished"]
+    print("✅ speak_text reports synthesis progress with the speech cache on")
+
+def test_estimate_mp3_duration():
+    """Duration is derived from the first frame's bitrate"""
+    # MPEG-2 Layer III, 32 kbps, 24 kHz (what gTTS produces): 4000 bytes = 1 second
+    frame_header = bytes([0xff, 0xf3, 0x44, 0xc4])
+    assert abs(estimate_mp3_duration(frame_header + b"\x00" * 3996) - 1.0) < 1e-9
+
+    id3 = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10
+    assert abs(estimate_mp3_duration(id3 + frame_header + b"\x00" * 7996) - 2.0) < 1e-9
+
+    assert estimate_mp3_duration(b"RIFF....WAVE") is None
+    print("✅ MP3 duration estimated from frame headers")
+
+if __name__ == "__main__":
+    test_progress_requires_token()
+    test_progress_is_monotonic_and_throttled()
+    test_no_progress_after_cancel()
+    test_speak_text_progress_with_speech_cache()
+    test_estimate_mp3_duration()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test fair scheduling and per-session rate limiting for MCP Audio Server
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_server import AsyncJSONRPCServer, ClientSession, parse_session_weights
+from test_concurrent_dispatch import SlowSpeechServer, tool_call
+
+def test_sessions_take_turns():
+    """A session flooding the worker does not starve a session arriving later"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.05))
+    noisy = ClientSession("noisy")
+    quiet = ClientSession("quiet")
+    finished = []
+
+    async def speak(session, request_id):
+        await dispatcher.handle_message(tool_call(request_id, "speak_text", {"text": "hi"}), session)
+        finished.append(session.session_id)
+
+    async def scenario():
+        flood = [asyncio.create_task(speak(noisy, i)) for i in range(6)]
+        await asyncio.sleep(0.01)
+        polite = [asyncio.create_task(speak(quiet, 100 + i)) for i in range(2)]
+        await asyncio.gather(*flood, *polite)
+
+    asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    # FIFO would finish all six noisy calls first; fair queuing interleaves
+    last_quiet = max(index for index, session_id in enumerate(finished) if session_id == "quiet")
+    assert last_quiet < 5, f"quiet session starved: {finished}"
+    stats = dispatcher.scheduler.stats()
+    assert stats["noisy"]["calls"] == 6 and stats["quiet"]["calls"] == 2
+    assert stats["quiet"]["waitMaxMs"] < stats["noisy"]["waitMaxMs"]
+    print(f"✅ Sessions interleaved: {finished}")
+
+def test_weighted_share():
+    """A session with twice the weight gets about twice the turns"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.03))
+    heavy = ClientSession("heavy", weight=2.0)
+    light = ClientSession("light")
+    finished = []
+
+    async def speak(session, request_id):
+        await dispatcher.handle_message(tool_call(request_id, "speak_text", {"text": "hi"}), session)
+        finished.append(session.session_id)
+
+    async def scenario():
+        first = asyncio.create_task(speak(light, 0))
+        await asyncio.sleep(0.005)
+        tasks = [asyncio.create_task(speak(session, i)) for i in range(1, 8) for session in (heavy, light)]
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    window = finished[:10]
+    assert window.count("heavy") >= 6, f"heavy session should get ~2/3 of the turns: {finished}"
+    print(f"✅ Weighted share respected: {window}")
+
+def test_configured_weights_by_client_name():
+    """--session-weight applies by the client name sent in initialize and sets proportional service"""
+    assert parse_session_weights("editor=3, *=0.5") == {"editor": 3.0, "*": 0.5}
+    for bad in ("editor", "editor=0"):
+        try:
+            parse_session_weights(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"'{bad}' should be rejected")
+
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.02), max_queue=0,
+                                    session_weights={"editor": 3.0})
+    editor = ClientSession("editor-session")
+    other = ClientSession("other-session")
+    finished = []
+
+    async def initialize(session, client):
+        await dispatcher.handle_message(json.dumps({
+            "jsonrpc": "2.0", "id": 0, "method": "initialize",
+            "params": {"clientInfo": {"name": client, "version": "1.0"}}
+        }), session)
+
+    async def speak(session, request_id):
+        await dispatcher.handle_message(tool_call(request_id, "speak_text", {"text": "hi"}), session)
+        finished.append(session.session_id)
+
+    async def scenario():
+        await initialize(editor, "editor")
+        await initialize(other, "terminal")
+        first = asyncio.create_task(speak(other, 0))
+        await asyncio.sleep(0.005)
+        tasks = [asyncio.create_task(speak(session, i)) for i in range(1, 13) for session in (editor, other)]
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    assert editor.weight == 3.0 and other.weight == 1.0
+    window = finished[:12]
+    assert window.count("editor-session") >= 8, f"editor should get ~3/4 of the turns: {finished}"
+    print(f"✅ Configured weights respected: {window.count('editor-session')}/12 turns to the weight-3 client")
+
+def test_rate_limit_refuses_with_retry_after():
+    """Calls over a session's token bucket get "Rate limited" with retryAfterMs"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.01), session_rate=1.0, session_burst=2)
+    session = ClientSession("burst")
+    other = ClientSession("other")
+
+    async def scenario():
+        responses = []
+        for request_id in range(1, 4):
+            responses.append(json.loads(await dispatcher.handle_message(
+                tool_call(request_id, "speak_text", {"text": "hi"}), session)))
+        responses.append(json.loads(await dispatcher.handle_message(
+            tool_call(4, "speak_text", {"text": "hi"}), other)))
+        responses.append(json.loads(await dispatcher.handle_message(tool_call(5, "get_audio_status"), session)))
+        return responses
+
+    responses = asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    assert "result" in responses[0] and "result" in responses[1]
+    error = responses[2]["error"]
+    assert error["code"] == -32001 and error["message"] == "Rate limited", error
+    assert 0 < error["data"]["retryAfterMs"] <= 1001, error
+    assert "result" in responses[3], "other sessions have their own bucket"
+    status = responses[4]["result"]["content"][0]["text"]
+    assert "Session burst: 2 calls" in status and "1 rate limited" in status, status
+    print("✅ Rate limit refused the third call and status reports per-session waits")
+
+def test_closed_sessions_are_forgotten():
+    """Closing a session drops its scheduling state, after its queued calls have run"""
+    dispatcher = AsyncJSONRPCServer(SlowSpeechServer(speak_seconds=0.03), session_rate=5.0, session_burst=5)
+    scheduler = dispatcher.scheduler
+
+    async def scenario():
+        for index in range(50):
+            session = ClientSession(f"short-{index}")
+            await dispatcher.handle_message(tool_call(1, "speak_text", {"text": "hi"}), session)
+            dispatcher.cancel_session(session.session_id)
+
+        # A session closed while its call waits for a turn keeps its state until the call is done
+        busy, closing = ClientSession("busy"), ClientSession("closing")
+        running = asyncio.create_task(dispatcher.handle_message(tool_call(1, "speak_text", {"text": "hi"}), busy))
+        await asyncio.sleep(0.002)
+        queued = asyncio.create_task(dispatcher.handle_message(tool_call(1, "speak_text", {"text": "hi"}), closing))
+        await asyncio.sleep(0.002)
+        dispatcher.cancel_session("closing")
+        assert "closing" in scheduler._vtime, "state dropped while a call was queued"
+        await asyncio.gather(running, queued)
+        dispatcher.cancel_session("busy")
+
+    asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    assert scheduler.sessions == {} and scheduler._vtime == {} and scheduler._buckets == {}
+    assert not [line for line in dispatcher.status_lines() if line.startswith("Session ")]
+    print("✅ Closed sessions forgotten")
+
+if __name__ == "__main__":
+    print("🧪 Testing fair scheduling")
+    print("=" * 50)
+    test_sessions_take_turns()
+    test_weighted_share()
+    test_configured_weights_by_client_name()
+    test_rate_limit_refuses_with_retry_after()
+    test_closed_sessions_are_forgotten()
+    print("\n🎉 All scheduling tests passed!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the segment store behind the speech cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_cache import ClipReader, SpeechCache
+
+def segment_files(directory: str):
+    return sorted(name for name in os.listdir(directory) if name.startswith("segment-"))
+
+def test_clips_share_segments_and_read_zero_copy():
+    """Clips are appended to a few segments and read back as views into a mapping"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory, segment_bytes=1000)
+        for i in range(10):
+            cache.put(f"clip{i}", "mp3", bytes([i]) * 300)
+
+        assert segment_files(directory) == ["segment-000001.dat", "segment-000002.dat",
+                                            "segment-000003.dat", "segment-000004.dat"]
+        view = cache.get("clip4", "mp3")
+        assert isinstance(view, memoryview) and view.readonly
+        assert view == bytes([4]) * 300
+
+        reader = ClipReader(view)
+        assert reader.read(2) == b"\x04\x04" and reader.seek(-1, os.SEEK_END) == 299
+        assert reader.read() == b"\x04" and reader.read() == b""
+    print("✅ Clips are packed into segments and read without copying")
+
+def test_compaction_reclaims_evicted_space():
+    """Evicting most of a sealed segment gets its live clips moved and the file deleted"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory, max_bytes=900, segment_bytes=1000)
+        for i in range(3):
+            cache.put(f"old{i}", "mp3", b"o" * 300)
+        held = cache.get("old2", "mp3")
+        for i in range(2):
+            cache.put(f"new{i}", "mp3", b"n" * 300)
+
+        cache.compact()
+        stats = cache.stats()
+        assert "segment-000001.dat" not in segment_files(directory)
+        assert stats["entries"] == 3 and stats["disk_bytes"] == 900, stats
+        assert cache.get("old2", "mp3") == b"o" * 300, "the live clip was moved"
+        assert held == b"o" * 300, "views taken before compaction stay valid"
+
+        # Another process sees the moved clip too
+        assert SpeechCache(directory).get("old2", "mp3") == b"o" * 300
+    print("✅ Compaction reclaims evicted space")
+
+def test_orphan_segments_are_removed():
+    """Segment files the index does not know about are deleted on open"""
+    with tempfile.TemporaryDirectory() as directory:
+        SpeechCache(directory).put("a", "mp3", b"audio")
+        with open(os.path.join(directory, "segment-000099.dat"), "wb") as f:
+            f.write(b"half-written")
+        cache = SpeechCache(directory)
+        assert cache.get("a", "mp3") == b"audio"
+        assert segment_files(directory) == ["segment-000001.dat"]
+    print("✅ Orphan segments are removed")
+
+def test_empty_clips_are_never_stuck():
+    """Empty audio is not stored, and an unmappable entry is dropped instead of failing forever"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory)
+        cache.put("empty", "mp3", b"")
+        assert not cache.contains("empty", "mp3") and cache.stats()["segments"] == 0
+
+        # An entry written by an older version: a zero-length clip alone in a new, empty segment
+        db = cache._db()
+        segment = db.execute("INSERT INTO segments (bytes) VALUES (0)").lastrowid
+        open(os.path.join(directory, f"segment-{segment:06d}.dat"), "wb").close()
+        db.execute("INSERT INTO clips VALUES ('old.mp3', ?, 0, 0, ?)", (segment, time.time()))
+        assert cache.get("old", "mp3") is None
+        assert not cache.contains("old", "mp3"), "the broken entry is dropped"
+        cache.put("old", "mp3", b"audio")
+        assert cache.get("old", "mp3") == b"audio"
+    print("✅ Empty clips are never stuck")
+
+if __name__ == "__main__":
+    print("🧪 Testing the segment store")
+    print("=" * 50)
+    test_clips_share_segments_and_read_zero_copy()
+    test_compaction_reclaims_evicted_space()
+    test_orphan_segments_are_removed()
+    test_empty_clips_are_never_stuck()
+    print("\n🎉 All segment store tests passed!")
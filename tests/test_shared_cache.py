@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test sharing the speech cache between server processes
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to path
+sys.path.insert(0, PROJECT_ROOT)
+
+from speech_cache import INDEX_NAME, SpeechCache
+
+WRITER = """
+import sys
+from speech_cache import SpeechCache
+directory, writer, count, max_bytes = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+cache = SpeechCache(directory, max_bytes=max_bytes)
+for i in range(count):
+    key = f"clip{(i * 7 + writer) % 30}"
+    if cache.get(key, "mp3") is None:
+        cache.put(key, "mp3", key.encode() * 100)
+"""
+
+def run_writers(directory: str, writers: int, count: int, max_bytes: int):
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WRITER, directory, str(writer), str(count), str(max_bytes)],
+                         cwd=PROJECT_ROOT, stderr=subprocess.PIPE, text=True)
+        for writer in range(writers)
+    ]
+    for process in processes:
+        _, stderr = process.communicate(timeout=60)
+        assert process.returncode == 0, stderr
+
+def test_clip_from_one_process_hits_in_another():
+    """A clip rendered by another process is a hit here, and counted in the shared totals"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory)
+        assert cache.get("clip0", "mp3") is None
+        run_writers(directory, writers=1, count=1, max_bytes=10 ** 6)
+        assert cache.get("clip0", "mp3") == b"clip0" * 100
+        assert cache.stats()["entries"] == 1 and cache.stats()["hits"] == 1
+    print("✅ Clips are shared between processes")
+
+def test_concurrent_writers_never_corrupt_entries():
+    """Several processes writing and evicting at once leave a consistent cache"""
+    max_bytes = 12 * 600
+    with tempfile.TemporaryDirectory() as directory:
+        run_writers(directory, writers=4, count=40, max_bytes=max_bytes)
+
+        db = sqlite3.connect(os.path.join(directory, INDEX_NAME))
+        assert db.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        rows = dict(db.execute("SELECT name, size FROM clips"))
+        db.close()
+        assert sum(rows.values()) <= max_bytes, f"{sum(rows.values())} bytes indexed"
+
+        cache = SpeechCache(directory, max_bytes=max_bytes)
+        for name in rows:
+            key = name[:-len(".mp3")]
+            assert cache.get(key, "mp3") == key.encode() * 100, f"{name} is corrupt"
+    print(f"✅ 4 concurrent writers: {len(rows)} clips, {sum(rows.values())} bytes, all intact")
+
+def test_unknown_index_version_is_left_alone():
+    """An index written with another layout version is not used and not wiped"""
+    with tempfile.TemporaryDirectory() as directory:
+        SpeechCache(directory).put("kept", "mp3", b"audio")
+        db = sqlite3.connect(os.path.join(directory, INDEX_NAME))
+        db.execute("PRAGMA user_version = 99")
+        db.commit()
+        db.close()
+
+        cache = SpeechCache(directory)
+        assert cache.get("kept", "mp3") is None
+        cache.put("new", "mp3", b"audio")
+        db = sqlite3.connect(os.path.join(directory, INDEX_NAME))
+        assert [name for name, in db.execute("SELECT name FROM clips")] == ["kept.mp3"]
+        db.close()
+    print("✅ Index with an unknown version left untouched")
+
+if __name__ == "__main__":
+    print("🧪 Testing the shared speech cache")
+    print("=" * 50)
+    test_clip_from_one_process_hits_in_another()
+    test_concurrent_writers_never_corrupt_entries()
+    test_unknown_index_version_is_left_alone()
+    print("\n🎉 All shared cache tests passed!")
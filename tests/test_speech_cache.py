@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed cache of synthesized speech
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_server
+from audio_fakes import FakeGTTS, FakeMusic, FakeSound, RenderingEngine, fake_pygame, patched_audio, ready_player
+from speech_cache import SoundCache, SpeechCache, speech_key
+from speech_codec import StorageCodec, get_storage_codec
+
+def test_key_covers_settings():
+    """Equivalent text shares a key; any setting that changes the audio does not"""
+    base = speech_key("Hello   world ", "gtts", lang="zh-cn")
+    assert base == speech_key(" Hello world", "gtts", lang="zh-cn"), "whitespace is normalized"
+    assert base != speech_key("hello world", "gtts", lang="zh-cn")
+    assert base != speech_key("Hello world", "gtts", lang="zh-tw")
+    assert base != speech_key("Hello world", "gtts", lang="zh-cn", rate=200)
+    assert base != speech_key("Hello world", "gtts", lang="zh-cn", fmt="wav")
+    print("✅ Cache keys cover every setting")
+
+def test_hits_misses_and_lru_eviction():
+    """Entries over the size limit are evicted least recently used first"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory, max_bytes=250)
+        assert cache.get("a", "mp3") is None
+        cache.put("a", "mp3", b"a" * 100)
+        cache.put("b", "mp3", b"b" * 100)
+        assert cache.get("a", "mp3") == b"a" * 100, "a is now the most recently used"
+        cache.put("c", "mp3", b"c" * 100)
+
+        assert cache.get("b", "mp3") is None, "b was least recently used"
+        assert cache.stats() == {"entries": 2, "bytes": 200, "segments": 1, "disk_bytes": 300,
+                                 "hits": 1, "misses": 2, "evictions": 1}
+
+        # A fresh cache reads the same index
+        assert SpeechCache(directory).get("c", "mp3") == b"c" * 100
+    print("✅ Hit/miss counters and LRU eviction work")
+
+def test_age_limit():
+    """Entries unused for longer than the age limit are dropped"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SpeechCache(directory, max_age=60)
+        cache.put("old", "wav", b"old")
+        with cache._db() as db:
+            db.execute("UPDATE clips SET last_used = ?", (time.time() - 120,))
+        assert not cache.contains("old", "wav")
+        assert cache.get("old", "wav") is None
+        assert cache.stats()["entries"] == 0
+    print("✅ Expired entries are dropped")
+
+def test_repeated_speech_plays_from_cache():
+    """The second identical utterance is played without synthesizing it again"""
+    music = FakeMusic()
+    with patched_audio(pygame=fake_pygame(music)), tempfile.TemporaryDirectory() as cache_dir:
+        engine = RenderingEngine()
+        player = ready_player(cache_dir, engine)
+
+        first = player.speak_text("Build finished")
+        second = player.speak_text("Build  finished")
+        faster = player.speak_text("Build finished", rate=200)
+
+        assert first["success"] and not first["cached"], first
+        assert second["success"] and second["cached"], second
+        assert not faster["cached"], "a different rate is a different rendering"
+        assert engine.renders == 2
+        assert music.played == [b"Build finished@150", b"Build finished@200"], "the disk hit is decoded instead"
+        assert player.get_audio_status()["status"]["speech_cache"]["hits"] == 1
+    print("✅ Repeated speech is served from the cache")
+
+def test_storage_codec_converts_once():
+    """With the wav codec, speech is converted when stored and later hits read the WAV"""
+    music = FakeMusic()
+    FakeGTTS.reset()
+    FakeSound.decoded = 0
+    with patched_audio(pygame=fake_pygame(music), gtts=FakeGTTS), tempfile.TemporaryDirectory() as cache_dir:
+        player = ready_player(cache_dir)
+        player.configure_speech_cache(codec="wav")
+        player.configure_sound_cache(0)
+
+        assert not player.speak_text("构建完成")["cached"]
+        assert player.speak_text("构建完成")["cached"]
+
+        key = speech_key("构建完成", "gtts", lang="zh-cn", fmt="mp3")
+        assert player.speech_cache.contains(key, "wav") and not player.speech_cache.contains(key, "mp3")
+        assert FakeSound.decoded == 1, "only the insert decodes the MP3"
+        assert len(music.played) == 2 and all(clip[:4] == b"RIFF" for clip in music.played)
+        assert audio_server.estimate_wav_duration(music.played[0]) == 100 / 22050
+        assert player.get_audio_status()["status"]["speech_cache"]["codec"] == "wav"
+    print("✅ Speech is converted to the storage codec once")
+
+def test_unavailable_codec_falls_back():
+    """Unknown codecs are rejected; ones whose libraries are missing store speech as rendered"""
+    try:
+        get_storage_codec("flac")
+    except ValueError as e:
+        assert "flac" in str(e)
+    else:
+        raise AssertionError("unknown codec accepted")
+    codec = get_storage_codec("vorbis")
+    assert codec.name == "vorbis" or type(codec) is StorageCodec
+    print("✅ Unavailable codecs fall back to the original format")
+
+def test_sound_cache_budget():
+    """The in-memory tier keeps clips within its byte budget, LRU first"""
+    cache = SoundCache(max_bytes=300)
+    cache.put("a", "A", 100)
+    cache.put("b", "B", 100)
+    cache.put("huge", "H", 400)
+    assert cache.get("a") == "A"
+    cache.put("c", "C", 150)
+    assert cache.get("b") is None and cache.get("huge") is None
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 250 and stats["evictions"] == 1, stats
+    assert stats["hit_ratio"] == 1 / 3
+    print("✅ Sound cache stays within its budget")
+
+def test_hot_clips_play_from_memory():
+    """A clip replayed from disk is decoded once and then served from memory"""
+    FakeSound.decoded = 0
+    with patched_audio(pygame=fake_pygame()), tempfile.TemporaryDirectory() as cache_dir:
+        engine = RenderingEngine()
+        player = ready_player(cache_dir, engine)
+        player.configure_sound_cache(1)
+
+        for _ in range(4):
+            assert player.speak_text("Tests passed")["success"]
+
+        status = player.get_audio_status()["status"]
+        assert engine.renders == 1 and FakeSound.decoded == 1
+        assert status["speech_cache"]["hits"] == 1, "only the first replay touches the disk"
+        assert status["sound_cache"]["hits"] == 2
+        assert status["sound_cache"]["bytes"] == 22050 * 2 * 2
+    print("✅ Hot clips are served from memory")
+
+if __name__ == "__main__":
+    print("🧪 Testing speech cache")
+    print("=" * 50)
+    test_key_covers_settings()
+    test_hits_misses_and_lru_eviction()
+    test_age_limit()
+    test_repeated_speech_plays_from_cache()
+    test_storage_codec_converts_once()
+    test_unavailable_codec_falls_back()
+    test_sound_cache_budget()
+    test_hot_clips_play_from_memory()
+    print("\n🎉 All speech cache tests passed!")
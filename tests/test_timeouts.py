@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test per-tool deadlines and timeout enforcement for MCP Audio Server
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_fakes import RenderingEngine, fake_pygame, patched_audio, ready_player
+from audio_server import AsyncJSONRPCServer, MCPAudioServer, deadline_watchdog, tool_result
+
+def nap_server(timeout=None):
+    """MCPAudioServer with a blocking 'nap' tool that sleeps until done or cancelled"""
+    server = MCPAudioServer()
+    aborted = []
+
+    def nap(arguments, context):
+        deadline = time.monotonic() + arguments.get("seconds", 1.0)
+        while time.monotonic() < deadline:
+            if context.cancelled:
+                aborted.append(context.timed_out)
+                return tool_result("cancelled", is_error=True)
+            time.sleep(0.01)
+        return tool_result("rested")
+
+    def stuck(arguments, context):
+        # Ignores cancellation entirely, like a hung driver call
+        time.sleep(arguments.get("seconds", 1.0))
+        return tool_result("finally done")
+
+    schema = {"type": "object", "properties": {"seconds": {"type": "number"}}}
+    server.registry.register("nap", "Sleep", schema, nap, blocking=True, timeout=timeout)
+    server.registry.register("stuck", "Sleep ignoring cancellation", schema, stuck, blocking=True, timeout=timeout)
+    return server, aborted
+
+def tool_call(request_id, name, arguments=None):
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments or {}}
+    })
+
+def test_tool_deadline_aborts_call():
+    """A call past its tool deadline is aborted and reported as a timeout"""
+    server, aborted = nap_server(timeout=0.2)
+    start = time.monotonic()
+    result = server.call_tool("nap", {"seconds": 5})
+    elapsed = time.monotonic() - start
+
+    assert result["isError"], result
+    assert "timed out after 200 ms" in result["content"][0]["text"], result
+    assert aborted == [True], "the tool should see a cancellation flagged as a timeout"
+    assert elapsed < 0.5, f"timeout took {elapsed:.2f}s"
+    assert server.timeout_stats()["nap"] == {"timeout": 0.2, "timeouts": 1}
+    assert "nap=1" in server.call_tool("get_audio_status", {})["content"][0]["text"]
+    print(f"✅ Deadline aborted the call after {elapsed:.2f}s")
+
+def test_timeout_ms_argument_overrides_deadline():
+    """timeout_ms shortens (or extends) the deadline for one call"""
+    server, _ = nap_server(timeout=0.1)
+    assert not server.call_tool("nap", {"seconds": 0.3, "timeout_ms": 2000})["isError"]
+    result = server.call_tool("nap", {"seconds": 5, "timeout_ms": 150})
+    assert "timed out after 150 ms" in result["content"][0]["text"], result
+    assert server.call_tool("nap", {"timeout_ms": 0})["isError"], "timeout_ms must be >= 1"
+    assert "timeout_ms" in server.tools["speak_text"]["inputSchema"]["properties"]
+
+    server.set_tool_timeouts({"nap": 0})
+    assert not server.call_tool("nap", {"seconds": 0.3})["isError"], "0 removes the deadline"
+    print("✅ timeout_ms and set_tool_timeouts override the tool deadline")
+
+def test_deadlines_share_one_watchdog_thread():
+    """Concurrent calls with deadlines start no thread each, and finished calls leave nothing scheduled"""
+    server, _ = nap_server(timeout=30)
+    deadline_watchdog.schedule(0, lambda: None)
+    before = threading.active_count()
+    # Earlier tests may still have hung-call checks scheduled
+    scheduled = deadline_watchdog.pending()
+    threads = [threading.Thread(target=server.call_tool, args=("nap", {"seconds": 0.2})) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    during = threading.active_count()
+    for thread in threads:
+        thread.join()
+
+    assert during == before + len(threads), f"{during - before - len(threads)} extra threads for deadlines"
+    assert deadline_watchdog.pending() <= scheduled, "finished calls must cancel their deadlines"
+    assert [t.name for t in threading.enumerate()].count("deadline-watchdog") == 1
+    print("✅ Deadlines share one watchdog thread")
+
+def test_dispatcher_returns_timeout_response():
+    """A timed-out call still gets a response, unlike a client cancellation"""
+    server, _ = nap_server(timeout=0.2)
+    dispatcher = AsyncJSONRPCServer(server)
+    response = json.loads(asyncio.run(dispatcher.handle_message(tool_call(1, "nap", {"seconds": 5}))))
+    dispatcher.shutdown()
+
+    assert response["id"] == 1
+    assert response["result"]["isError"], response
+    assert "timed out" in response["result"]["content"][0]["text"]
+    print("✅ Dispatcher answered the timed-out call")
+
+def test_stuck_worker_is_replaced():
+    """A tool ignoring its deadline is abandoned and queued audio calls still run"""
+    server, _ = nap_server(timeout=0.2)
+    server.HUNG_GRACE = 0.2
+    dispatcher = AsyncJSONRPCServer(server)
+    first_worker = dispatcher.audio_executor
+
+    async def scenario():
+        stuck = asyncio.create_task(dispatcher.handle_message(tool_call(1, "stuck", {"seconds": 3})))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(dispatcher.handle_message(tool_call(2, "nap", {"seconds": 0.1})))
+        return await asyncio.wait_for(asyncio.gather(stuck, queued), timeout=2.0)
+
+    start = time.monotonic()
+    stuck, queued = (json.loads(response) for response in asyncio.run(scenario()))
+    elapsed = time.monotonic() - start
+    dispatcher.shutdown()
+
+    assert "timed out" in stuck["result"]["content"][0]["text"], stuck
+    assert queued["result"] == tool_result("rested"), queued
+    assert dispatcher.audio_executor is not first_worker
+    assert dispatcher.audio_queue_depth == 0
+    print(f"✅ Stuck audio worker replaced; queued call finished after {elapsed:.2f}s")
+
+class HungEngine(RenderingEngine):
+    """Engine whose first render hangs until released, like a wedged TTS driver"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self._hung = False
+
+    def runAndWait(self):
+        if not self._hung:
+            self._hung = True
+            self.release.wait(10)
+        super().runAndWait()
+
+def test_hung_speech_hands_device_to_new_worker():
+    """speak_text queued behind a hung speak_text runs once the stuck worker is abandoned"""
+    engine = HungEngine()
+    with patched_audio(pygame=fake_pygame()), tempfile.TemporaryDirectory() as cache_dir:
+        server = MCPAudioServer()
+        server.audio_player = ready_player(cache_dir, engine)
+        server.HUNG_GRACE = 0.2
+        dispatcher = AsyncJSONRPCServer(server)
+
+        async def scenario():
+            hung = asyncio.create_task(dispatcher.handle_message(
+                tool_call(1, "speak_text", {"text": "Build finished", "timeout_ms": 200})))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(dispatcher.handle_message(
+                tool_call(2, "speak_text", {"text": "Tests failed", "timeout_ms": 5000})))
+            return await asyncio.wait_for(asyncio.gather(hung, queued), timeout=5.0)
+
+        try:
+            start = time.monotonic()
+            hung, queued = (json.loads(response) for response in asyncio.run(scenario()))
+            elapsed = time.monotonic() - start
+        finally:
+            engine.release.set()
+            dispatcher.shutdown()
+
+    assert "timed out" in hung["result"]["content"][0]["text"], hung
+    assert not queued["result"]["isError"], queued
+    assert elapsed < 2.0, f"queued call waited {elapsed:.2f}s for the abandoned device"
+    print(f"✅ Hung speak_text abandoned; queued speak_text finished after {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    print("🧪 Testing tool deadlines")
+    print("=" * 50)
+    test_tool_deadline_aborts_call()
+    test_timeout_ms_argument_overrides_deadline()
+    test_deadlines_share_one_watchdog_thread()
+    test_dispatcher_returns_timeout_response()
+    test_stuck_worker_is_replaced()
+    test_hung_speech_hands_device_to_new_worker()
+    print("\n🎉 All timeout tests passed!")
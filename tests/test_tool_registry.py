@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the tool registry, argument validation and cached static responses
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_server import AsyncJSONRPCServer, MCPAudioServer, compile_schema, tool_result
+
+def test_schema_validation():
+    """Compiled validators report type, range, enum and required errors"""
+    validate = compile_schema({
+        "type": "object",
+        "properties": {
+            "text": {"type": "string"},
+            "rate": {"type": "integer", "minimum": 50, "maximum": 300},
+            "volume": {"type": "number", "minimum": 0.0, "maximum": 1.0},
+            "mode": {"type": "string", "enum": ["fast", "slow"]},
+        },
+        "required": ["text"]
+    })
+
+    assert validate({"text": "hi", "rate": 150, "volume": 1, "mode": "fast"}) == []
+    assert validate({"text": "hi", "rate": 150.0}) == [], "integral floats are integers"
+    assert validate({"text": "hi", "volume": None}) == [], "null means use the default"
+    assert validate({"rate": 100}) == ["'text' is required"]
+    assert validate({"text": 5}) == ["'text' must be of type string"]
+    assert validate({"text": "hi", "rate": True}) == ["'rate' must be of type integer"]
+    assert validate({"text": "hi", "rate": 10}) == ["'rate' must be >= 50"]
+    assert validate({"text": "hi", "volume": 1.5}) == ["'volume' must be <= 1.0"]
+    assert validate({"text": "hi", "mode": "loud"}) == ["'mode' must be one of ['fast', 'slow']"]
+    assert validate([]) == ["arguments must be an object"]
+    print("✅ Schema validation catches bad arguments")
+
+def test_invalid_arguments_rejected():
+    """call_tool answers invalid arguments with an error result instead of running the tool"""
+    server = MCPAudioServer()
+    result = server.call_tool("speak_text", {"text": "hello", "rate": 1000})
+    assert result["isError"], result
+    assert "'rate' must be <= 300" in result["content"][0]["text"]
+
+    result = server.call_tool("play_audio_file", {})
+    assert result["isError"], result
+    assert "'file_path' is required" in result["content"][0]["text"]
+    print("✅ Invalid arguments rejected before reaching the audio player")
+
+def test_register_custom_tool():
+    """A registered tool is listed and dispatched without touching the dispatcher"""
+    server = MCPAudioServer()
+    dispatcher = AsyncJSONRPCServer(server)
+
+    async def scenario():
+        before = json.loads(await dispatcher.handle_message(
+            json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+        ))
+        server.registry.register(
+            "echo",
+            "Echo the given text",
+            {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]},
+            lambda arguments, context: tool_result(arguments["text"])
+        )
+        after = json.loads(await dispatcher.handle_message(
+            json.dumps({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        ))
+        call = json.loads(await dispatcher.handle_message(json.dumps({
+            "jsonrpc": "2.0", "id": 3, "method": "tools/call",
+            "params": {"name": "echo", "arguments": {"text": "ping"}}
+        })))
+        return before, after, call
+
+    before, after, call = asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    names_before = [tool["name"] for tool in before["result"]["tools"]]
+    names_after = [tool["name"] for tool in after["result"]["tools"]]
+    assert "echo" not in names_before
+    assert names_after == names_before + ["echo"], "cached tools/list must refresh after register"
+    assert call["result"] == tool_result("ping")
+    assert dispatcher.executor_for("echo") is dispatcher.control_executor
+    print("✅ Custom tool registered, listed and called")
+
+def test_cached_static_responses():
+    """initialize and tools/list reuse cached bytes with the right id, alone and in batches"""
+    server = MCPAudioServer()
+    dispatcher = AsyncJSONRPCServer(server)
+
+    async def scenario():
+        single = await dispatcher.handle_message(
+            json.dumps({"jsonrpc": "2.0", "id": "abc", "method": "initialize", "params": {}})
+        )
+        batch = await dispatcher.handle_message(json.dumps([
+            {"jsonrpc": "2.0", "id": 7, "method": "tools/list"},
+            {"jsonrpc": "2.0", "id": 8, "method": "initialize"},
+        ]))
+        return json.loads(single), json.loads(batch)
+
+    single, batch = asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    assert single["id"] == "abc"
+    assert single["result"] == server.initialize_result()
+    assert [response["id"] for response in batch] == [7, 8]
+    assert batch[0]["result"] == server.list_tools()
+    assert batch[1]["result"] == server.initialize_result()
+    print("✅ Cached initialize/tools/list responses carry the request id")
+
+if __name__ == "__main__":
+    print("🧪 Testing tool registry")
+    print("=" * 50)
+    test_schema_validation()
+    test_invalid_arguments_rejected()
+    test_register_custom_tool()
+    test_cached_static_responses()
+    print("\n🎉 All tool registry tests passed!")
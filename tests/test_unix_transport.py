@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test the resident daemon's Unix socket transport
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import audio_proxy
+from audio_proxy import connect_or_spawn, socket_lock
+from audio_server import AsyncJSONRPCServer, MCPAudioServer
+from unix_transport import UnixSocketServer
+
+async def exchange(path, messages):
+    """Send messages on one connection, half-close, and collect every reply line"""
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(b"".join(json.dumps(m).encode() + b"\n" for m in messages))
+    writer.write_eof()
+    data = await asyncio.wait_for(reader.read(), timeout=30)
+    writer.close()
+    return [json.loads(line) for line in data.splitlines()]
+
+def test_daemon_serves_independent_sessions():
+    """Two connections share one server; each gets its own responses"""
+    async def scenario(path):
+        daemon = UnixSocketServer(AsyncJSONRPCServer(MCPAudioServer()), path)
+        await daemon.start()
+        first, second = await asyncio.gather(
+            exchange(path, [
+                {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+                {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+            ]),
+            exchange(path, [
+                {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                 "params": {"name": "get_audio_status", "arguments": {}}},
+            ]),
+        )
+        daemon.dispatcher.shutdown()
+        return first, second
+
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = asyncio.run(scenario(os.path.join(directory, "audio.sock")))
+
+    assert sorted(r["id"] for r in first) == [1, 2]
+    assert [r["id"] for r in second] == [1]
+    assert "Audio Status" in second[0]["result"]["content"][0]["text"]
+    print("✅ Daemon answered two sessions over one socket")
+
+def test_stale_socket_is_replaced():
+    """A leftover socket file with no listener does not block startup"""
+    async def scenario(path):
+        open(path, "w").close()
+        daemon = UnixSocketServer(AsyncJSONRPCServer(MCPAudioServer()), path)
+        await daemon.start()
+        replies = await exchange(path, [{"jsonrpc": "2.0", "id": 7, "method": "initialize"}])
+        daemon.dispatcher.shutdown()
+        return replies
+
+    with tempfile.TemporaryDirectory() as directory:
+        replies = asyncio.run(scenario(os.path.join(directory, "audio.sock")))
+    assert replies[0]["id"] == 7
+    print("✅ Stale socket file replaced")
+
+def test_bind_waits_for_socket_lock():
+    """The daemon does not touch the socket path while a proxy holds the lock"""
+    async def scenario(path):
+        daemon = UnixSocketServer(AsyncJSONRPCServer(MCPAudioServer()), path)
+        start = time.monotonic()
+        await daemon.start()
+        elapsed = time.monotonic() - start
+        daemon._server.close()
+        daemon.dispatcher.shutdown()
+        return elapsed
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "audio.sock")
+        held, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with socket_lock(path):
+                held.set()
+                release.wait(5)
+
+        threading.Thread(target=hold_lock).start()
+        held.wait(5)
+        threading.Timer(0.3, release.set).start()
+        elapsed = asyncio.run(scenario(path))
+    assert elapsed >= 0.25, f"bound after {elapsed:.2f}s while the lock was held"
+    print(f"✅ Daemon waited {elapsed:.2f}s for the socket lock")
+
+def test_shutdown_keeps_newer_socket():
+    """A daemon shutting down leaves a socket another daemon has since bound"""
+    async def scenario(path):
+        daemon = UnixSocketServer(AsyncJSONRPCServer(MCPAudioServer()), path)
+        await daemon.start()
+        serving = asyncio.create_task(daemon.serve_forever())
+        await asyncio.sleep(0.05)
+        os.unlink(path)
+        successor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        successor.bind(path)
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        daemon.dispatcher.shutdown()
+        successor.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "audio.sock")
+        asyncio.run(scenario(path))
+        assert os.path.exists(path), "shutdown removed the successor's socket"
+    print("✅ Shutdown left the newer socket alone")
+
+def test_proxy_rechecks_under_lock():
+    """A proxy that waited for the lock connects to the daemon started meanwhile instead of spawning another"""
+    spawned, connected = [], []
+    original = audio_proxy.spawn_daemon
+    audio_proxy.spawn_daemon = spawned.append
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "audio.sock")
+            proxy = threading.Thread(target=lambda: connected.append(connect_or_spawn(path)))
+            with socket_lock(path):
+                proxy.start()
+                # The proxy's first connect fails and it queues for the lock
+                time.sleep(0.2)
+                listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                listener.bind(path)
+                listener.listen()
+            proxy.join(5)
+            for sock in connected + [listener]:
+                sock.close()
+    finally:
+        audio_proxy.spawn_daemon = original
+    assert connected and spawned == [], f"spawned {spawned}"
+    print("✅ Proxy found the daemon after waiting for the lock")
+
+if __name__ == "__main__":
+    test_daemon_serves_independent_sessions()
+    test_stale_socket_is_replaced()
+    test_bind_waits_for_socket_lock()
+    test_shutdown_keeps_newer_socket()
+    test_proxy_rechecks_under_lock()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test the persisted voice catalog and list_voices filtering and paging
+"""
+
+import os
+import platform
+import sys
+import tempfile
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import voice_catalog
+from audio_server import AudioPlayer, MCPAudioServer, RequestContext
+from voice_catalog import VoiceCatalog
+
+class FakeVoice:
+    def __init__(self, voice_id, name, languages, gender):
+        self.id = voice_id
+        self.name = name
+        self.languages = languages
+        self.gender = gender
+
+class FakeDriver:
+    pass
+
+FakeDriver.__module__ = "pyttsx3.drivers.espeak"
+
+class FakeEngine:
+    """pyttsx3 engine stand-in that counts voice enumerations"""
+
+    def __init__(self):
+        self.proxy = type("Proxy", (), {"_driver": FakeDriver()})()
+        self.enumerations = 0
+        self.voices = [
+            FakeVoice("en-us", "English (America)", [b"\x05en-us"], "male"),
+            FakeVoice("en-gb", "English (Great Britain)", [b"\x02en-gb"], "female"),
+            FakeVoice("de", "German", [b"\x05de"], "female"),
+        ] + [FakeVoice(f"x{i}", f"Extra {i}", ["xx"], None) for i in range(60)]
+
+    def getProperty(self, name):
+        assert name == "voices"
+        self.enumerations += 1
+        return self.voices
+
+    def setProperty(self, name, value):
+        pass
+
+def test_catalog_persists_between_runs():
+    """A second catalog reads the disk copy instead of asking the driver"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = FakeEngine()
+        first = VoiceCatalog(cache_dir).voices(engine)
+        assert engine.enumerations == 1
+        assert first[0]["lang"] == ["en-us"], "priority byte is stripped and bytes decoded"
+        assert os.listdir(cache_dir) == [f"voices-espeak-{platform.system().lower()}.json"]
+
+        catalog = VoiceCatalog(cache_dir)
+        assert catalog.voices(engine) == first
+        catalog.voices(engine)
+        assert engine.enumerations == 1, "memory and disk copies are reused"
+
+        catalog.voices(engine, refresh=True)
+        assert engine.enumerations == 2, "refresh re-reads the driver"
+    print("✅ Catalog persisted and reused")
+
+def test_driver_change_invalidates_catalog():
+    """A changed voice directory stamp makes the disk copy stale"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        voice_dir = os.path.join(cache_dir, "voices")
+        os.mkdir(voice_dir)
+        original = voice_catalog.VOICE_DIRS["espeak"]
+        voice_catalog.VOICE_DIRS["espeak"] = [voice_dir]
+        try:
+            engine = FakeEngine()
+            VoiceCatalog(cache_dir).voices(engine)
+            os.utime(voice_dir, (1, 1))
+            VoiceCatalog(cache_dir).voices(engine)
+        finally:
+            voice_catalog.VOICE_DIRS["espeak"] = original
+        assert engine.enumerations == 2, "installed voices changed, so the driver is asked again"
+    print("✅ Voice changes trigger a refresh")
+
+def test_filters_and_paging():
+    """Language prefix, gender and name filters combine with offset/limit"""
+    catalog = VoiceCatalog(None)
+    engine = FakeEngine()
+
+    page, total = catalog.query(engine, language="EN")
+    assert [v["id"] for v in page] == ["en-us", "en-gb"] and total == 2
+    page, total = catalog.query(engine, gender="female")
+    assert [v["id"] for v in page] == ["en-gb", "de"] and total == 2
+    page, total = catalog.query(engine, name="brit")
+    assert [v["id"] for v in page] == ["en-gb"] and total == 1
+    page, total = catalog.query(engine, offset=60, limit=10)
+    assert len(page) == 3 and total == 63
+    print("✅ Filters and paging work")
+
+def test_list_voices_tool_pages():
+    """The tool returns one page by default and points at the next one"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = MCPAudioServer()
+        server.audio_player = AudioPlayer(cache_dir=cache_dir)
+        server.audio_player._tts_engine = FakeEngine()
+        server.audio_player._tts_loaded = True
+
+        first = server._list_voices({}, RequestContext())["content"][0]["text"]
+        assert first.startswith("Available Voices (1-50 of 63; pass offset=50 for more):"), first
+        assert first.count("- ID:") == 50
+
+        last = server._list_voices({"offset": 50}, RequestContext())["content"][0]["text"]
+        assert last.startswith("Available Voices (51-63 of 63):"), last
+
+        german = server._list_voices({"language": "de"}, RequestContext())["content"][0]["text"]
+        assert "Lang: ['de']" in german and german.count("- ID:") == 1
+
+        none = server._list_voices({"gender": "neutral"}, RequestContext())["content"][0]["text"]
+        assert none.startswith("No voices match"), none
+    print("✅ list_voices tool filters and pages")
+
+if __name__ == "__main__":
+    print("🧪 Testing voice catalog")
+    print("=" * 50)
+    test_catalog_persists_between_runs()
+    test_driver_change_invalidates_catalog()
+    test_filters_and_paging()
+    test_list_voices_tool_pages()
+    print("\n🎉 All voice catalog tests passed!")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test background warmup of the audio stack after initialize
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Suppress pygame messages
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# Add the project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_server import AsyncJSONRPCServer, AudioPlayer, MCPAudioServer
+
+class FakeEngine:
+    """Just enough of a pyttsx3 engine for warmup"""
+
+    def __init__(self):
+        self.rendered = []
+        self._pending = []
+
+    def setProperty(self, name, value):
+        pass
+
+    def getProperty(self, name):
+        voice = type("Voice", (), {"id": "v1", "name": "Voice 1", "languages": ["en"], "gender": None})
+        return [voice]
+
+    def save_to_file(self, text, path):
+        self._pending.append(text)
+
+    def runAndWait(self):
+        time.sleep(0.1)
+        self.rendered.extend(self._pending)
+        self._pending = []
+
+class SlowInitPlayer(AudioPlayer):
+    """AudioPlayer whose mixer and engine take a while to come up"""
+
+    def __init__(self, init_seconds: float = 0.2):
+        super().__init__()
+        self.init_seconds = init_seconds
+        self.engine = FakeEngine()
+
+    def _init_tts(self):
+        time.sleep(self.init_seconds)
+        self._tts_engine = self.engine
+
+    def _init_pygame(self):
+        time.sleep(self.init_seconds)
+        self._pygame_initialized = True
+
+def warm_server(init_seconds: float = 0.2) -> MCPAudioServer:
+    server = MCPAudioServer()
+    server.audio_player = SlowInitPlayer(init_seconds)
+    return server
+
+def test_warm_up_steps():
+    """warm_up initializes everything, lists voices and renders the phrase"""
+    player = SlowInitPlayer(init_seconds=0.05)
+    timings = player.warm_up("Hello")
+    assert list(timings) == ["mixer", "tts_engine", "voices", "render"], timings
+    assert player.engine.rendered == ["Hello"]
+    assert player.warm_up("Again", should_stop=lambda: True) == {}, "should_stop skips every step"
+    print(f"✅ Warmup steps: {', '.join(f'{k} {v * 1000:.0f} ms' for k, v in timings.items())}")
+
+def test_warmup_follows_initialize():
+    """initialize is answered at once and warmup finishes in the background"""
+    dispatcher = AsyncJSONRPCServer(warm_server(init_seconds=0.2), warmup=True, warmup_phrase="Hi")
+
+    async def scenario():
+        start = time.monotonic()
+        await dispatcher.handle_message(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"}))
+        handshake = time.monotonic() - start
+        await asyncio.sleep(0)
+        assert dispatcher.status_lines()[1] == "Warmup: running"
+        await asyncio.sleep(0.8)
+        return handshake
+
+    handshake = asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    assert handshake < 0.05, f"initialize waited {handshake:.2f}s for warmup"
+    assert set(dispatcher.warmup_timings) == {"mixer", "tts_engine", "voices", "render"}
+    assert dispatcher.mcp_server.audio_player.engine.rendered == ["Hi"]
+    assert dispatcher.status_lines()[1].startswith("Warmup: done in")
+    print(f"✅ Handshake in {handshake * 1000:.1f} ms, warmup finished in the background")
+
+def test_real_call_cuts_warmup_short():
+    """A tool call arriving during warmup skips the remaining warmup steps"""
+    server = warm_server(init_seconds=0.2)
+    dispatcher = AsyncJSONRPCServer(server, warmup=True)
+
+    async def scenario():
+        await dispatcher.handle_message(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"}))
+        await asyncio.sleep(0.05)
+        return json.loads(await dispatcher.handle_message(json.dumps({
+            "jsonrpc": "2.0", "id": 2, "method": "tools/call",
+            "params": {"name": "list_voices", "arguments": {}}
+        })))
+
+    response = asyncio.run(scenario())
+    dispatcher.shutdown()
+
+    assert "Voice 1" in response["result"]["content"][0]["text"], response
+    assert list(dispatcher.warmup_timings) == ["mixer"], dispatcher.warmup_timings
+    assert server.audio_player.engine.rendered == []
+    print("✅ Real call pre-empted the rest of warmup")
+
+def test_warmup_disabled_by_default():
+    """Without --warmup nothing is loaded after initialize"""
+    os.environ.pop("AUDIO_SERVER_WARMUP", None)
+    dispatcher = AsyncJSONRPCServer(warm_server())
+    asyncio.run(dispatcher.handle_message(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"})))
+    dispatcher.shutdown()
+    assert dispatcher._warmup_future is None
+    print("✅ Warmup is opt-in")
+
+if __name__ == "__main__":
+    print("🧪 Testing warmup")
+    print("=" * 50)
+    test_warm_up_steps()
+    test_warmup_follows_initialize()
+    test_real_call_cuts_warmup_short()
+    test_warmup_disabled_by_default()
+    print("\n🎉 All warmup tests passed!")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Byte-level transport helpers for the MCP Audio Server.
+
+Messages are newline-delimited JSON. The stdio transport reads
+``sys.stdin.buffer`` in large chunks, frames lines on bytes, decodes them
+with a pluggable JSON codec and coalesces responses into as few writes
+(and flushes) as possible.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+class JSONCodec:
+    """Standard library JSON codec (always available)"""
+
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class OrjsonCodec(JSONCodec):
+    """orjson codec"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+class MsgspecCodec(JSONCodec):
+    """msgspec codec"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+# Fastest first; "auto" picks the first one that imports
+CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": JSONCodec,
+}
+
+def available_codecs() -> Dict[str, JSONCodec]:
+    """Instantiate every codec whose library is installed"""
+    codecs = {}
+    for name, codec_class in CODECS.items():
+        try:
+            codecs[name] = codec_class()
+        except ImportError:
+            continue
+    return codecs
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Return the named codec, or the fastest installed one for "auto"/None.
+
+    The default can be set with the AUDIO_SERVER_JSON_CODEC environment variable.
+    """
+    name = name or os.environ.get("AUDIO_SERVER_JSON_CODEC", "auto")
+    if name == "auto":
+        for codec_class in CODECS.values():
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec '{name}', expected one of: auto, {', '.join(CODECS)}")
+    return CODECS[name]()
+
+class LineFramer:
+    """Split a byte stream into newline-delimited frames.
+
+    Incoming chunks are appended to one buffer and only the newly added bytes
+    are scanned for newlines, so a large message arriving in many chunks is
+    not rescanned from the start each time.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_from = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add a chunk and return every complete, non-blank line"""
+        buffer = self._buffer
+        buffer += chunk
+        lines = []
+        start = 0
+        end = buffer.find(b"\n", self._scan_from)
+        if end >= 0:
+            # Slice through a memoryview so each line is copied exactly once
+            with memoryview(buffer) as view:
+                while end >= 0:
+                    line = bytes(view[start:end]).strip()
+                    if line:
+                        lines.append(line)
+                    start = end + 1
+                    end = buffer.find(b"\n", start)
+
+        if start:
+            del buffer[:start]
+        self._scan_from = len(buffer)
+        return lines
+
+    def flush(self) -> List[bytes]:
+        """Return whatever is left once the stream has ended"""
+        line = bytes(self._buffer).strip()
+        self._buffer.clear()
+        self._scan_from = 0
+        return [line] if line else []
+
+class CoalescingWriter:
+    """Write frames from any thread, batching whatever is pending into one write.
+
+    A dedicated thread drains the queue, joins every frame that is ready and
+    issues a single write and flush, so a burst of responses (or progress
+    notifications) costs one syscall instead of one per message.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="stdout-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, frame: bytes):
+        """Queue one message (without its trailing newline)"""
+        self._queue.put(frame)
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            frames = [frame]
+            closing = False
+            while True:
+                try:
+                    frame = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if frame is None:
+                    closing = True
+                    break
+                frames.append(frame)
+
+            try:
+                self._stream.write(b"\n".join(frames) + b"\n")
+                self._stream.flush()
+            except (BrokenPipeError, ValueError, OSError) as e:
+                logger.error(f"Failed to write response: {e}")
+                return
+            if closing:
+                return
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush pending frames and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+def start_line_reader(stream: BinaryIO, on_lines: Callable[[List[bytes]], None],
+                      on_eof: Callable[[], None], chunk_size: int = DEFAULT_CHUNK_SIZE) -> threading.Thread:
+    """Read a binary stream in large chunks on a daemon thread.
+
+    ``on_lines`` receives each batch of complete lines found in a chunk and
+    ``on_eof`` is called once the stream ends. Both run on the reader thread.
+    """
+    read = getattr(stream, "read1", stream.read)
+
+    def reader():
+        framer = LineFramer()
+        try:
+            while True:
+                chunk = read(chunk_size)
+                if not chunk:
+                    break
+                lines = framer.feed(chunk)
+                if lines:
+                    on_lines(lines)
+            lines = framer.flush()
+            if lines:
+                on_lines(lines)
+        except Exception as e:
+            logger.error(f"stdin reader error: {e}")
+        finally:
+            on_eof()
+
+    thread = threading.Thread(target=reader, name="stdin-reader", daemon=True)
+    thread.start()
+    return thread
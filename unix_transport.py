@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Unix domain socket transport for the resident MCP Audio Server daemon.
+
+``audio_server.py --daemon`` keeps one warm server listening on a Unix
+socket. Each connection (normally an audio_proxy.py instance speaking for one
+MCP client) is its own session with newline-delimited JSON-RPC, exactly like
+stdio, while all of them share the dispatcher, the audio engine and its
+playback queue.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import socket
+from typing import Any, Dict, List, Optional, Set
+
+from audio_proxy import socket_lock
+from audio_server import AsyncJSONRPCServer, ClientSession
+from transport import DEFAULT_CHUNK_SIZE, LineFramer
+
+logger = logging.getLogger(__name__)
+
+class SocketConnection:
+    """One client connection: frames requests in, coalesces responses out"""
+
+    def __init__(self, dispatcher: AsyncJSONRPCServer, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, session_id: str):
+        self.dispatcher = dispatcher
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.session = ClientSession(session_id, self._notify)
+        self._pending: List[bytes] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    def write(self, frame: bytes):
+        """Queue a frame; everything queued in one loop iteration goes out in one write"""
+        if not self._pending:
+            self.loop.call_soon(self._flush)
+        self._pending.append(frame)
+
+    def _flush(self):
+        frames, self._pending = self._pending, []
+        if frames and not self.writer.is_closing():
+            self.writer.write(b"\n".join(frames) + b"\n")
+
+    def _notify(self, message: Dict[str, Any]):
+        # Called from audio worker threads
+        frame = self.dispatcher.codec.dumps(message)
+        self.loop.call_soon_threadsafe(self.write, frame)
+
+    async def _handle(self, line: bytes):
+        response = await self.dispatcher.handle_message(line, self.session)
+        if response:
+            self.write(response)
+
+    async def serve(self):
+        """Read until the client half-closes, then finish in-flight requests"""
+        framer = LineFramer()
+        try:
+            while True:
+                chunk = await self.reader.read(DEFAULT_CHUNK_SIZE)
+                lines = framer.feed(chunk) if chunk else framer.flush()
+                for line in lines:
+                    task = asyncio.create_task(self._handle(line))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                if not chunk:
+                    break
+
+            while self._tasks:
+                pending = list(self._tasks)
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._tasks.difference_update(pending)
+            self._flush()
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Nothing is left in flight after a clean close; this also drops the session's scheduling state
+            self.dispatcher.cancel_session(self.session.session_id)
+            self.writer.close()
+
+class UnixSocketServer:
+    """Accept daemon connections on a Unix socket"""
+
+    def __init__(self, dispatcher: AsyncJSONRPCServer, path: str):
+        self.dispatcher = dispatcher
+        self.path = path
+        self._ids = itertools.count(1)
+        self._server = None
+        # Inode of the socket file we bound, so shutdown never removes a successor's socket
+        self._inode: Optional[int] = None
+
+    def _claim_path(self):
+        """Remove a stale socket file, refusing to start if a daemon is already listening"""
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+        else:
+            raise RuntimeError(f"An audio server daemon is already listening on {self.path}")
+        finally:
+            probe.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session_id = f"socket-{next(self._ids)}"
+        logger.info(f"Client connected ({session_id})")
+        await SocketConnection(self.dispatcher, reader, writer, session_id).serve()
+        logger.info(f"Client disconnected ({session_id})")
+
+    async def start(self):
+        """Bind the socket (owner-only permissions) and start accepting"""
+        with socket_lock(self.path):
+            self._claim_path()
+            old_umask = os.umask(0o177)
+            try:
+                self._server = await asyncio.start_unix_server(self._handle_connection, self.path)
+            finally:
+                os.umask(old_umask)
+            self._inode = os.stat(self.path).st_ino
+        logger.info(f"Audio server daemon listening on {self.path}")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self._release_path()
+
+    def _release_path(self):
+        """Remove our socket file, unless a newer daemon has already replaced it"""
+        with socket_lock(self.path):
+            try:
+                if os.stat(self.path).st_ino == self._inode:
+                    os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+async def serve_unix(dispatcher: AsyncJSONRPCServer, path: str):
+    """Run the daemon until interrupted"""
+    try:
+        await UnixSocketServer(dispatcher, path).serve_forever()
+    finally:
+        dispatcher.shutdown()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Voice catalog for the pyttsx3 engine, cached in memory and on disk.
+
+Enumerating voices is slow with some drivers (espeak reports hundreds), so
+the catalog is built once per process and persisted between runs in a JSON
+file keyed by driver and platform. The file is only trusted while its key
+still matches: the same driver, platform and pyttsx3 version, and the same
+modification stamp of the driver's voice data directories (when the driver
+has any), so installing or removing voices triggers a refresh.
+"""
+
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FORMAT = 1
+
+_CONTROL_CHARS = "".join(chr(code) for code in range(32))
+
+# Where each pyttsx3 driver keeps its voices; their mtimes change when voices are added or removed
+VOICE_DIRS = {
+    "espeak": [
+        "/usr/share/espeak-ng-data/voices",
+        "/usr/lib/x86_64-linux-gnu/espeak-ng-data/voices",
+        "/usr/lib/aarch64-linux-gnu/espeak-ng-data/voices",
+        "/usr/share/espeak-data/voices",
+    ],
+    "nsss": [
+        "/System/Library/Speech/Voices",
+        "/Library/Speech/Voices",
+        os.path.expanduser("~/Library/Speech/Voices"),
+    ],
+}
+
+def driver_name(engine: Any) -> str:
+    """Short name of the pyttsx3 driver behind ``engine`` (espeak, nsss, sapi5, ...)"""
+    try:
+        return type(engine.proxy._driver).__module__.rsplit(".", 1)[-1]
+    except AttributeError:
+        return "unknown"
+
+def voice_stamp(driver: str) -> List[Optional[float]]:
+    """Modification times of the driver's voice directories (None where missing)"""
+    stamps = []
+    for path in VOICE_DIRS.get(driver, []):
+        try:
+            stamps.append(os.stat(path).st_mtime)
+        except OSError:
+            stamps.append(None)
+    return stamps
+
+def normalize_language(language: Any) -> str:
+    """espeak reports languages as bytes prefixed with a priority byte"""
+    if isinstance(language, bytes):
+        language = language.decode("utf-8", "replace")
+    return str(language).lstrip(_CONTROL_CHARS)
+
+def voice_record(voice: Any) -> Dict[str, Any]:
+    """JSON-friendly description of a pyttsx3 Voice"""
+    languages = getattr(voice, "languages", None) or []
+    if isinstance(languages, (str, bytes)):
+        languages = [languages]
+    return {
+        "id": voice.id,
+        "name": voice.name,
+        "lang": [normalize_language(language) for language in languages],
+        "gender": getattr(voice, "gender", None),
+    }
+
+class VoiceCatalog:
+    """Voice list with filtering and paging, persisted in ``cache_dir``"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self._voices: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: Dict[str, Any]) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"voices-{key['driver']}-{key['platform']}.json")
+
+    def _load(self, key: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != key or data.get("format") != CATALOG_FORMAT:
+            logger.info("Voice catalog on disk is stale, refreshing")
+            return None
+        return data.get("voices")
+
+    def _save(self, key: Dict[str, Any], voices: List[Dict[str, Any]]):
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"format": CATALOG_FORMAT, "key": key, "voices": voices}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save voice catalog: {e}")
+
+    def voices(self, engine: Any, refresh: bool = False) -> List[Dict[str, Any]]:
+        """All voices, from memory, then disk, then the engine"""
+        with self._lock:
+            if self._voices is not None and not refresh:
+                return self._voices
+
+            driver = driver_name(engine)
+            key = {
+                "driver": driver,
+                "platform": platform.system().lower(),
+                "pyttsx3": getattr(sys.modules.get("pyttsx3"), "__version__", None),
+                "stamp": voice_stamp(driver),
+            }
+            voices = None if refresh else self._load(key)
+            if voices is None:
+                voices = [voice_record(voice) for voice in engine.getProperty('voices')]
+                self._save(key, voices)
+            self._voices = voices
+            return voices
+
+    def query(self, engine: Any, language: Optional[str] = None, gender: Optional[str] = None,
+              name: Optional[str] = None, offset: int = 0, limit: Optional[int] = None,
+              refresh: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """Filtered page of voices and the number of voices matching the filters.
+
+        ``language`` matches a language tag prefix ("en" matches "en-us"),
+        ``gender`` matches exactly and ``name`` is a substring of the name or
+        id; all are case-insensitive.
+        """
+        matches = self.voices(engine, refresh)
+        if language:
+            language = language.lower()
+            matches = [v for v in matches if any(lang.lower().startswith(language) for lang in v["lang"])]
+        if gender:
+            gender = gender.lower()
+            matches = [v for v in matches if (v["gender"] or "").lower() == gender]
+        if name:
+            name = name.lower()
+            matches = [v for v in matches if name in (v["name"] or "").lower() or name in v["id"].lower()]
+        end = None if limit is None else offset + limit
+        return matches[offset:end], len(matches)